@@ -2,35 +2,47 @@ import os
 import sys
 import traceback
 import io
-import re
+import threading
 from flask import (
     Flask, render_template, request, redirect,
-    url_for, flash, send_from_directory, session, make_response
+    url_for, flash, send_from_directory, session, make_response, jsonify,
+    Response, stream_with_context, g
 )
 from werkzeug.utils import secure_filename
 
 # ---- Import backend modules ----
-from parser import parse_form16
-from tax_calculator import compute_tax
-from deduction_engine import compute_deductions, compare_regimes
-
-# ReportLab for PDF
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-)
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER
+# Heavy dependencies (ReportLab, numpy, pdfplumber/PyMuPDF) are imported on first
+# use by the modules below, so booting a worker only loads Flask and our own code.
+from layout_cache import layout_cache
+from parse_cache import form16_cache
+from jobs import upload_jobs, DONE, FAILED
+from session_store import make_session_interface
+from report_generator import report_cache, report_key
+from tax_calculator import generate_suggestions as tax_suggestions
+from deduction_engine import compare_regimes
+from calc_graph import Calculation, calc_inputs
+from field_schema import normalize_fields
+from upload_stream import UploadRequest
+import static_cache
+from static_cache import static_page
+import metrics
+import profiling
+from metrics import stage
 
 # ---- Flask Setup ----
 app = Flask(__name__)
+app.request_class = UploadRequest  # uploads are hashed as they arrive and parsed from memory
 app.secret_key = "supersecretkey"
+# Sessions live server-side; the cookie only carries an opaque id (FORM16_SESSION_BACKEND=cookie to opt out)
+app.session_interface = make_session_interface() or app.session_interface
+# Fingerprinted, precompressed static assets with immutable caching (FORM16_STATIC_CACHE=0 to opt out)
+static_cache.init_app(app)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 ALLOWED_EXTENSIONS = {"pdf"}
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+API_MAX_FILES = int(os.environ.get("FORM16_API_MAX_FILES", 20))
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 try:
@@ -44,171 +56,49 @@ def allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def format_label(key: str) -> str:
-    key = key.replace("_", " ")
-    return re.sub(r'(?<!^)(?=[A-Z])', " ", key).title()
-
+# ---- Stage timing (FORM16_METRICS=1) ----
+@app.before_request
+def start_timing():
+    if metrics.ENABLED:
+        g.timing = metrics.begin_request()
 
-def safe_float(value, default=0.0):
-    if value is None:
-        return float(default)
-    if isinstance(value, (int, float)):
-        return float(value)
-    try:
-        s = str(value).replace(",", "").replace("₹", "").strip()
-        if s == "":
-            return float(default)
-        return float(s)
-    except (ValueError, TypeError):
-        return float(default)
 
+@app.after_request
+def add_server_timing(response):
+    token = g.pop("timing", None)
+    if token is not None:
+        response.headers["Server-Timing"] = metrics.end_request(token, request.endpoint)
+    return response
 
-def normalize_keys(data: dict) -> dict:
-    """
-    Convert common front-end names (various cases/styles) into backend-compatible keys.
-    Keeps unknown keys as-is.
-    """
-    key_map = {
-        # 80C
-        "80c": "section_80c",
-        "sec80c": "section_80c",
-        "section80c": "section_80c",
-        "section_80c": "section_80c",
-        "investments80c": "section_80c",
-        "investments80C": "section_80c",
-        "investments80": "section_80c",
-
-        # 80D
-        "80d": "section_80d",
-        "section80d": "section_80d",
-        "medinsuranceself": "section_80d",
-        "medinsuranceparents": "section_80d",
-        "medinsurenceself": "section_80d",
-
-        # 80CCD(1B)
-        "80ccd1b": "section_80ccd1b",
-        "section80ccd1b": "section_80ccd1b",
-        "nps_additional": "section_80ccd1b",
-        "npsadditional": "section_80ccd1b",
-        "nps_add": "section_80ccd1b",
-
-        # taxable income synonyms
-        "taxableincome": "taxable_income",
-        "taxable_income": "taxable_income",
-    }
 
-    normalized = {}
-    for k, v in data.items():
-        cleaned = (
-            k.lower()
-            .replace(" ", "")
-            .replace("-", "")
-            .replace("(", "")
-            .replace(")", "")
-        )
-        mapped_key = key_map.get(cleaned, k)
-        normalized[mapped_key] = v
-    return normalized
-
-
-# ======================= UPDATED FUNCTION BELOW ==========================
-def generate_pdf(parsed_data, user_data, tax_summary):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=40, leftMargin=40,
-        topMargin=60, bottomMargin=40
-    )
+# ---- Profiling (FORM16_PROFILE / FORM16_PROFILE_RATE / FORM16_PROFILE_SECRET) ----
+@app.before_request
+def start_profile():
+    if profiling.wanted(request.endpoint, request.path, request.headers.get(profiling.HEADER)):
+        g.profile = profiling.start(request.endpoint, request.path)
+
+
+@app.after_request
+def save_profile(response):
+    capture = g.pop("profile", None)
+    if capture is not None:
+        upload = g.get("upload")
+        if upload is not None:
+            profiling.finish(capture, response.status_code, upload.stream, upload.filename,
+                             getattr(upload.stream, "sha256", None))
+        else:
+            profiling.finish(capture, response.status_code, None,
+                             session.get("source_pdf"), session.get("source_sha256"))
+    return response
 
-    styles = getSampleStyleSheet()
-    elements = []
-
-    # --- Title ---
-    elements.append(Paragraph("AI Tax Advisor - Tax Report", styles["Title"]))
-    elements.append(Spacer(1, 20))
-
-    # --- Personal Information ---
-    elements.append(Paragraph("Personal Information", styles["Heading2"]))
-    user_table_data = [["Field", "Value"]]
-    for k, v in user_data.items():
-        user_table_data.append([format_label(k), str(v)])
-    user_table = Table(user_table_data, colWidths=[200, 280])
-    user_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightblue),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-    ]))
-    elements.append(user_table)
-    elements.append(Spacer(1, 20))
-
-    # --- Form 16 Extracted Data ---
-    elements.append(Paragraph("Form 16 Extracted Data", styles["Heading2"]))
-    form16_table_data = [["Field", "Value"]]
-    for k, v in parsed_data.items():
-        form16_table_data.append([format_label(k), str(v)])
-    form16_table = Table(form16_table_data, colWidths=[200, 280])
-    form16_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgreen),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-    ]))
-    elements.append(form16_table)
-    elements.append(Spacer(1, 20))
-
-    # --- Tax Summary ---
-    elements.append(Paragraph("Tax Summary", styles["Heading2"]))
-    summary_table_data = [
-        ["Old Regime Tax", str(tax_summary.get("old", {}).get("final_tax", "N/A"))],
-        ["New Regime Tax", str(tax_summary.get("new", {}).get("final_tax", "N/A"))],
-    ]
-    summary_table = Table(summary_table_data, colWidths=[200, 280])
-    summary_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.orange),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-    ]))
-    elements.append(summary_table)
-    elements.append(Spacer(1, 20))
-
-    # --- Suggestions ---
-    suggestions = tax_summary.get("suggestions", {})
-    if suggestions:
-        elements.append(Paragraph("AI Tax Advisor Suggestions", styles["Heading2"]))
-        for key, suggestion in suggestions.items():
-            elements.append(Paragraph(f"<b>{format_label(key)}</b>", styles["Normal"]))
-            if isinstance(suggestion, dict):
-                claimed = suggestion.get("claimed")
-                limit = suggestion.get("limit")
-                if claimed is not None or limit is not None:
-                    elements.append(Paragraph(
-                        f"Claimed: {claimed}, Limit: {limit}, Remaining: {suggestion.get('remaining', '')}",
-                        styles["Normal"]
-                    ))
-                if "note" in suggestion:
-                    elements.append(Paragraph(f"Note: {suggestion['note']}", styles["Normal"]))
-                if "options" in suggestion:
-                    for opt in suggestion["options"]:
-                        elements.append(Paragraph(f"- {opt}", styles["Normal"]))
-            else:
-                elements.append(Paragraph(str(suggestion), styles["Normal"]))
-            elements.append(Spacer(1, 10))
-
-    # --- DISCLAIMER ---
-    disclaimer_style = styles["Normal"].clone('Disclaimer')
-    disclaimer_style.fontSize = 9
-    disclaimer_style.textColor = colors.black
-    disclaimer_style.alignment = TA_CENTER
-
-    disclaimer_text = """
-    <b>Disclaimer:</b> This report is generated by an <b>AI-based Tax Advisor</b>.
-    Please consult a qualified Chartered Accountant before making any investment or tax decision.
-    """
-    elements.append(Spacer(1, 18))
-    elements.append(Paragraph(disclaimer_text, disclaimer_style))
 
-    # --- Build PDF ---
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-# ======================= UPDATED FUNCTION ENDS HERE ==========================
+@app.teardown_request
+def abandon_profile(exc):
+    # after_request is skipped when an exception propagates out of the view (debug,
+    # PROPAGATE_EXCEPTIONS); still stop the profiler so the next request can be profiled
+    capture = g.pop("profile", None)
+    if capture is not None:
+        profiling.finish(capture, 500, None, session.get("source_pdf"), session.get("source_sha256"))
 
 
 # ---- Routes ----
@@ -217,14 +107,79 @@ def index():
     return render_template("index.html")
 
 
+def analyze_upload(source, raw_user_data: dict, filename: str, digest: str = None) -> dict:
+    """Parse an uploaded Form 16 (stream or bytes) and run the calculation; the session payload for /review."""
+    parsed_data = form16_cache.parse(source, digest=digest)
+    normalized_user = normalize_fields(raw_user_data)
+    calc = Calculation()
+    calc.update(calc_inputs(parsed_data, normalized_user))
+    return {
+        "parsed_data": calc.enrich(parsed_data),
+        "user_data": normalized_user,
+        "tax_summary": calc.get("tax_summary"),
+        "calc": calc.state,
+        "source_pdf": filename,
+        "source_sha256": digest,
+    }
+
+
+def analyze_form16(filename: str, parsed_data: dict, user_data: dict) -> dict:
+    """One /api/analyze-form16 result: parsed fields, deductions and both regimes, plus the dashboard figures."""
+    parsed = normalize_fields(parsed_data)
+    comparison = compare_regimes(user_data, parsed)
+    own = comparison["new" if parsed.get("regime") == "new" else "old"]
+    suggestions = tax_suggestions({**parsed, **user_data}, comparison["old"]["taxable_income"],
+                                  comparison["assessment_year"])
+    return {
+        "file": filename,
+        "parsed_data": parsed,
+        "comparison": comparison,
+        "gross_salary": comparison["gross_salary"],
+        "exemptions": comparison["gross_salary"] - own["taxable_income"],
+        "taxable_income": own["taxable_income"],
+        "total_tax_due": parsed.get("total_tax_payable", own["final_tax"]),
+        "tax_paid_tds": parsed.get("tds_deducted", 0),
+        "refund_payable": parsed.get("refund", 0),
+        "claimed_deductions": {k: v for k, v in comparison["old"]["deductions"].items() if v},
+        "tax_saving_opportunities": [
+            {"title": title, "description": s["note"]}
+            for title, s in suggestions.items()
+            if isinstance(s, dict) and s.get("remaining")
+        ],
+    }
+
+
+# Multi-file /api/analyze-form16 requests parse their cache misses on this pool
+# (text extraction holds the GIL, so threads would not overlap), and /bulk-reports
+# renders on it. Created on first use.
+API_WORKERS = int(os.environ.get("FORM16_API_WORKERS", os.cpu_count() or 1))
+BULK_MAX_ROWS = int(os.environ.get("FORM16_BULK_MAX_ROWS", 5000))
+_api_pool = None
+
+
+def api_pool(required: bool = False):
+    """The shared process pool; None when FORM16_API_WORKERS is 1, unless `required`."""
+    global _api_pool
+    if _api_pool is None and (API_WORKERS > 1 or required):
+        from concurrent.futures import ProcessPoolExecutor
+        _api_pool = ProcessPoolExecutor(max_workers=max(API_WORKERS, 1))
+    return _api_pool
+
+
+def wants_async() -> bool:
+    return request.args.get("async") == "1" or request.form.get("mode") == "async"
+
+
 @app.route("/upload", methods=["POST"])
 def upload_file():
     try:
-        if "file" not in request.files:
+        with stage("upload_receive"):
+            files = request.files
+        if "file" not in files:
             flash("No file uploaded.")
             return redirect(url_for("index"))
 
-        file = request.files["file"]
+        file = files["file"]
         if file.filename == "":
             flash("No file selected.")
             return redirect(url_for("index"))
@@ -233,19 +188,29 @@ def upload_file():
             flash("Only PDF files are allowed.")
             return redirect(url_for("index"))
 
+        # Parsed from the request's own spool (memory, or a private temp file for big
+        # uploads); nothing is written to the shared uploads/ folder.
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        file.save(filepath)
-
-        parsed_data = parse_form16(filepath) or {}
-        raw_user_data = {k: request.form.get(k) for k in request.form.keys()}
-        normalized_user = normalize_keys(raw_user_data)
-        ded_results = compute_deductions(normalized_user, parsed_data)
-
-        session["parsed_data"] = ded_results.get("parsed_data", parsed_data)
-        session["user_data"] = normalized_user
-        session["tax_summary"] = ded_results.get("final_tax", {})
-
+        digest = getattr(file.stream, "sha256", None)
+        g.upload = file
+        raw_user_data = {k: request.form.get(k) for k in request.form.keys() if k != "mode"}
+
+        if wants_async():
+            # the spool is closed when this request ends, so the job gets the bytes
+            file.stream.seek(0)
+            job_id = upload_jobs.submit(analyze_upload, file.stream.read(), raw_user_data, filename, digest)
+            if job_id is None:
+                return jsonify({"error": "Too many uploads in progress, try again shortly."}), 503
+            status_url = url_for("job_status", job_id=job_id)
+            response = jsonify({
+                "job_id": job_id,
+                "status_url": status_url,
+                "review_url": url_for("review", job=job_id),
+            })
+            response.headers["Location"] = status_url
+            return response, 202
+
+        session.update(analyze_upload(file.stream, raw_user_data, filename, digest))
         return redirect(url_for("review"))
 
     except Exception as e:
@@ -258,33 +223,48 @@ def upload_file():
 def review():
     if request.method == "POST":
         updated = request.form.to_dict()
-        updated = normalize_keys(updated)
 
-        parsed = {k.replace("parsed_", ""): v for k, v in updated.items() if k.startswith("parsed_")}
-        user = {k: v for k, v in updated.items() if not k.startswith("parsed_")}
+        parsed = normalize_fields({k.replace("parsed_", ""): v for k, v in updated.items() if k.startswith("parsed_")})
+        user = normalize_fields({k: v for k, v in updated.items() if not k.startswith("parsed_")})
 
         merged_parsed = session.get("parsed_data", {}).copy()
         merged_parsed.update(parsed)
         merged_user = session.get("user_data", {}).copy() if session.get("user_data") else {}
         merged_user.update(user)
 
-        ded_results = compute_deductions(merged_user, merged_parsed)
+        # only the nodes downstream of the edited fields are recomputed (see calc_graph)
+        calc = Calculation(session.get("calc"))
+        calc.update(calc_inputs(merged_parsed, merged_user))
 
-        session["parsed_data"] = ded_results.get("parsed_data", merged_parsed)
+        session["parsed_data"] = calc.enrich(merged_parsed)
         session["user_data"] = merged_user
-        session["tax_summary"] = ded_results.get("final_tax", {})
+        session["tax_summary"] = calc.get("tax_summary")
+        session["calc"] = calc.state
 
         return redirect(url_for("result"))
 
+    job_id = request.args.get("job")
+    if job_id:
+        job = upload_jobs.get(job_id)
+        if job is None:
+            flash("That upload has expired. Please upload again.")
+            return redirect(url_for("index"))
+        if job["status"] == FAILED:
+            flash(f"Processing error: {job['error']}")
+            return redirect(url_for("index"))
+        if job["status"] != DONE:
+            flash("Your Form 16 is still being processed. Please try again in a moment.")
+            return redirect(url_for("index"))
+        session.update(job["result"])
+
     parsed_data = session.get("parsed_data")
     user_data = session.get("user_data")
     if not parsed_data:
         flash("No data available. Please upload again.")
         return redirect(url_for("index"))
-    return render_template("review.html", parsed_data=parsed_data, user_data=user_data)
-
+    with stage("render_template"):
+        return render_template("review.html", parsed_data=parsed_data, user_data=user_data)
 
-from suggestion_engine import generate_suggestions
 
 @app.route("/result")
 def result():
@@ -294,36 +274,36 @@ def result():
         flash("No analysis available. Please upload again.")
         return redirect(url_for("index"))
 
-    merged = parsed_data.copy()
-    if user_data:
-        merged.update(user_data)
-
-    merged = normalize_keys(merged)
-
-    numeric_keys = ["taxable_income", "section_80c", "section_80ccd1b", "section_80d"]
-    for nk in numeric_keys:
-        if nk in merged:
-            merged[nk] = safe_float(merged[nk], default=0.0)
+    merged = normalize_fields({**parsed_data, **(user_data or {})})
 
+    # node values computed on /upload or /review are reused; a refresh computes nothing
+    calc = Calculation(session.get("calc"))
     try:
-        tax_summary = compute_tax(merged)
+        calc.update(calc_inputs(parsed_data, user_data))
+        tax_summary = calc.get("tax_summary")
     except Exception as e:
         traceback.print_exc()
         flash(f"Tax calculation error: {e}")
         return redirect(url_for("review"))
 
-    ai_suggestions = generate_suggestions()
-
-    session["parsed_data"] = merged
-    session["tax_summary"] = tax_summary
-
-    return render_template(
-        "result.html",
-        parsed_data=merged,
-        result=tax_summary,
-        user_data=user_data,
-        ai_suggestions=ai_suggestions
-    )
+    ai_suggestions = calc.get("ai_suggestions")
+
+    # the session store writes only when something was assigned
+    if merged != parsed_data:
+        session["parsed_data"] = merged
+    if session.get("tax_summary") != tax_summary:
+        session["tax_summary"] = tax_summary
+    if calc.changed:
+        session["calc"] = calc.state
+
+    with stage("render_template"):
+        return render_template(
+            "result.html",
+            parsed_data=merged,
+            result=tax_summary,
+            user_data=user_data,
+            ai_suggestions=ai_suggestions
+        )
 
 
 @app.route("/uploads/<filename>")
@@ -331,47 +311,180 @@ def uploaded_file(filename):
     return send_from_directory(app.config["UPLOAD_FOLDER"], filename)
 
 
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+    payload = {k: job[k] for k in ("id", "status", "created", "finished", "error")}
+    if job["status"] == DONE:
+        payload["result"] = job["result"]
+        payload["review_url"] = url_for("review", job=job_id)
+    return jsonify(payload)
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Stage and request latency histograms in the Prometheus text format."""
+    if not metrics.ENABLED:
+        return jsonify({"error": "Metrics are disabled; set FORM16_METRICS=1."}), 404
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/cache-stats")
+def cache_stats():
+    return jsonify({**form16_cache.stats(), "reports": report_cache.stats(), "layouts": layout_cache.stats()})
+
+
 @app.route("/download-pdf", methods=["GET", "POST"])
 def download_pdf():
     parsed_data = session.get("parsed_data", {})
     tax_summary = session.get("tax_summary", {})
     user_data = session.get("user_data", {})
 
-    pdf_buffer = generate_pdf(parsed_data, user_data, tax_summary)
-    response = make_response(pdf_buffer.read())
-    response.headers["Content-Type"] = "application/pdf"
-    response.headers["Content-Disposition"] = "attachment; filename=tax_report.pdf"
+    # the input hash is the ETag, so a conditional GET is answered without rendering
+    etag = report_key(parsed_data, user_data, tax_summary)
+    if etag in request.if_none_match:
+        response = make_response("", 304)
+    else:
+        response = make_response(report_cache.report(parsed_data, user_data, tax_summary, key=etag))
+        response.headers["Content-Type"] = "application/pdf"
+        response.headers["Content-Disposition"] = "attachment; filename=tax_report.pdf"
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@app.route("/api/optimize")
+def api_optimize():
+    """How much more to invest (80C / 80CCD(1B) / 80D) for the analysis in this session."""
+    from deduction_optimizer import optimize
+
+    parsed_data = session.get("parsed_data")
+    if not parsed_data:
+        return jsonify({"error": "No analysis available. Please upload again."}), 404
+    return jsonify(optimize(parsed_data, session.get("user_data") or {}))
+
+
+@app.route("/api/analyze-form16", methods=["POST"])
+def api_analyze_form16():
+    """
+    One or more Form 16 PDFs (multipart field "form16", repeatable) analyzed in a
+    single round trip. Other form fields are the user's deductions and apply to
+    every file. Nothing is written to disk or to the session.
+    """
+    uploads = [f for f in request.files.getlist("form16") + request.files.getlist("file") if f.filename]
+    if not uploads:
+        return jsonify({"error": "Upload one or more Form 16 PDFs in the 'form16' field."}), 400
+    if len(uploads) > API_MAX_FILES:
+        return jsonify({"error": f"At most {API_MAX_FILES} files per request."}), 400
+    user_data = normalize_fields(request.form.to_dict())
+
+    pdfs = [f for f in uploads if allowed_file(f.filename)]
+    # a single file is parsed in-process: no pool hand-off for the dashboard's common case
+    parsed = iter(form16_cache.parse_many([f.read() for f in pdfs], api_pool() if len(pdfs) > 1 else None))
+
+    results = []
+    for upload in uploads:
+        filename = upload.filename
+        if not allowed_file(filename):
+            results.append({"file": filename, "error": "Only PDF files are allowed."})
+            continue
+        try:
+            outcome = next(parsed)
+            if isinstance(outcome, Exception):
+                raise outcome
+            results.append(analyze_form16(filename, outcome, user_data))
+        except Exception as e:
+            traceback.print_exc()
+            results.append({"file": filename, "error": f"{type(e).__name__}: {e}"})
+
+    failed = sum(1 for r in results if "error" in r)
+    payload = {"results": results, "count": len(results), "failed": failed}
+    if failed == len(results):
+        payload["error"] = results[0]["error"] if len(results) == 1 else "No file could be analyzed."
+        return jsonify(payload), 422
+    return jsonify(payload)
+
+
+@app.route("/bulk-reports", methods=["POST"])
+def bulk_reports_zip():
+    """Upload bulk_ingest.py output (field "records", .jsonl or .csv); streams back a ZIP of reports."""
+    import csv
+    from itertools import islice
+
+    from bulk_reports import iter_records, iter_zip
+
+    upload = request.files.get("records")
+    if upload is None or upload.filename == "":
+        return jsonify({"error": "Upload a .jsonl or .csv file in the 'records' field."}), 400
+    fmt = "csv" if upload.filename.lower().endswith(".csv") else "jsonl"
+    try:
+        # records are small; reading them up front rejects a malformed file before streaming starts
+        lines = io.TextIOWrapper(upload.stream, encoding="utf-8", newline="")
+        records = list(islice(iter_records(lines, fmt), BULK_MAX_ROWS + 1))
+    except (ValueError, csv.Error) as e:
+        return jsonify({"error": f"Could not read records: {e}"}), 400
+    if len(records) > BULK_MAX_ROWS:
+        return jsonify({"error": f"At most {BULK_MAX_ROWS} records per request; split the file "
+                                 "or run bulk_reports.py."}), 413
+    # rendered on the shared pool, so concurrent requests can't multiply worker processes
+    response = Response(
+        stream_with_context(iter_zip(records, workers=max(API_WORKERS, 1), executor=api_pool(required=True))),
+        mimetype="application/zip",
+    )
+    response.headers["Content-Disposition"] = "attachment; filename=tax_reports.zip"
     return response
 
 
 @app.route("/chapter-VIA_Deductions")
 def chapter_VIA_deductions():
-    return render_template("chapter-VIA_Deductions.html")
+    return static_page("chapter-VIA_Deductions.html")
 
 
 @app.route("/form-16_partA")
 def form16_partA():
-    return render_template("form-16_partA.html")
+    return static_page("form-16_partA.html")
 
 
 @app.route("/form-16_partB")
 def form16_partB():
-    return render_template("form-16_partB.html")
+    return static_page("form-16_partB.html")
 
 
 @app.route("/Gross_salary")
 def gross_salary():
-    return render_template("Gross_salary.html")
+    return static_page("Gross_salary.html")
 
 
 @app.route("/old_new-regime")
 def old_new_regime():
-    return render_template("old_new-regime.html")
+    return static_page("old_new-regime.html")
 
 
 @app.route("/TDS")
 def tds():
-    return render_template("TDS.html")
+    return static_page("TDS.html")
+
+
+# ---- Warm-up (FORM16_WARMUP=1) ----
+def warm_up():
+    """
+    Import the lazily loaded dependencies and calibrate the PDF backend ahead of
+    the first request. Call it from gunicorn's post_fork hook, or set
+    FORM16_WARMUP=1 to run it on a background thread when the app is imported.
+    """
+    from parser import select_backend
+    from report_generator import report_styles
+    import deduction_optimizer  # noqa: F401  (numpy)
+    import suggestion_engine  # noqa: F401
+
+    select_backend()
+    report_styles()
+
+
+if os.environ.get("FORM16_WARMUP", "0").lower() in ("1", "true", "yes", "on"):
+    threading.Thread(target=warm_up, name="form16-warmup", daemon=True).start()
 
 
 if __name__ == "__main__":
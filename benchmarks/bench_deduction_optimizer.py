@@ -0,0 +1,73 @@
+# benchmarks/bench_deduction_optimizer.py
+"""
+Deduction optimizer: closed-form answer vs. brute force through
+compare_regimes (one call per ₹1,000 of extra 80C/80CCD(1B)/80D investment),
+and the vectorized batch path over many employees.
+
+    python benchmarks/bench_deduction_optimizer.py --employees 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deduction_engine import SECTION_CAPS, compare_regimes  # noqa: E402
+from deduction_optimizer import optimize, optimize_batch  # noqa: E402
+
+FORM_KEYS = ["section_80c", "section_80ccd1b", "medical_self", "medical_parents"]  # SECTION_CAPS order
+STEP = 1000
+
+
+def brute_force(parsed, claimed):
+    """Smallest extra investment (in STEP increments) that makes the old regime cheaper, or None."""
+    rooms = [cap - c for cap, c in zip(SECTION_CAPS.values(), claimed)]
+    for extra in range(0, sum(rooms) + STEP, STEP):
+        left, form = extra, {}
+        for key, c, room in zip(FORM_KEYS, claimed, rooms):
+            form[key] = c + min(left, room)
+            left -= min(left, room)
+        cmp = compare_regimes(form, parsed)
+        if cmp["old"]["final_tax"] < cmp["new"]["final_tax"]:
+            return extra
+    return None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Closed-form deduction optimizer vs. brute force.")
+    ap.add_argument("--employees", type=int, default=1_000_000, help="batch size for the vectorized run")
+    args = ap.parse_args(argv)
+
+    parsed = {"regime": "old", "gross_salary": 800000, "standard_deduction": 50000}
+    claimed = [0, 0, 0, 0]
+
+    start = time.perf_counter()
+    brute = brute_force(parsed, claimed)
+    t_brute = time.perf_counter() - start
+
+    repeat = 2000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = optimize(parsed, {})
+    t_opt = (time.perf_counter() - start) / repeat
+    exact = result["crossover"]["extra_investment"]
+    assert brute is not None and brute - STEP < exact <= brute, (brute, exact)
+    print(f"crossover: brute force ≈ ₹{brute} in {t_brute * 1e3:.1f} ms; "
+          f"optimizer ₹{exact} (exact) in {t_opt * 1e6:.0f} µs")
+
+    rng = np.random.default_rng(0)
+    n = args.employees
+    income = rng.uniform(300_000, 3_000_000, n)
+    new_tax = rng.uniform(0, 500_000, n)
+    headroom = rng.uniform(0, sum(SECTION_CAPS.values()), n)
+    start = time.perf_counter()
+    optimize_batch(income, new_tax, headroom)
+    t_batch = time.perf_counter() - start
+    print(f"batch: {n:,} employees in {t_batch:.2f}s ({t_batch / n * 1e6:.2f} µs/employee)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/bench_field_scanner.py
+"""
+Field extraction cost: the old per-field finder chains (one walk over the text
+per finder) vs. the compiled single-pass _FieldScanner.
+
+Text is extracted once up front so only field extraction is timed.
+
+    python benchmarks/bench_field_scanner.py --repeat 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import legacy_field_finders as legacy  # noqa: E402
+import parser as form16_parser  # noqa: E402
+from pdf_backends import get_backend  # noqa: E402
+
+
+def _time(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(text)
+    return out, (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Legacy multi-pass field finders vs. single-pass scanner.")
+    ap.add_argument("--repeat", type=int, default=2000)
+    args = ap.parse_args(argv)
+
+    backend = get_backend("pdfplumber")
+    print(f"{'sample':<26} {'passes':>11} {'legacy µs':>10} {'scanner µs':>11} {'speedup':>8}")
+    for name in form16_parser.SAMPLE_EXPECTATIONS:
+        with backend.open(os.path.join(form16_parser.SAMPLE_DIR, name)) as doc:
+            text = "\n".join(backend.iter_page_texts(doc))
+        regime = form16_parser._detect_regime(text)
+        legacy_fn = legacy._parse_new_regime if regime == "new" else legacy._parse_old_regime
+        scanner_fn = form16_parser._parse_new_regime if regime == "new" else form16_parser._parse_old_regime
+
+        legacy.PASSES[0] = 0
+        legacy_fn(text)
+        passes = legacy.PASSES[0]
+
+        old, t_old = _time(legacy_fn, text, args.repeat)
+        new, t_new = _time(scanner_fn, text, args.repeat)
+        if old != new:
+            raise SystemExit(f"{name}: scanner output differs from legacy finders\n{old}\n{new}")
+        print(f"{name:<26} {passes:>4} -> {1:<4} {t_old * 1e6:>10.0f} {t_new * 1e6:>11.0f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
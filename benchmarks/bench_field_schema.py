@@ -0,0 +1,47 @@
+# benchmarks/bench_field_schema.py
+"""
+Rows/sec for normalizing bulk records: normalize_fields() per row vs.
+normalize_rows(), which resolves the key plan once per column layout.
+
+    python benchmarks/bench_field_schema.py --n 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from field_schema import normalize_fields, normalize_rows  # noqa: E402
+
+ROW = {
+    "source_file": "form16s/emp_00001.pdf", "regime": "new", "employee_name": "Not Found",
+    "assessment_year": "2025-26", "gross_salary": "1240474", "standard_deduction": "75000",
+    "taxable_income": "1165474", "tds_deducted": "77814", "total_tax_payable": "77814",
+    "refund": "", "total_deductions": "0", "net_taxable_income": "1165474",
+    "old_regime_tax": "176428", "new_regime_tax": "77814",
+}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=200_000, help="number of rows")
+    args = ap.parse_args(argv)
+
+    rows = [dict(ROW) for _ in range(args.n)]
+    start = time.perf_counter()
+    for row in rows:
+        normalize_fields(row)
+    per_row = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in normalize_rows(rows):
+        pass
+    batched = time.perf_counter() - start
+
+    print(f"normalize_fields: {args.n / per_row:>12,.0f} rows/sec")
+    print(f"normalize_rows:   {args.n / batched:>12,.0f} rows/sec ({per_row / batched:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
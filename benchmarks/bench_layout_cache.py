@@ -0,0 +1,74 @@
+# benchmarks/bench_layout_cache.py
+"""
+Region extraction from learned layouts vs the full-text path.
+
+Parses every PDF of a form16_corpus.py corpus (plus the bundled samples) twice:
+once through the full-text path and once with the layout cache, starting from an
+empty in-memory cache, and checks that both give the same fields.
+
+    python benchmarks/form16_corpus.py -o corpus/ -n 500
+    python benchmarks/bench_layout_cache.py corpus/ --backend pdfplumber
+    python benchmarks/bench_layout_cache.py corpus/ --passes 2     # second pass: layouts already learned
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from layout_cache import layout_cache  # noqa: E402
+from parser import SAMPLE_DIR, SAMPLE_EXPECTATIONS, parse_form16, select_backend  # noqa: E402
+
+
+def corpus_files(corpus_dir: str, limit: int = None) -> list:
+    with open(os.path.join(corpus_dir, "manifest.jsonl"), encoding="utf-8") as fh:
+        files = [os.path.join(corpus_dir, json.loads(line)["pdf"]) for line in fh]
+    return files[:limit] + [os.path.join(SAMPLE_DIR, name) for name in SAMPLE_EXPECTATIONS]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare layout-cache region extraction with the full-text path.")
+    ap.add_argument("corpus", help="directory written by benchmarks/form16_corpus.py")
+    ap.add_argument("--backend", help="pdfplumber or pymupdf (default: the calibrated backend)")
+    ap.add_argument("--limit", type=int, help="only the first N corpus PDFs")
+    ap.add_argument("--passes", type=int, default=1, help="passes over the corpus with the layout cache")
+    args = ap.parse_args(argv)
+
+    backend = select_backend(args.backend)
+    files = corpus_files(args.corpus, args.limit)
+    layout_cache.path = None  # in memory only; leave .cache/layouts.json alone
+    layout_cache.clear()
+
+    full, expected = 0.0, {}
+    for path in files:
+        start = time.perf_counter()
+        expected[path] = parse_form16(path, backend=backend, layouts=False)
+        full += time.perf_counter() - start
+
+    for n in range(1, args.passes + 1):
+        before = layout_cache.stats()
+        elapsed, mismatches = 0.0, []
+        for path in files:
+            start = time.perf_counter()
+            parsed = parse_form16(path, backend=backend, layouts=True)
+            elapsed += time.perf_counter() - start
+            if parsed != expected[path]:
+                mismatches.append(os.path.basename(path))
+        stats = layout_cache.stats()
+        hits = stats["hits"] - before["hits"]
+        print(f"pass {n}: {len(files)} PDFs with {backend.name}, hit rate {hits / len(files):.1%}, "
+              f"{stats['layouts']} layouts ({stats['untrainable']} untrainable)")
+        print(f"  full text     {full / len(files) * 1e3:8.2f} ms/PDF")
+        print(f"  layout cache  {elapsed / len(files) * 1e3:8.2f} ms/PDF "
+              f"(hits {stats['avg_hit_ms']} ms, net saved {stats['saved_ms'] - before['saved_ms']:.0f} ms)")
+        if mismatches:
+            print(f"  MISMATCH on {len(mismatches)}: {', '.join(mismatches[:10])}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# benchmarks/bench_pdf_backends.py
+"""
+Side-by-side PDF text backends: per-page latency and peak memory.
+
+Each backend runs in its own interpreter so peak RSS isn't polluted by the others.
+
+    python benchmarks/bench_pdf_backends.py --repeat 5
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parser import SAMPLE_DIR, SAMPLE_EXPECTATIONS, parse_form16  # noqa: E402
+from pdf_backends import available_backends, get_backend  # noqa: E402
+
+
+def measure(backend_name: str, repeat: int) -> dict:
+    backend = get_backend(backend_name)
+    samples = [os.path.join(SAMPLE_DIR, name) for name in SAMPLE_EXPECTATIONS]
+
+    # warm-up: imports and font/cmap caches shouldn't count as per-page latency
+    for path in samples:
+        with backend.open(path) as doc:
+            list(backend.iter_page_texts(doc))
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pages, elapsed = 0, 0.0
+    for _ in range(repeat):
+        for path in samples:
+            start = time.perf_counter()
+            with backend.open(path) as doc:
+                pages += sum(1 for _ in backend.iter_page_texts(doc))
+            elapsed += time.perf_counter() - start
+
+    # separate pass for the Python-heap peak; tracemalloc would distort the timings
+    tracemalloc.start()
+    for path in samples:
+        with backend.open(path) as doc:
+            list(backend.iter_page_texts(doc))
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    passes = all(
+        parse_form16(os.path.join(SAMPLE_DIR, name), backend=backend) == expected
+        for name, expected in SAMPLE_EXPECTATIONS.items()
+    )
+    return {
+        "backend": backend_name,
+        "ms_per_page": round(elapsed / pages * 1000, 2),
+        "python_peak_kb": py_peak // 1024,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "rss_growth_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before,
+        "passes_samples": passes,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare PDF text backends on the bundled samples.")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.repeat)))
+        return
+
+    rows = []
+    for backend in available_backends():
+        out = subprocess.run(
+            [sys.executable, __file__, "--worker", backend.name, "--repeat", str(args.repeat)],
+            check=True, capture_output=True, text=True,
+        )
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'backend':<12} {'ms/page':>9} {'py peak KB':>11} {'max RSS KB':>11} {'RSS +KB':>9}  samples")
+    for r in rows:
+        print(f"{r['backend']:<12} {r['ms_per_page']:>9} {r['python_peak_kb']:>11} {r['max_rss_kb']:>11} "
+              f"{r['rss_growth_kb']:>9}  {'pass' if r['passes_samples'] else 'FAIL'}")
+
+
+if __name__ == "__main__":
+    main()
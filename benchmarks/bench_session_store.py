@@ -0,0 +1,92 @@
+# benchmarks/bench_session_store.py
+"""
+Session cost per backend: walks upload -> review -> result -> download-pdf with
+Flask's test client and reports the largest Cookie header the browser would
+send, the stored payload size, and the time spent opening + saving the session
+on each request.
+
+    python benchmarks/bench_session_store.py --repeat 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.sessions import SecureCookieSessionInterface  # noqa: E402
+
+import app as webapp  # noqa: E402
+from session_store import encode_session, make_session_interface  # noqa: E402
+
+SAMPLE = os.path.join(webapp.UPLOAD_FOLDER, "GOVT_EMP_FORM_16_OR.pdf")
+USER_FORM = {"name": "Test User", "section_80c": "120000", "section_80d": "20000", "section_80ccd1b": "50000"}
+
+
+class TimedInterface:
+    """Wraps a session interface and accumulates the time spent in it."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def open_session(self, app, request):
+        start = time.perf_counter()
+        try:
+            return self.inner.open_session(app, request)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+
+    def save_session(self, app, session, response):
+        start = time.perf_counter()
+        try:
+            return self.inner.save_session(app, session, response)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def walk(client):
+    """One user journey; returns the largest Cookie header sent and the final session dict."""
+    largest = 0
+
+    def cookie_header():
+        return "; ".join(f"{c.key}={c.value}" for c in client._cookies.values())
+
+    with open(SAMPLE, "rb") as fh:
+        client.post("/upload", data={"file": (fh, "GOVT_EMP_FORM_16_OR.pdf"), **USER_FORM},
+                    content_type="multipart/form-data")
+    for method, path in (("get", "/review"), ("post", "/review"), ("get", "/result"), ("get", "/download-pdf")):
+        largest = max(largest, len(cookie_header()))
+        getattr(client, method)(path)
+    largest = max(largest, len(cookie_header()))
+    with client.session_transaction() as sess:
+        return largest, dict(sess)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Cookie size and per-request session overhead per backend.")
+    ap.add_argument("--repeat", type=int, default=50, help="journeys per backend")
+    args = ap.parse_args(argv)
+
+    default_interface = webapp.app.session_interface
+    print(f"{'backend':<8} {'cookie B':>9} {'payload B':>10} {'session µs/req':>15}")
+    for backend in ("cookie", "memory", "sqlite"):
+        inner = make_session_interface(backend) or SecureCookieSessionInterface()
+        timed = TimedInterface(inner)
+        webapp.app.session_interface = timed
+        walk(webapp.app.test_client())  # warm the parse cache and templates
+        timed.seconds, timed.calls = 0.0, 0
+        for _ in range(args.repeat):
+            cookie_bytes, data = walk(webapp.app.test_client())
+        payload = cookie_bytes if backend == "cookie" else len(encode_session(data))
+        print(f"{backend:<8} {cookie_bytes:>9} {payload:>10} {timed.seconds / timed.calls * 1e6:>15.0f}")
+    webapp.app.session_interface = default_interface
+
+
+if __name__ == "__main__":
+    main()
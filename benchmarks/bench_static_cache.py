@@ -0,0 +1,61 @@
+# benchmarks/bench_static_cache.py
+"""
+Bytes and server time per view of the explainer pages and static assets, with
+Flask's test client: rendering the template on every hit vs the pre-rendered
+page cache (full gzip response and a revalidation answered with 304), and each
+asset as identity vs its precompressed variants.
+
+    python benchmarks/bench_static_cache.py --repeat 500
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as webapp  # noqa: E402
+import static_cache  # noqa: E402
+
+PAGES = ["/chapter-VIA_Deductions", "/form-16_partA", "/form-16_partB", "/Gross_salary", "/old_new-regime", "/TDS"]
+
+
+def per_request(client, path: str, repeat: int, headers=None) -> tuple:
+    """(ms per request, response bytes, status) over `repeat` requests."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(path, headers=headers or {})
+    return (time.perf_counter() - start) / repeat * 1e3, len(response.data), response.status_code
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Explainer page and static asset cost with and without HTTP caching.")
+    ap.add_argument("--repeat", type=int, default=300)
+    args = ap.parse_args(argv)
+    if not static_cache.ENABLED:
+        raise SystemExit("FORM16_STATIC_CACHE is off; unset it to compare.")
+
+    client = webapp.app.test_client()
+    print(f"{'page':<24} {'render':>14} {'cached gzip':>18} {'304':>12}")
+    for path in PAGES:
+        static_cache.ENABLED = False  # the route renders its template, as before
+        render_ms, render_bytes, _ = per_request(client, path, args.repeat)
+        static_cache.ENABLED = True
+        gzip_ms, gzip_bytes, _ = per_request(client, path, args.repeat, {"Accept-Encoding": "gzip"})
+        etag = client.get(path, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+        hit_ms, _, status = per_request(client, path, args.repeat, {"Accept-Encoding": "gzip", "If-None-Match": etag})
+        print(f"{path:<24} {render_ms:6.3f} ms {render_bytes:5d} B "
+              f"{gzip_ms:6.3f} ms {gzip_bytes:5d} B {hit_ms:6.3f} ms {status}")
+
+    index = client.get("/").get_data(as_text=True)
+    print(f"\n{'asset':<40} {'identity':>9} {'gzip':>7} {'br':>7}")
+    for url in re.findall(r'(?:href|src)="(/static/[^"]+)"', index):
+        sizes = [len(client.get(url, headers={"Accept-Encoding": enc}).data) for enc in ("identity", "gzip", "br")]
+        print(f"{url:<40} {sizes[0]:9d} {sizes[1]:7d} {sizes[2]:7d}")
+    print(static_cache.assets.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
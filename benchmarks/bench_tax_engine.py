@@ -0,0 +1,47 @@
+# benchmarks/bench_tax_engine.py
+"""
+Throughput of the vectorized slab engine vs. the scalar per-income loop.
+
+    python benchmarks/bench_tax_engine.py --n 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_calculator import (  # noqa: E402
+    calculate_tax_new_regime, calculate_tax_old_regime, compute_tax_batch
+)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=1_000_000, help="number of incomes")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    incomes = rng.uniform(0, 3_000_000, size=args.n).round()
+    as_list = incomes.tolist()
+
+    print(f"{'regime':<6} {'scalar loop':>14} {'vectorized':>14} {'speedup':>9}")
+    for regime, scalar_fn in (("old", calculate_tax_old_regime), ("new", calculate_tax_new_regime)):
+        scalar, t_scalar = _timed(lambda: [scalar_fn(x) for x in as_list])
+        batch, t_batch = _timed(lambda: compute_tax_batch(incomes, regime)["final_tax"])
+        if scalar != batch.tolist():
+            raise SystemExit(f"{regime}: vectorized results differ from scalar loop")
+        print(f"{regime:<6} {args.n / t_scalar:>10,.0f} /s {args.n / t_batch:>10,.0f} /s {t_scalar / t_batch:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+# benchmarks/form16_corpus.py
+"""
+Synthetic Form 16 corpus for load tests: realistic old-regime ("STATEMENT OF
+TAXABLE INCOME") and new-regime ("FORM 16 (AS PER NEW REGIME)") PDFs drawn with
+ReportLab, each next to a ground-truth JSON holding the values parse_form16
+should extract.
+
+    python benchmarks/form16_corpus.py -o corpus/ -n 2000
+    python benchmarks/form16_corpus.py -o corpus/ -n 500 --regime new --seed 7
+    python benchmarks/form16_corpus.py -o bundles/ -n 300 --bundle traces_300.pdf
+
+Amounts, names, assessment years, number formatting (1240474 / 12,40,474),
+where the certificate breaks across pages and the number of trailing pay
+statement pages are all randomized from --seed, so a corpus is reproducible.
+The labels are the ones parser.py looks for; the ground truth is what is
+printed, so a field the parser cannot read shows up as an accuracy miss in
+load_test.py rather than being papered over here.
+
+--bundle writes the Form 16s one after another into a single PDF instead, the
+way TRACES hands employers a combined download, with the ground truth of each
+employee in order in <bundle>.jsonl.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import A4  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from tax_calculator import CESS_RATE, get_slab_table  # noqa: E402
+
+FIRST_NAMES = ["Rahul", "Priya", "Amit", "Sneha", "Vikram", "Anjali", "Rohan", "Kavya", "Arjun", "Meera",
+               "Suresh", "Pooja", "Nikhil", "Divya", "Karan", "Neha", "Manoj", "Ritu", "Sanjay", "Isha"]
+LAST_NAMES = ["Sharma", "Verma", "Patil", "Iyer", "Reddy", "Gupta", "Deshmukh", "Nair", "Joshi", "Kulkarni",
+              "Mehta", "Rao", "Singh", "Das", "Pillai", "Bose", "Chauhan", "Menon", "Shetty", "Pawar"]
+EMPLOYERS = ["XYZ COMPANY", "SUNRISE INFOTECH PVT LTD", "NAGPUR MUNICIPAL CORPORATION", "BHARAT STEEL WORKS",
+             "OFFICE OF THE DISTRICT COLLECTOR", "GREENFIELD PHARMA LTD", "CENTRAL RAILWAY DIVISION"]
+DESIGNATIONS = ["ASST. MANAGER", "CLERK", "ENGINEER", "TEACHER", "ACCOUNTANT", "SR. OFFICER", "ANALYST"]
+ASSESSMENT_YEARS = ["2024-2025", "2025-2026", "2026-2027"]
+MONTHS = ["MARCH", "APRIL", "MAY", "JUNE", "JULY", "AUGUST", "SEPTEMBER", "OCTOBER", "NOVEMBER",
+          "DECEMBER", "JANUARY", "FEBRUARY"]
+
+LINE_HEIGHT = 14
+TOP, BOTTOM = 800, 50
+
+
+# ---------- Figures ----------
+
+def _ay_key(ay: str) -> str:
+    return f"{ay[:4]}-{ay[-2:]}"
+
+
+def _tax(regime: str, ay: str, income: int) -> tuple:
+    """(slab tax after 87A rebate, cess) in whole rupees."""
+    final = get_slab_table(regime, _ay_key(ay)).final_tax(income)
+    tax = round(final / (1 + CESS_RATE))
+    return tax, final - tax
+
+
+def _amount(rng, value: int) -> str:
+    """Plain digits or Indian digit grouping (12,40,474), like the forms in the wild."""
+    if value < 1000 or rng.random() < 0.6:
+        return str(value)
+    s = str(value)
+    head, tail = s[:-3], s[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    return ",".join(([head] if head else []) + groups + [tail])
+
+
+def _employee(rng) -> dict:
+    return {
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "employer": rng.choice(EMPLOYERS),
+        "designation": rng.choice(DESIGNATIONS),
+        "pan": "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(5))
+               + f"{rng.randrange(10000):04d}" + rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
+        "ay": rng.choice(ASSESSMENT_YEARS),
+        "gross": rng.randrange(300_000, 4_000_000),
+    }
+
+
+# ---------- Layouts ----------
+#
+# A layout is a list of rows: (label, amount or None). Amounts are right-aligned
+# on the same baseline, which text extraction joins onto the label's line.
+
+def _old_regime(rng, emp) -> tuple:
+    gross = emp["gross"]
+    basic = int(gross * rng.uniform(0.6, 0.9))
+    perquisites = gross - basic
+    standard = 50000
+    hra = rng.choice([0, 0, rng.randrange(10_000, 120_000)])
+    hra = min(hra, max(0, gross - standard))
+    prof_tax = rng.choice([0, 2400, 2500])
+    salaries = max(0, gross - standard - hra - prof_tax)
+    c80 = min(150_000, rng.randrange(0, 200_000))
+    d80 = rng.choice([0, 0, rng.randrange(5_000, 25_001)])
+    chapter_via = c80 + d80
+    total_income = max(0, salaries - chapter_via)
+    tax, cess = _tax("old", emp["ay"], total_income)
+    tds = max(101, int((tax + cess) * rng.uniform(0.5, 1.2)))
+    balance = tax + cess - tds
+    a = lambda v: _amount(rng, v)  # noqa: E731
+
+    rows = [
+        ("STATEMENT OF TAXABLE INCOME", None),
+        ("form no 16", None),
+        ("Certificate under section 203 of the Income Tax Act 1961 for tax deducted at source", None),
+        (f"OFFICE:- {emp['employer'].title()}", None),
+        (f"{emp['name']} POST :- {emp['designation']}", None),
+        (f"TAN NO :- {emp['pan'][:4]}0{rng.randrange(1000, 9999)}C", None),
+        (f"Pan No. :- {emp['pan']}", None),
+        (f"ASSESSMENT YEAR : {emp['ay']}", None),
+        (f"Period 01/04/{int(emp['ay'][:4]) - 1} to 31/03/{emp['ay'][:4]}", None),
+        ("DETAIL OF SALARY PAID AND ANY OTHER INCOME AND TAX DEDUCTED", None),
+        ("1 GROSS SALARY", None),
+        ("(a) Salary as per provisions contained in section 17(1) Rs.", a(basic)),
+        ("(b) Value of perquisites under section 17(2) as per form No.12 BA Rs.", a(perquisites)),
+        ("(c) Profits in lieu of salary under section 17(3) Rs.", "0"),
+        ("Total Rs.", a(gross)),
+        (f"New Standard Deductions Rs. {a(standard)}/- [As per Budget 2018]", None),
+        ("2 Allowances to the extent exempt under section 10 (a) H.R.A. Rs.", a(hra)),
+        ("3 Balance (1-2) Rs.", a(gross - standard - hra)),
+        ("4 Deductions under U/S 16 (a) Pro. Tax on Employment Rs.", a(prof_tax)),
+        ("5 Income chargable under the head salaries (3-4) Rs.", a(salaries)),
+        ("6 Deductions under chapter VI-A", None),
+        ("(A) U/S 80C PPF / PLI / LIC / Tuition fees Rs.", a(c80)),
+        ("(B) Section 80D (insurance Premium) Rs.", a(d80)),
+        ("Aggregate of deductable amount under chapter VI - A Rs.", a(chapter_via)),
+        ("7 Total Income (5-6) Rs.", a(total_income)),
+        ("8 Tax on Total Income Rs.", a(tax)),
+        ("9 Total Tax Payable Rs.", a(tax)),
+        ("10 Health & Education cess @4% Rs.", a(cess)),
+        ("11 Tax payable (9+10) Rs.", a(tax + cess)),
+        ("12 Less Tax Deducted at Source Rs.", a(tds)),
+        ("13 Balance Tax Payable / Refundable (11-12) Rs.", ("-" if balance < 0 else "") + a(abs(balance))),
+        ("(Old Tax Slab)", None),
+    ]
+    truth = {
+        "regime": "old",
+        "employee_name": emp["name"],
+        "assessment_year": emp["ay"],
+        "gross_salary": gross,
+        "standard_deduction": standard,
+        "taxable_income": salaries,
+        "tds_deducted": tds,
+        "total_tax_payable": tax,
+        "refund": max(0, -balance),
+    }
+    return rows, truth
+
+
+def _new_regime(rng, emp) -> tuple:
+    gross = emp["gross"]
+    standard = get_slab_table("new", _ay_key(emp["ay"])).standard_deduction
+    taxable = max(0, gross - standard)
+    tax, cess = _tax("new", emp["ay"], taxable)
+    payable = tax + cess
+    tds = int(payable * rng.uniform(0.8, 1.1))
+    jan = int(tds * rng.uniform(0.6, 0.9))
+    refund = max(0, tds - payable)
+    quarters = [tds // 4] * 3 + [tds - 3 * (tds // 4)]
+    a = lambda v: _amount(rng, v)  # noqa: E731
+
+    rows = [
+        ("FORM 16 (AS PER NEW REGIME)", None),
+        ("See Rule 31 (1) (a)", None),
+        ("NAME AND ADDRESS OF EMPLOYER", "NAME AND ADDRESS OF EMPLOYEE"),
+        (emp["employer"], emp["name"].upper()),
+        (f"NAME OF EMPLOYEE : {emp['name'].upper()}", None),
+        (f"DESIGNATION : {emp['designation']}", None),
+        (f"PAN NO - {emp['pan']}", None),
+        (f"PERIOD 01-04-{int(emp['ay'][:4]) - 1} TO 31-03-{emp['ay'][:4]} (AY {emp['ay']})", None),
+        ("Quarter / Amount of tax deducted in respect of the employee", None),
+        *((f"Quarter {i + 1}", a(q)) for i, q in enumerate(quarters)),
+        ("Total", a(tds)),
+        ("1 GROSS SALARY", a(gross)),
+        ("2 Standard Deduction", a(standard)),
+        ("3 TOTAL CHARGABLE INCOME", a(taxable)),
+        ("TAX ON TOTAL INCOME: TAX THEREON", a(tax)),
+        ("4 HEALTH AND EDUCATION CESS 4% ON 3", a(cess)),
+        ("5 TAX PAYABLE (3+4)", a(payable)),
+        ("6 U/S 89 RELIEF ATTACH DETAILS", "0"),
+        ("7 NET TAX PAYABLE (5-6)", a(payable)),
+        ("8 NET TAX PAYABLE (in round figure)", a(payable)),
+        (f"9 (TDS) TOTAL TAX DEDUCTED BY {emp['employer']} TILL JANUARY NEXT YEAR", a(jan)),
+        (f"10 (TDS) TOTAL TAX DEDUCTED BY {emp['employer']} TILL FEBRUARY NEXT YEAR", a(tds - jan)),
+        ("11 U/S192 (1) TOTAL TAX PAID i.e. TDS (9+10)", a(tds)),
+        ("12 REFUND", a(refund)),
+        ("VERIFICATION", None),
+        (f"A SUM OF RUPEES {a(tds)}/- DEPOSITED TO THE CENTRAL GOVERNMENT.", None),
+    ]
+    truth = {
+        "regime": "new",
+        "employee_name": emp["name"].upper(),
+        "assessment_year": emp["ay"],
+        "gross_salary": gross,
+        "standard_deduction": standard,
+        "taxable_income": taxable,
+        "tds_deducted": tds,
+        "total_tax_payable": payable,
+        "refund": refund,
+    }
+    return rows, truth
+
+
+def _pay_statement(rng, emp, months) -> list:
+    """Monthly pay rows: bulk pages with no labels the parser looks for."""
+    basic = emp["gross"] // 12
+    rows = [("SALARY STATEMENT OF PAY AND ALLOWANCES", None),
+            ("MONTH YEAR BASIC D.A. H.R.A. T.A. TOTAL", None)]
+    for month in months:
+        da, hra, ta = int(basic * 0.1), int(basic * 0.2), rng.randrange(500, 5000)
+        rows.append((f"{month} {emp['ay'][:4]} {basic} {da} {hra} {ta}", str(basic + da + hra + ta)))
+    return rows
+
+
+# ---------- Drawing ----------
+
+def draw_pdf(path: str, pages: list):
+    """pages: lists of (left text, right text or None) rows."""
+    pdf = canvas.Canvas(path, pagesize=A4, pageCompression=1)
+    pdf.setTitle("Form 16")
+    _draw_pages(pdf, pages)
+    pdf.save()
+
+
+def _draw_pages(pdf, pages: list):
+    for rows in pages:
+        pdf.setFont("Helvetica", 9)
+        y = TOP
+        for left, right in rows:
+            if y < BOTTOM:
+                pdf.showPage()
+                pdf.setFont("Helvetica", 9)
+                y = TOP
+            pdf.drawString(40, y, left)
+            if right is not None:
+                if right.startswith("NAME AND") or not right.replace(",", "").lstrip("-").isdigit():
+                    pdf.drawString(320, y, right)
+                else:
+                    pdf.drawRightString(555, y, right)
+            y -= LINE_HEIGHT
+        pdf.showPage()
+
+
+def form16_pages(index: int, seed: int, regime: str) -> tuple:
+    """(regime, pages, truth) of one synthetic Form 16."""
+    rng = random.Random(f"{seed}-{index}")
+    regime = regime if regime in ("old", "new") else rng.choice(["old", "new"])
+    emp = _employee(rng)
+    rows, truth = (_old_regime if regime == "old" else _new_regime)(rng, emp)
+
+    # break the certificate across two pages at a random row, then 0-3 pay statement pages
+    pages = [rows]
+    if rng.random() < 0.3:
+        cut = rng.randrange(4, len(rows) - 2)
+        pages = [rows[:cut], rows[cut:]]
+    for _ in range(rng.choice([0, 0, 1, 1, 2, 3])):
+        pages.append(_pay_statement(rng, emp, MONTHS))
+    return regime, pages, truth
+
+
+def make_form16(index: int, seed: int, regime: str, out_dir: str) -> dict:
+    """Draw one Form 16 and its ground truth; returns the manifest entry."""
+    regime, pages, truth = form16_pages(index, seed, regime)
+    stem = f"form16_{index:06d}_{regime}"
+    pdf_path = os.path.join(out_dir, stem + ".pdf")
+    draw_pdf(pdf_path, pages)
+    with open(os.path.join(out_dir, stem + ".json"), "w", encoding="utf-8") as fh:
+        json.dump(truth, fh, indent=2)
+        fh.write("\n")
+    return {"pdf": stem + ".pdf", "truth": stem + ".json", "regime": regime, "pages": len(pages)}
+
+
+def generate(out_dir: str, count: int, seed: int = 42, regime: str = "mixed", workers: int = None) -> list:
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        entries = list(pool.map(
+            make_form16, range(count), [seed] * count, [regime] * count, [out_dir] * count, chunksize=16,
+        ))
+    with open(os.path.join(out_dir, "manifest.jsonl"), "w", encoding="utf-8") as fh:
+        for entry in entries:
+            fh.write(json.dumps(entry) + "\n")
+    return entries
+
+
+def generate_bundle(out_dir: str, name: str, count: int, seed: int = 42, regime: str = "mixed") -> list:
+    """All `count` Form 16s in one PDF; returns the per-employee truth, in order."""
+    os.makedirs(out_dir, exist_ok=True)
+    pdf = canvas.Canvas(os.path.join(out_dir, name), pagesize=A4, pageCompression=1)
+    pdf.setTitle("Form 16 bundle")
+    truths = []
+    for index in range(count):
+        _, pages, truth = form16_pages(index, seed, regime)
+        _draw_pages(pdf, pages)
+        truths.append(truth)
+    pdf.save()
+    with open(os.path.join(out_dir, os.path.splitext(name)[0] + ".jsonl"), "w", encoding="utf-8") as fh:
+        for truth in truths:
+            fh.write(json.dumps(truth) + "\n")
+    return truths
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate synthetic Form 16 PDFs with ground-truth JSON.")
+    ap.add_argument("-o", "--output", required=True, help="directory to write PDFs, JSON and manifest.jsonl")
+    ap.add_argument("-n", "--count", type=int, default=1000)
+    ap.add_argument("--regime", choices=["old", "new", "mixed"], default="mixed")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--workers", type=int, help="worker processes (default: number of cores)")
+    ap.add_argument("--bundle", metavar="NAME.pdf", help="write all Form 16s into this one combined PDF")
+    args = ap.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.bundle:
+        truths = generate_bundle(args.output, args.bundle, args.count, args.seed, args.regime)
+        old = sum(1 for t in truths if t["regime"] == "old")
+        print(f"bundle of {len(truths)} Form 16s ({old} old, {len(truths) - old} new regime) in "
+              f"{time.perf_counter() - start:.1f}s -> {os.path.join(args.output, args.bundle)}", file=sys.stderr)
+        return
+    entries = generate(args.output, args.count, args.seed, args.regime, args.workers)
+    seconds = time.perf_counter() - start
+    old = sum(1 for e in entries if e["regime"] == "old")
+    print(f"{len(entries)} PDFs ({old} old, {len(entries) - old} new regime, "
+          f"{sum(e['pages'] for e in entries)} pages) in {seconds:.1f}s -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
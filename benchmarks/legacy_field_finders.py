@@ -0,0 +1,267 @@
+# benchmarks/legacy_field_finders.py
+"""
+Frozen copy of the per-field finder chains that parser.py used before the
+single-pass field scanner, kept as the baseline for bench_field_scanner.py.
+PASSES counts how many times the full document text is walked.
+"""
+import re
+
+PASSES = [0]
+
+# ---------- Small helpers ----------
+
+def _clean_num(s: str) -> int:
+    """Convert a numeric-looking string like '1,23,456' or '₹ 50,000' to int safely."""
+    if s is None:
+        return 0
+    s = s.replace(",", "").replace("₹", "").strip()
+    m = re.search(r"-?\d+", s)
+    return int(m.group()) if m else 0
+
+def _last_int_in_line(line: str) -> int:
+    """Return the last integer-looking token in a line."""
+    nums = re.findall(r"(\d[\d,]*)", line)
+    return _clean_num(nums[-1]) if nums else 0
+
+def _first_int_after_label_in_line(pattern: str, text: str, default=0) -> int:
+    """
+    Find a line matching 'pattern', then return the FIRST integer that appears
+    AFTER the match. Useful when the last number isn't the right one.
+    """
+    PASSES[0] += 1
+    pat = re.compile(pattern, re.IGNORECASE)
+    for line in text.splitlines():
+        m = pat.search(line)
+        if m:
+            m2 = re.search(r"(\d[\d,]*)", line[m.end():])
+            if m2:
+                return _clean_num(m2.group(1))
+    return default
+
+def _value_from_labeled_line(text: str, label_patterns, default=0) -> int:
+    """
+    Search line by line; for the first line that matches any label pattern,
+    return the LAST integer on that line.
+    """
+    PASSES[0] += 1
+    if isinstance(label_patterns, str):
+        label_patterns = [label_patterns]
+    compiled = [re.compile(p, re.IGNORECASE) for p in label_patterns]
+    for line in text.splitlines():
+        if any(p.search(line) for p in compiled):
+            return _last_int_in_line(line)
+    return default
+
+# ---------- Field finders ----------
+#
+# Each regime is described as {field: ([finder, fallback, ...], default)}.
+# A finder returns the field's value, or None when the text doesn't settle it;
+# the first non-None finder wins. Finders only ever look forward from the first
+# matching label, so a value found in the first N pages is the same value the
+# full document would give -- that is what lets streaming mode stop early.
+
+def _labeled(*patterns):
+    return lambda text: _value_from_labeled_line(text, list(patterns), default=None)
+
+def _first_after(pattern):
+    return lambda text: _first_int_after_label_in_line(pattern, text, default=None)
+
+def _nonzero(finder):
+    return lambda text: finder(text) or None
+
+def _ay(pattern, flags=re.IGNORECASE):
+    def find(text):
+        PASSES[0] += 1
+        m = re.search(pattern, text, flags)
+        return m.group(1).replace("–", "-").replace(" ", "") if m else None
+    return find
+
+# ---------- New Regime parser ----------
+
+def _nr_name_from_header(text: str):
+    PASSES[0] += 1
+    # Employee name (two-column header: Employer | Employee)
+    m = re.search(
+        r"NAME\s+AND\s+ADDRESS\s+OF\s+EMPLOYER.*?NAME\s+AND\s+ADDRESS\s+OF\s+EMPLOYEE.*?\n([^\n]+)",
+        text, re.IGNORECASE
+    )
+    if m:
+        row = m.group(1).strip()
+        cols = re.split(r"\s{2,}", row)  # split columns by 2+ spaces
+        if len(cols) >= 2:
+            return cols[-1].strip()
+    return None
+
+def _nr_name_from_label(text: str):
+    PASSES[0] += 1
+    m = re.search(r"NAME\s+OF\s+EMPLOYEE\s*[:\-]?\s*([A-Z][A-Za-z .]+)", text, re.IGNORECASE)
+    return m.group(1).strip() if m else None
+
+def _nr_tds_from_months(text: str):
+    # Sum JAN + FEB lines if present
+    jan = _value_from_labeled_line(text, r"JANUARY\s+NEXT\s+YEAR.*\(TDS\)")
+    feb = _value_from_labeled_line(text, r"FEBRUARY\s+NEXT\s+YEAR.*\(TDS\)")
+    return (jan or 0) + (feb or 0)
+
+_NEW_REGIME_FIELDS = {
+    "employee_name": ([_nr_name_from_header, _nr_name_from_label], "Not Found"),
+    # Assessment Year – take (AY 2025-2026) if present; else fallback to ASSESS.YEAR
+    "assessment_year": ([
+        _ay(r"\(AY\s*([0-9]{4}\s*[–-]\s*[0-9]{4})\)"),
+        _ay(r"ASSESS\.?\s*YEAR\s*[:\-]?\s*([0-9]{4}\s*[–-]\s*[0-9]{4})"),
+    ], "Not Found"),
+    # Line-based numeric extraction to avoid picking "(5-6)" as 5
+    "gross_salary": ([_labeled(r"\bGROSS\s+SALARY\b")], 0),
+    "standard_deduction": ([_labeled(r"Standard\s+Deduction")], 0),
+    "taxable_income": ([_labeled(r"TOTAL\s+CHARGABLE\s+INCOME")], 0),
+    # TDS: prefer "TDS (9+10)"; else the "TOTAL TAX DEDUCTED BY XYZ COMPANY" line; else JAN+FEB
+    "tds_deducted": ([
+        _nonzero(_labeled(r"TDS\s*\(9\+10\)")),
+        _nonzero(_labeled(r"TOTAL\s+TAX\s+DEDUCTED.*XYZ\s+COMPANY")),
+        _nr_tds_from_months,
+    ], 0),
+    # Total tax payable (prefer the "in round figure" line; else use (5-6) or (3+4))
+    "total_tax_payable": ([_labeled(
+        r"NET\s+TAX\s+PAYABLE\s*\(in\s*round\s*figure\)", r"NET\s+TAX\s+PAYABLE\s*\(5-6\)", r"TAX\s+PAYABLE\s*\(3\+4\)"
+    )], 0),
+    "refund": ([_labeled(r"\bREFUND\b")], 0),
+}
+
+# ---------- Old Regime parser ----------
+
+def _or_name_from_office(text: str):
+    PASSES[0] += 1
+    # Preferred: two-column "OFFICE:- <Employer>   <Employee>"
+    for line in text.splitlines():
+        if re.search(r"OFFICE\s*:-", line, re.IGNORECASE):
+            parts = re.split(r"\s{2,}", line.strip())
+            if len(parts) >= 2:
+                return parts[-1].strip()
+    return None
+
+def _or_name_from_post(text: str):
+    PASSES[0] += 1
+    # Next best: a line like: "   ABC   POST :- ASST. MANAGER"
+    for line in text.splitlines():
+        m = re.search(r"^\s*([A-Z][A-Za-z .]+)\s+POST\s*:-", line.strip())
+        if m:
+            return m.group(1).strip()
+    return None
+
+def _or_name_from_label(text: str):
+    PASSES[0] += 1
+    # Last fallback: "NAME :- <something>" (may be employer in header)
+    for line in text.splitlines():
+        m = re.search(r"^NAME\s*[:-]\s*([A-Za-z .]+)$", line.strip(), re.IGNORECASE)
+        if m:
+            return m.group(1).strip()
+    return None
+
+def _extract_or_name(text: str) -> str:
+    return _or_name_from_office(text) or _or_name_from_post(text) or _or_name_from_label(text) or "Not Found"
+
+def _find_or_tds(text: str):
+    """
+    "Less Tax Deducted at Source" value may be on the next line.
+    Scan a few lines starting where the label appears and pick a plausible amount.
+    """
+    PASSES[0] += 1
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        if re.search(r"Less.*?Tax\s+Deducted\s+at\s+Source", line, re.IGNORECASE):
+            for j in range(i, min(i + 4, len(lines))):
+                nums = re.findall(r"(\d[\d,]*)", lines[j])
+                # choose last plausible amount > 100
+                for num in reversed(nums):
+                    val = _clean_num(num)
+                    if val > 100:
+                        return val
+    return None
+
+def _extract_or_tds(text: str) -> int:
+    return _find_or_tds(text) or 0
+
+def _or_ay(text: str):
+    PASSES[0] += 1
+    for line in text.splitlines():
+        m = re.search(r"^ASSESSMENT\s+YEAR\s*[:-]\s*([0-9]{4}\s*[–-]\s*[0-9]{4})", line.strip(), re.IGNORECASE)
+        if m:
+            return m.group(1).replace("–", "-").replace(" ", "")
+    return None
+
+def _rs_after(pattern):
+    def find(text):
+        PASSES[0] += 1
+        m = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        return _clean_num(m.group(1)) if m else None
+    return find
+
+def _or_refund(text: str):
+    PASSES[0] += 1
+    # Refund: "Balance Tax Payable / Refundable (17 - 18) Rs. <val>"
+    # If val < 0 => refund = -val, else refund = 0
+    for line in text.splitlines():
+        if re.search(r"Balance\s+Tax\s+Payable\s*/\s*Refundable", line, re.IGNORECASE):
+            return max(0, -_last_int_in_line(line))
+    return None
+
+_OLD_REGIME_FIELDS = {
+    "employee_name": ([_or_name_from_office, _or_name_from_post, _or_name_from_label], "Not Found"),
+    "assessment_year": ([_or_ay], "Not Found"),
+    # Gross salary: "1 GROSS SALARY ... Total Rs. 1066058"
+    "gross_salary": ([_rs_after(r"1\s+GROSS\s+SALARY.*?Total\s+Rs\.\s*([\d,]+)")], 0),
+    # Standard deduction: take the first number after the label on that line
+    "standard_deduction": ([_first_after(r"New\s+Standard\s+Deductions?")], 0),
+    # Taxable income: "Income chargeable under the head salaries (3-4) Rs. 1013558"
+    "taxable_income": ([_rs_after(r"Income\s+charg[ea]ble\s+under\s+the\s+head\s+salaries.*?Rs\.\s*([\d,]+)")], 0),
+    # TDS (Less Tax Deducted at Source)
+    "tds_deducted": ([_find_or_tds], 0),
+    "total_tax_payable": ([_first_after(r"Total\s+Tax\s+Payable")], 0),
+    "refund": ([_or_refund], 0),
+}
+
+FIELD_NAMES = tuple(_NEW_REGIME_FIELDS)
+
+def _resolve_fields(specs: dict, text: str, fields=None, found=None) -> dict:
+    """Run each field's finder chain over the full text, falling back to its default."""
+    found = found or {}
+    out = {}
+    for name, (finders, default) in specs.items():
+        if fields is not None and name not in fields:
+            continue
+        value = found.get(name)
+        for finder in finders:
+            if value is not None:
+                break
+            value = finder(text)
+        if value is None:
+            value = default
+        out[name] = int(value or 0) if isinstance(default, int) else value
+    return out
+
+def _parse_new_regime(text: str) -> dict:
+    return {"regime": "new", **_resolve_fields(_NEW_REGIME_FIELDS, text)}
+
+def _parse_old_regime(text: str) -> dict:
+    return {"regime": "old", **_resolve_fields(_OLD_REGIME_FIELDS, text)}
+
+_REGIME_FIELDS = {"new": _NEW_REGIME_FIELDS, "old": _OLD_REGIME_FIELDS}
+
+# ---------- Regime detection ----------
+
+def _detect_regime(text: str, final: bool = True):
+    """Return 'new'/'old' from explicit cues; without one, None (or the heuristic guess if final)."""
+    if re.search(r"FORM\s*16\s*\(AS\s*PER\s*NEW\s*REGIME\)", text, re.IGNORECASE) or \
+       re.search(r"\bNEW\s+REGIME\b", text, re.IGNORECASE) or \
+       "TDS (9+10)" in text:
+        return "new"
+
+    if re.search(r"\(Old\s*Tax\s*Slab\)", text, re.IGNORECASE) or \
+       re.search(r"STATEMENT\s+OF\s+TAXABLE\s+INCOME", text, re.IGNORECASE):
+        return "old"
+
+    if not final:
+        return None
+    # Fallback heuristic
+    return "new" if "NET TAX PAYABLE (5-6)" in text else "old"
+
@@ -0,0 +1,208 @@
+# benchmarks/load_test.py
+"""
+Load driver: replays a form16_corpus.py corpus against /api/analyze-form16 at a
+chosen concurrency and reports throughput, latency percentiles and extraction
+accuracy against the corpus ground truth.
+
+    python benchmarks/load_test.py corpus/ --concurrency 8 --requests 2000
+    python benchmarks/load_test.py corpus/ --url http://localhost:5000 --concurrency 32
+    python benchmarks/load_test.py corpus/ --files-per-request 10 --json load.json
+
+Without --url the app is driven in-process through Flask's test client (one
+client per worker thread), which measures the request path without a server;
+point --url at gunicorn to measure a real deployment. --no-cache turns off the
+Form 16 parse cache for in-process runs so repeated files are parsed again.
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINT = "/api/analyze-form16"
+
+
+def load_corpus(corpus_dir: str, limit: int = None) -> list:
+    """[(file name, pdf bytes, truth dict)] in manifest order."""
+    items = []
+    with open(os.path.join(corpus_dir, "manifest.jsonl"), encoding="utf-8") as fh:
+        for line in itertools.islice(fh, limit):
+            entry = json.loads(line)
+            with open(os.path.join(corpus_dir, entry["pdf"]), "rb") as pdf:
+                data = pdf.read()
+            with open(os.path.join(corpus_dir, entry["truth"]), encoding="utf-8") as truth:
+                items.append((entry["pdf"], data, json.load(truth)))
+    return items
+
+
+# ---------- Transports ----------
+
+class HttpTransport:
+    def __init__(self, base_url: str, timeout: float = 60):
+        self.url = base_url.rstrip("/") + ENDPOINT
+        self.timeout = timeout
+
+    def post(self, files):
+        boundary = uuid.uuid4().hex
+        body = b"".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="form16"; filename="{name}"\r\n'
+            f"Content-Type: application/pdf\r\n\r\n".encode() + data + b"\r\n"
+            for name, data in files
+        ) + f"--{boundary}--\r\n".encode()
+        req = urllib.request.Request(self.url, data=body, method="POST", headers={
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+        })
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return resp.status, json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b"{}")
+
+
+class InProcessTransport:
+    def __init__(self):
+        import app as webapp
+        self.app = webapp.app
+        self._local = threading.local()
+
+    def post(self, files):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        resp = client.post(ENDPOINT, data={"form16": [(io.BytesIO(data), name) for name, data in files]},
+                           content_type="multipart/form-data")
+        return resp.status_code, resp.get_json() or {}
+
+
+# ---------- Run ----------
+
+def _matches(truth, value) -> bool:
+    return str(truth) == str(value)
+
+
+def run(transport, items: list, requests: int, concurrency: int, files_per_request: int = 1) -> dict:
+    batches = itertools.cycle(range(0, len(items), files_per_request))
+    next_lock = threading.Lock()
+    remaining = [requests]
+    latencies, errors = [], []
+    fields_total, fields_ok = {}, {}
+    docs = [0, 0]  # documents checked, documents fully correct
+    record_lock = threading.Lock()
+
+    def worker():
+        while True:
+            with next_lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+                start_index = next(batches)
+            batch = items[start_index:start_index + files_per_request]
+            start = time.perf_counter()
+            try:
+                status, payload = transport.post([(name, data) for name, data, _ in batch])
+            except Exception as e:  # connection refused, timeouts ...
+                status, payload = None, {"error": f"{type(e).__name__}: {e}"}
+            elapsed = time.perf_counter() - start
+
+            with record_lock:
+                latencies.append(elapsed)
+                if status != 200:
+                    errors.append(f"{status}: {payload.get('error')}")
+                    continue
+                for (_, _, truth), result in zip(batch, payload.get("results", [])):
+                    if "error" in result:
+                        errors.append(f"{result['file']}: {result['error']}")
+                        continue
+                    parsed = result["parsed_data"]
+                    docs[0] += 1
+                    exact = True
+                    for field, expected in truth.items():
+                        ok = _matches(expected, parsed.get(field))
+                        fields_total[field] = fields_total.get(field, 0) + 1
+                        fields_ok[field] = fields_ok.get(field, 0) + ok
+                        exact &= ok
+                    docs[1] += exact
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "documents": docs[0],
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "concurrency": concurrency,
+        "files_per_request": files_per_request,
+        "seconds": round(wall, 3),
+        "requests_per_sec": round(len(latencies) / wall, 2) if wall else 0.0,
+        "documents_per_sec": round(docs[0] / wall, 2) if wall else 0.0,
+        "latency_ms": {f"p{p}": round(percentile(ordered, p) * 1e3, 2) for p in (50, 95, 99)},
+        "accuracy": {
+            "documents_exact": round(docs[1] / docs[0], 4) if docs[0] else None,
+            "fields": {f: round(fields_ok[f] / n, 4) for f, n in fields_total.items()},
+        },
+    }
+
+
+def percentile(ordered: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a synthetic Form 16 corpus against the analyze API.")
+    ap.add_argument("corpus", help="directory written by form16_corpus.py")
+    ap.add_argument("--url", help="base URL of a running app (default: drive the app in-process)")
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--requests", type=int, help="requests to send (default: one pass over the corpus)")
+    ap.add_argument("--files-per-request", type=int, default=1)
+    ap.add_argument("--limit", type=int, help="only load the first N corpus entries")
+    ap.add_argument("--no-cache", action="store_true", help="in-process only: disable the parse cache")
+    ap.add_argument("--json", help="also write the report to this file")
+    args = ap.parse_args(argv)
+
+    if args.no_cache:
+        os.environ["FORM16_CACHE_DIR"] = ""
+        os.environ["FORM16_CACHE_ENTRIES"] = "0"
+    items = load_corpus(args.corpus, args.limit)
+    transport = HttpTransport(args.url) if args.url else InProcessTransport()
+    requests = args.requests or -(-len(items) // args.files_per_request)
+    report = run(transport, items, requests, args.concurrency, args.files_per_request)
+
+    lat = report["latency_ms"]
+    print(f"{report['requests']} requests ({report['documents']} PDFs) in {report['seconds']}s "
+          f"at concurrency {report['concurrency']}: {report['requests_per_sec']} req/s, "
+          f"{report['documents_per_sec']} PDFs/s")
+    print(f"latency ms  p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}")
+    acc = report["accuracy"]
+    if acc["documents_exact"] is not None:
+        print(f"accuracy    {acc['documents_exact']:.1%} of PDFs exact; per field: "
+              + ", ".join(f"{f} {v:.1%}" for f, v in acc["fields"].items()))
+    if report["errors"]:
+        print(f"{report['errors']} errors, e.g. {report['error_samples'][0]}", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# benchmarks/startup.py
+"""
+Cold-start benchmark: how long a fresh interpreter takes to import app.py and
+serve its first request, checked against a budget.
+
+    python benchmarks/startup.py                      # 5 fresh processes, default budget
+    python benchmarks/startup.py --budget-ms 300 --runs 10
+    python benchmarks/startup.py --top 25             # import-time report (python -X importtime)
+    python benchmarks/startup.py --json startup.json
+
+Each run is a new plain `python` process, so nothing is cached in memory
+between runs (the OS page cache still is). The import-time report comes from
+one extra `python -X importtime` run, kept out of the budgeted timings since
+that instrumentation slows imports down considerably. Exits non-zero when the
+median import time is over budget or one of the heavy, lazily loaded modules
+(ReportLab, numpy, pdfplumber, PyMuPDF) gets imported by app.py itself.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_MS = 300
+LAZY_MODULES = ("reportlab", "numpy", "pdfplumber", "fitz", "pymupdf", "concurrent.futures.process")
+
+_CHILD = f"""
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.app.test_client().get("/TDS")
+served = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1e3,
+    "first_request_ms": (served - imported) * 1e3,
+    "lazy_loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once(importtime: bool = False) -> dict:
+    """One fresh interpreter; with importtime, also its per-module import times (the timings are then inflated)."""
+    env = dict(os.environ, FORM16_WARMUP="0")
+    flags = ["-X", "importtime"] if importtime else []
+    proc = subprocess.run([sys.executable, *flags, "-c", _CHILD], cwd=BASE_DIR, env=env,
+                          capture_output=True, text=True, check=True)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if importtime:
+        result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def parse_importtime(stderr: str) -> dict:
+    """{module: (self µs, cumulative µs)} from `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure app.py cold start against a budget.")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                    help=f"median import time allowed (default {DEFAULT_BUDGET_MS})")
+    ap.add_argument("--top", type=int, default=15, help="modules to list in the import-time report")
+    ap.add_argument("--json", help="also write the results to this file")
+    args = ap.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.runs)]
+    import_ms = statistics.median(r["import_ms"] for r in runs)
+    first_ms = statistics.median(r["first_request_ms"] for r in runs)
+    lazy_loaded = sorted({m for r in runs for m in r["lazy_loaded"]})
+
+    # import-time report from a separate instrumented run, modules by cumulative time
+    imports = run_once(importtime=True)["imports"]
+    top = sorted(imports.items(), key=lambda kv: kv[1][1], reverse=True)[:args.top]
+    print(f"{'module':<40} {'self ms':>9} {'cumul. ms':>10}")
+    for name, (self_us, cumulative_us) in top:
+        print(f"{name:<40} {self_us / 1e3:>9.1f} {cumulative_us / 1e3:>10.1f}")
+    print()
+    print(f"import app   median {import_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print(f"first request (GET /TDS) median {first_ms:.1f} ms")
+
+    failures = []
+    if import_ms > args.budget_ms:
+        failures.append(f"import time {import_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    if lazy_loaded:
+        failures.append(f"imported at startup but should load lazily: {', '.join(lazy_loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({
+                "import_ms": round(import_ms, 2),
+                "first_request_ms": round(first_ms, 2),
+                "budget_ms": args.budget_ms,
+                "runs": args.runs,
+                "lazy_loaded": lazy_loaded,
+                "top_imports_ms": {n: round(c / 1e3, 2) for n, (_, c) in top},
+            }, fh, indent=2)
+            fh.write("\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
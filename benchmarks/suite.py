@@ -0,0 +1,327 @@
+# benchmarks/suite.py
+"""
+Microbenchmark suite with JSON baselines.
+
+Each case times one hot path (parsing, slab tax, deductions, regime comparison,
+report rendering, the upload -> review -> result flow) and records per-call
+min / median / stdev over several rounds. Save a run as a baseline, then
+compare a later run against it; cases whose median got slower than the
+threshold are flagged and the command exits non-zero.
+
+    python benchmarks/suite.py run --save benchmarks/baselines/main.json
+    python benchmarks/suite.py compare benchmarks/baselines/main.json             # runs the suite now
+    python benchmarks/suite.py compare benchmarks/baselines/main.json new.json --threshold 0.10
+    python benchmarks/suite.py list
+
+Baselines are only comparable on the same machine and Python; the metadata in
+each file records which. The suite runs against a scratch directory (parse
+cache, session/job database) and an in-memory layout cache, so it neither reads
+nor pollutes the repo's .cache/.
+"""
+import argparse
+import atexit
+import fnmatch
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# set before any case imports the app modules, which read these at import
+SCRATCH_DIR = tempfile.mkdtemp(prefix="form16-suite-")
+atexit.register(shutil.rmtree, SCRATCH_DIR, True)
+os.environ.update({
+    "FORM16_CACHE_DIR": os.path.join(SCRATCH_DIR, "form16"),
+    "FORM16_LAYOUT_CACHE_FILE": "",
+    "FORM16_SESSION_DB": os.path.join(SCRATCH_DIR, "sessions.sqlite3"),
+})
+
+SAMPLES = {
+    "old": os.path.join(BASE_DIR, "uploads", "GOVT_EMP_FORM_16_OR.pdf"),
+    "new": os.path.join(BASE_DIR, "uploads", "GOVT_EMP_FORM_16_NR.pdf"),
+}
+USER_FORM = {
+    "investments80C": "120000", "nps_additional": "50000", "medInsuranceSelf": "20000",
+    "medInsuranceParents": "30000", "eduLoan": "40000", "donation": "10000",
+}
+
+CASES = {}
+
+
+def case(name):
+    """Register a case. The decorated function does the setup and returns the callable to time."""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+# ---------- Cases ----------
+
+def _parse_case(regime):
+    def setup():
+        from parser import parse_form16
+        path = SAMPLES[regime]
+        return lambda: parse_form16(path, layouts=False)
+    return setup
+
+
+def _layout_hit_case(regime):
+    def setup():
+        from layout_cache import layout_cache
+        from parser import parse_form16
+        path = SAMPLES[regime]
+        layout_cache.clear()
+        parse_form16(path, layouts=True)  # learns the layout; every timed call is a region hit
+        return lambda: parse_form16(path, layouts=True)
+    return setup
+
+
+case("parser.parse_form16[old]")(_parse_case("old"))
+case("parser.parse_form16[new]")(_parse_case("new"))
+case("parser.layout_hit[old]")(_layout_hit_case("old"))
+case("parser.layout_hit[new]")(_layout_hit_case("new"))
+
+
+@case("tax.calculate_tax_old_regime")
+def _old_regime_tax():
+    from tax_calculator import calculate_tax_old_regime
+    incomes = list(range(0, 3_000_000, 30_000))
+    return lambda: [calculate_tax_old_regime(i) for i in incomes]
+
+
+@case("tax.calculate_tax_new_regime")
+def _new_regime_tax():
+    from tax_calculator import calculate_tax_new_regime
+    incomes = list(range(0, 3_000_000, 30_000))
+    return lambda: [calculate_tax_new_regime(i) for i in incomes]
+
+
+def _sample_parsed():
+    from parser import parse_form16
+    return parse_form16(SAMPLES["old"], layouts=False)
+
+
+@case("deductions.compute_deductions")
+def _compute_deductions():
+    from deduction_engine import compute_deductions
+    parsed = _sample_parsed()
+    return lambda: compute_deductions(USER_FORM, parsed)
+
+
+@case("deductions.compare_regimes")
+def _compare_regimes():
+    from deduction_engine import compare_regimes
+    parsed = _sample_parsed()
+    return lambda: compare_regimes(USER_FORM, parsed)
+
+
+def _report_inputs():
+    from deduction_engine import compute_deductions
+    result = compute_deductions(USER_FORM, _sample_parsed())
+    return result["parsed_data"], dict(USER_FORM), result["final_tax"]
+
+
+@case("report.render_report")
+def _render_report():
+    from report_generator import render_report
+    inputs = _report_inputs()
+    return lambda: render_report(*inputs)
+
+
+@case("report.generate_pdf[cached]")
+def _generate_pdf_cached():
+    from report_generator import generate_pdf
+    inputs = _report_inputs()
+    generate_pdf(*inputs)
+    return lambda: generate_pdf(*inputs)
+
+
+def _journey_case(cold):
+    def setup():
+        import app as webapp
+        from layout_cache import layout_cache
+        from parse_cache import form16_cache
+        client = webapp.app.test_client()
+        with open(SAMPLES["old"], "rb") as fh:
+            pdf = fh.read()
+
+        def journey():
+            if cold:  # a PDF nobody uploaded before: full-text parse, nothing cached
+                form16_cache.clear()
+                layout_cache.clear()
+            client.post("/upload", data={"file": (io.BytesIO(pdf), "bench_suite_upload.pdf"), **USER_FORM},
+                        content_type="multipart/form-data")
+            client.get("/review")
+            client.post("/review", data={"section_80c": "150000"})
+            response = client.get("/result")
+            assert response.status_code == 200, response.status_code
+        return journey
+    return setup
+
+
+case("app.upload_review_result")(_journey_case(cold=True))
+case("app.upload_review_result[cached]")(_journey_case(cold=False))
+
+
+# ---------- Timing ----------
+
+def measure(fn, rounds: int, min_round_time: float) -> dict:
+    """Calibrate calls per round so a round lasts at least min_round_time, then time `rounds` rounds."""
+    fn()  # warm-up: imports, caches, lazily built tables
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_round_time / elapsed) + 1))
+
+    per_call = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            per_call.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "median_s": statistics.median(per_call),
+        "min_s": min(per_call),
+        "stdev_s": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "rounds": rounds,
+        "calls_per_round": number,
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(pattern: str = "*", rounds: int = 7, min_round_time: float = 0.05, out=sys.stderr) -> dict:
+    results = {}
+    for name, setup in CASES.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        results[name] = measure(setup(), rounds, min_round_time)
+        print(f"{name:<36} {_fmt(results[name]['median_s']):>10}  ±{_fmt(results[name]['stdev_s'])}", file=out)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def _fmt(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+# ---------- Comparison ----------
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Rows of (name, baseline median, current median, ratio, status) for every case in either run."""
+    rows = []
+    base, cur = baseline["results"], current["results"]
+    for name in sorted(set(base) | set(cur)):
+        if name not in cur:
+            rows.append((name, base[name]["median_s"], None, None, "missing"))
+        elif name not in base:
+            rows.append((name, None, cur[name]["median_s"], None, "new"))
+        else:
+            ratio = cur[name]["median_s"] / base[name]["median_s"]
+            status = "REGRESSION" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else "ok"
+            rows.append((name, base[name]["median_s"], cur[name]["median_s"], ratio, status))
+    return rows
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _save(data: dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, ensure_ascii=False)
+        fh.write("\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Microbenchmarks with JSON baselines and regression checks.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="run the suite")
+    cmp_p = sub.add_parser("compare", help="compare a run against a baseline")
+    cmp_p.add_argument("baseline", help="baseline JSON from `run --save`")
+    cmp_p.add_argument("current", nargs="?", help="run to check (default: run the suite now)")
+    cmp_p.add_argument("--threshold", type=float, default=0.15,
+                       help="flag cases whose median is this fraction slower (default 0.15)")
+    for p in (run_p, cmp_p):
+        p.add_argument("-k", "--cases", default="*", help="glob over case names, e.g. 'tax.*'")
+        p.add_argument("--rounds", type=int, default=7)
+        p.add_argument("--min-round-time", type=float, default=0.05, help="seconds per round (calibrated)")
+        p.add_argument("--save", help="write this run's results to a JSON file")
+    sub.add_parser("list", help="list case names")
+    args = ap.parse_args(argv)
+
+    if args.command == "list":
+        print("\n".join(CASES))
+        return 0
+
+    if args.command == "compare" and args.current:
+        current = _load(args.current)
+    else:
+        current = run_suite(args.cases, args.rounds, args.min_round_time)
+    if args.save:
+        _save(current, args.save)
+    if args.command == "run":
+        return 0
+
+    baseline = _load(args.baseline)
+    if baseline["meta"].get("machine") != current["meta"].get("machine") or \
+            baseline["meta"].get("python") != current["meta"].get("python"):
+        print("warning: baseline was recorded on a different machine or Python", file=sys.stderr)
+    rows = compare(baseline, current, args.threshold)
+    if args.cases != "*":
+        rows = [r for r in rows if fnmatch.fnmatch(r[0], args.cases)]
+    print(f"{'case':<36} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for name, old, new, ratio, status in rows:
+        print(f"{name:<36} {_fmt(old) if old else '-':>10} {_fmt(new) if new else '-':>10} "
+              f"{f'{ratio:.2f}x' if ratio else '-':>7}  {status}")
+    regressions = [r for r in rows if r[4] == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
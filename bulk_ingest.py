@@ -0,0 +1,283 @@
+# bulk_ingest.py
+"""
+Bulk Form 16 ingestion: parse a directory (or glob) of PDFs across a process
+pool and stream one flat record per file to JSONL, CSV or Parquet.
+
+    python bulk_ingest.py ./form16s -o results.jsonl
+    python bulk_ingest.py "hr/2025/**/*.pdf" -o results.csv --resume
+    python bulk_ingest.py ./form16s -o results.parquet --workers 8
+    python bulk_ingest.py traces_download.pdf -o employees.csv --bundle
+
+With --bundle every PDF is a combined download holding many employees one after
+another (see parser.parse_bundle); each employee becomes a record, numbered by
+employee_index and first_page within its source_file.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from parser import parse_bundle, parse_form16, select_backend
+from deduction_engine import compare_regimes
+
+RECORD_FIELDS = [
+    "source_file",
+    "employee_index",
+    "first_page",
+    "regime",
+    "employee_name",
+    "assessment_year",
+    "gross_salary",
+    "standard_deduction",
+    "taxable_income",
+    "tds_deducted",
+    "total_tax_payable",
+    "refund",
+    "total_deductions",
+    "net_taxable_income",
+    "old_regime_tax",
+    "new_regime_tax",
+]
+
+PARQUET_ROW_GROUP = 500
+
+
+# ---------- Work unit (runs in worker processes) ----------
+
+def process_file(path: str, backend: str = None) -> dict:
+    """Parse one Form 16 and compute its deductions/tax into a flat record."""
+    return make_record(path, parse_form16(path, backend=backend) or {})
+
+
+def make_record(path: str, parsed: dict) -> dict:
+    comparison = compare_regimes({}, parsed)
+    own = comparison["new" if parsed.get("regime") == "new" else "old"]
+    record = {"source_file": path}
+    record.update({k: parsed.get(k) for k in RECORD_FIELDS if k in parsed})
+    record["total_deductions"] = own["total_deductions"]
+    record["net_taxable_income"] = own["taxable_income"]
+    record["old_regime_tax"] = comparison["old"]["final_tax"]
+    record["new_regime_tax"] = comparison["new"]["final_tax"]
+    return record
+
+
+def collect_pdfs(target: str) -> list:
+    """A directory is walked recursively; anything else is treated as a glob."""
+    if os.path.isdir(target):
+        found = []
+        for root, _, files in os.walk(target):
+            found.extend(os.path.join(root, f) for f in files if f.lower().endswith(".pdf"))
+    else:
+        found = [p for p in glob.glob(target, recursive=True) if p.lower().endswith(".pdf")]
+    return sorted(os.path.abspath(p) for p in found)
+
+
+# ---------- Output writers ----------
+
+class JsonlWriter:
+    def __init__(self, path: str, resume: bool):
+        self.fh = open(path, "a" if resume else "w", encoding="utf-8")
+
+    @staticmethod
+    def done_files(path: str) -> set:
+        done = set()
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    done.add(json.loads(line)["source_file"])
+                except (ValueError, KeyError):
+                    continue  # tolerate a torn last line from an interrupted run
+        return done
+
+    def write(self, record: dict):
+        self.fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.fh.flush()
+
+    def close(self):
+        self.fh.close()
+
+
+class CsvWriter:
+    def __init__(self, path: str, resume: bool):
+        append = resume and os.path.exists(path) and os.path.getsize(path) > 0
+        self.fh = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.fh, fieldnames=RECORD_FIELDS, extrasaction="ignore")
+        if not append:
+            self.writer.writeheader()
+
+    @staticmethod
+    def done_files(path: str) -> set:
+        done = set()
+        with open(path, encoding="utf-8", newline="") as fh:
+            rows = csv.DictReader(fh)
+            while True:
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    break
+                except csv.Error:
+                    continue  # tolerate a torn or garbled row, like JsonlWriter does
+                if row.get("source_file"):
+                    done.add(row["source_file"])
+        return done
+
+    def write(self, record: dict):
+        self.writer.writerow(record)
+        self.fh.flush()
+
+    def close(self):
+        self.fh.close()
+
+
+class ParquetWriter:
+    """
+    Buffers records into row groups. Parquet files can't be appended to, so a
+    resumed run copies the existing rows into a fresh file and swaps it in on close.
+    """
+
+    def __init__(self, path: str, resume: bool):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.tmp_path = path + ".partial"
+        self.schema = pa.schema([
+            (name, pa.string() if name in ("source_file", "regime", "employee_name", "assessment_year") else pa.int64())
+            for name in RECORD_FIELDS
+        ])
+        self.writer = pq.ParquetWriter(self.tmp_path, self.schema)
+        self.buffer = []
+        if resume and os.path.exists(path):
+            self.writer.write_table(pq.read_table(path).cast(self.schema))
+
+    @staticmethod
+    def done_files(path: str) -> set:
+        import pyarrow.parquet as pq
+        return set(pq.read_table(path, columns=["source_file"]).column("source_file").to_pylist())
+
+    def write(self, record: dict):
+        self.buffer.append(record)
+        if len(self.buffer) >= PARQUET_ROW_GROUP:
+            self._flush()
+
+    def _flush(self):
+        if self.buffer:
+            columns = {name: [r.get(name) for r in self.buffer] for name in RECORD_FIELDS}
+            self.writer.write_table(self.pa.table(columns, schema=self.schema))
+            self.buffer = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "parquet": ParquetWriter}
+
+
+def _format_for(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    return {"json": "jsonl", "pq": "parquet"}.get(ext, ext)
+
+
+# ---------- Driver ----------
+
+def _file_results(paths: list, pool, backend: str):
+    """(path, record, error) per file, in completion order."""
+    futures = {pool.submit(process_file, path, backend): path for path in paths}
+    for fut in as_completed(futures):
+        try:
+            yield futures[fut], fut.result(), None
+        except Exception as e:
+            yield futures[fut], None, e
+
+
+def _bundle_results(paths: list, pool, backend: str, window: int):
+    """(path, record, error) per employee, bundle by bundle; slices are parsed on the pool."""
+    for path in paths:
+        try:
+            for parsed in parse_bundle(path, backend, executor=pool, window=window):
+                yield path, make_record(path, parsed), None
+        except Exception as e:
+            yield path, None, e
+
+
+def run(target: str, output: str, fmt: str = None, workers: int = None,
+        error_log: str = None, resume: bool = False, backend: str = None, bundle: bool = False) -> dict:
+    fmt = fmt or _format_for(output)
+    if fmt not in WRITERS:
+        raise SystemExit(f"Unsupported output format '{fmt}' (use one of: {', '.join(WRITERS)})")
+    if bundle and resume:
+        raise SystemExit("--resume works per file and can't tell a half-written bundle; rerun bundles in full")
+    writer_cls = WRITERS[fmt]
+    error_log = error_log or output + ".errors.jsonl"
+
+    pdfs = collect_pdfs(target)
+    done = writer_cls.done_files(output) if resume and os.path.exists(output) else set()
+    todo = [p for p in pdfs if p not in done]
+    stats = {"found": len(pdfs), "skipped": len(pdfs) - len(todo), "ok": 0, "failed": 0}
+    # resolve (and if needed calibrate) the text backend once, not in every worker
+    backend = select_backend(backend).name
+
+    start = time.perf_counter()
+    writer = writer_cls(output, resume)
+    try:
+        with open(error_log, "a" if resume else "w", encoding="utf-8") as errors, \
+                ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            if bundle:
+                results = _bundle_results(todo, pool, backend, window=2 * (workers or os.cpu_count() or 1))
+            else:
+                results = _file_results(todo, pool, backend)
+            for path, record, error in results:
+                try:
+                    if error is not None:
+                        raise error
+                    writer.write(record)
+                    stats["ok"] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    errors.write(json.dumps({
+                        "source_file": path,
+                        "error": f"{type(e).__name__}: {e}",
+                        "traceback": "".join(traceback.format_exception(e)),
+                    }) + "\n")
+                    errors.flush()
+    finally:
+        writer.close()
+
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Parse a directory or glob of Form 16 PDFs in parallel.")
+    ap.add_argument("target", help="directory (walked recursively) or glob pattern of PDFs")
+    ap.add_argument("-o", "--output", required=True, help="output file (.jsonl, .csv or .parquet)")
+    ap.add_argument("--format", choices=sorted(WRITERS), help="override the format implied by --output")
+    ap.add_argument("--workers", type=int, help="worker processes (default: number of cores)")
+    ap.add_argument("--error-log", help="per-file error log (default: <output>.errors.jsonl)")
+    ap.add_argument("--resume", action="store_true", help="skip files already present in the output")
+    ap.add_argument("--backend", help="PDF text backend (pdfplumber, pymupdf); default: auto-selected")
+    ap.add_argument("--bundle", action="store_true", help="each PDF holds many employees; one record per employee")
+    args = ap.parse_args(argv)
+
+    stats = run(args.target, args.output, args.format, args.workers, args.error_log, args.resume, args.backend,
+                args.bundle)
+    print(
+        f"{stats['ok']} {'employees ' if args.bundle else ''}parsed, {stats['failed']} failed, "
+        f"{stats['skipped']} skipped of {stats['found']} PDFs in {stats['seconds']}s",
+        file=sys.stderr,
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# bulk_reports.py
+"""
+Bulk tax-report rendering: turn the JSONL/CSV records written by bulk_ingest.py
+into one PDF report per employee, rendered across a process pool and streamed
+into a ZIP archive as each report finishes.
+
+    python bulk_reports.py results.jsonl -o reports.zip
+    python bulk_reports.py results.csv -o reports.zip --workers 8
+
+Only a bounded window of reports is in flight at a time, and finished PDFs go
+straight into the archive stream, so memory stays flat however large the
+payroll is. The same generator backs the chunked HTTP download (/bulk-reports).
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from field_schema import normalize_rows
+from report_generator import render_report
+
+PARSED_FIELDS = [
+    "regime", "employee_name", "assessment_year", "gross_salary", "standard_deduction",
+    "taxable_income", "tds_deducted", "total_tax_payable", "refund",
+]
+
+
+# ---------- Input ----------
+
+def iter_records(lines, fmt: str):
+    """Typed records from an iterable of text lines in bulk_ingest's jsonl or csv layout."""
+    if fmt == "csv":
+        rows = csv.DictReader(lines)
+    else:
+        rows = (json.loads(line) for line in lines if line.strip())
+    return normalize_rows(rows)
+
+
+def read_records(path: str):
+    fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    with open(path, encoding="utf-8", newline="") as fh:
+        yield from iter_records(fh, fmt)
+
+
+# ---------- Work unit (runs in worker processes) ----------
+
+def report_inputs(record: dict):
+    """(parsed_data, user_data, tax_summary) for generate_pdf from one flat record."""
+    parsed = {k: record.get(k) for k in PARSED_FIELDS if k in record}
+    user = {
+        "source_file": os.path.basename(record.get("source_file") or ""),
+        "total_deductions": record.get("total_deductions"),
+        "net_taxable_income": record.get("net_taxable_income"),
+    }
+    tax_summary = {
+        "old": {"final_tax": record.get("old_regime_tax")},
+        "new": {"final_tax": record.get("new_regime_tax")},
+    }
+    return parsed, user, tax_summary
+
+
+def render_record(index: int, record: dict):
+    return index, render_report(*report_inputs(record))
+
+
+def archive_name(index: int, record: dict) -> str:
+    stem = record.get("employee_name")
+    if not stem or stem == "Not Found":
+        stem = os.path.splitext(os.path.basename(record.get("source_file") or ""))[0] or "report"
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", stem).strip("._") or "report"
+    return f"{index + 1:05d}_{stem}.pdf"
+
+
+# ---------- Streaming ZIP ----------
+
+class _ChunkSink:
+    """Write-only file object for ZipFile; written bytes are handed out by drain()."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def iter_zip(records, workers: int = None, window: int = None, stats: dict = None, executor=None):
+    """
+    Yield a ZIP archive of one report per record, chunk by chunk.
+
+    At most `window` records (default 4 per worker) are being rendered or
+    waiting to be written at any time. Records that fail to render are listed
+    in errors.jsonl inside the archive. `stats`, if given, is filled in with
+    counts, wall time and reports/sec/core once the archive is complete.
+    Reports are rendered on `executor` when one is given (it is left running;
+    pass its size as `workers`), else on a pool of `workers` processes made for
+    this archive.
+    """
+    workers = workers or os.cpu_count()
+    window = window or workers * 4
+    stats = stats if stats is not None else {}
+    stats.update({"reports": 0, "failed": 0, "workers": workers})
+    records = enumerate(records)
+    in_flight, errors = {}, []  # future -> (index, record)
+    sink = _ChunkSink()
+    start = time.perf_counter()
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        # PDFs are already compressed, so entries are stored rather than deflated
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:
+            exhausted = False
+            while True:
+                while not exhausted and len(in_flight) < window:
+                    try:
+                        index, record = next(records)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight[pool.submit(render_record, index, record)] = (index, record)
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    index, record = in_flight.pop(fut)
+                    try:
+                        _, pdf = fut.result()
+                    except Exception as e:
+                        errors.append({
+                            "index": index,
+                            "source_file": record.get("source_file"),
+                            "error": f"{type(e).__name__}: {e}",
+                        })
+                        stats["failed"] += 1
+                        continue
+                    zf.writestr(archive_name(index, record), pdf)
+                    stats["reports"] += 1
+                yield from sink.drain()
+            if errors:
+                zf.writestr("errors.jsonl", "".join(json.dumps(e) + "\n" for e in errors))
+        yield from sink.drain()
+    finally:
+        if executor is None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        else:  # shared pool: only drop this archive's queued work
+            for fut in in_flight:
+                fut.cancel()
+    seconds = time.perf_counter() - start
+    stats["seconds"] = round(seconds, 2)
+    stats["reports_per_sec_per_core"] = round(stats["reports"] / seconds / workers, 2) if seconds else 0.0
+
+
+def write_zip(records, output: str, workers: int = None) -> dict:
+    stats = {}
+    tmp = output + ".partial"
+    with open(tmp, "wb") as fh:
+        for chunk in iter_zip(records, workers=workers, stats=stats):
+            fh.write(chunk)
+    os.replace(tmp, output)
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render one tax report per record into a ZIP archive.")
+    ap.add_argument("records", help="bulk_ingest.py output (.jsonl or .csv)")
+    ap.add_argument("-o", "--output", required=True, help="ZIP file to write")
+    ap.add_argument("--workers", type=int, help="worker processes (default: number of cores)")
+    args = ap.parse_args(argv)
+
+    stats = write_zip(read_records(args.records), args.output, args.workers)
+    print(
+        f"{stats['reports']} reports, {stats['failed']} failed in {stats['seconds']}s "
+        f"({stats['reports_per_sec_per_core']} reports/sec/core on {stats['workers']} workers)",
+        file=sys.stderr,
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# calc_graph.py
+"""
+The upload -> review -> result calculation as a small dependency graph.
+
+    inputs ─ deductions ─ taxable
+       │          └────── old_regime ─┬─ comparison ─┐
+       ├───────────────── new_regime ─┘              ├─ tax_summary
+       └───────────────── suggestions ───────────────┘
+
+Inputs are one flat record: the Form 16 fields merged with what the user
+entered (see calc_inputs()). Every node declares the input fields and the nodes it
+reads, and only gets those. A Calculation keeps the inputs and the node values
+it has computed, as JSON in the session (`session["calc"]`). update() diffs new
+inputs against the stored ones and drops only the values downstream of the
+fields that changed; get() computes whatever is missing. Editing 80C on the
+review page recomputes deductions, taxable, old_regime, comparison,
+suggestions and tax_summary but leaves new_regime; refreshing /result
+recomputes nothing.
+
+Node values must survive a JSON round trip unchanged (str keys, lists, numbers),
+so a value read back from the session is the value that was computed.
+GRAPH_VERSION invalidates stored values when node definitions change.
+"""
+from deduction_engine import deduction_figures, old_regime_deductions, regime_comparison, regime_figures
+from field_schema import normalize_fields
+from metrics import stage
+from tax_calculator import generate_suggestions, supported_assessment_year
+
+GRAPH_VERSION = 2
+
+DEDUCTION_FIELDS = (
+    "section_80c", "section_80ccd1b", "medical_self", "medical_parents", "education_loan", "donations",
+    "savings_interest", "ev_loan_interest", "disability_self", "disability_dependent",
+)
+FORM16_FIELDS = ("regime", "gross_salary", "standard_deduction", "assessment_year")
+
+# written into the parsed record by the graph (see Calculation.enrich), never read back as inputs
+DERIVED_FIELDS = ("section_80c", "section_80ccd1b", "section_80d", "total_deductions", "net_taxable_income",
+                  "taxable_income")
+
+
+class Node:
+    __slots__ = ("name", "fn", "inputs", "deps")
+
+    def __init__(self, name, fn, inputs, deps):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.deps = tuple(deps)
+
+
+NODES = {}       # name -> Node, in dependency order
+_READERS = {}    # input field -> nodes reading it
+_DOWNSTREAM = {}  # node -> every node that depends on it, directly or not
+
+
+def node(name: str, inputs=(), deps=()):
+    """Register fn(fields, **dep values) as a node of the graph."""
+    def register(fn):
+        unknown = [d for d in deps if d not in NODES]
+        if unknown:
+            raise ValueError(f"Node {name!r} depends on unregistered node(s): {', '.join(unknown)}")
+        NODES[name] = Node(name, fn, inputs, deps)
+        _DOWNSTREAM[name] = set()
+        for field in inputs:
+            _READERS.setdefault(field, []).append(name)
+        for dep in deps:
+            for upstream in (dep, *(n for n, below in _DOWNSTREAM.items() if dep in below)):
+                _DOWNSTREAM[upstream].add(name)
+        return fn
+    return register
+
+
+def calc_inputs(parsed_data: dict, user_data: dict = None) -> dict:
+    """The graph's input record: Form 16 fields (minus the ones the graph derives) overlaid with user fields."""
+    parsed = {k: v for k, v in normalize_fields(parsed_data).items() if k not in DERIVED_FIELDS}
+    return normalize_fields({**parsed, **(user_data or {})})
+
+
+_MISSING = object()
+
+
+class Calculation:
+    def __init__(self, state: dict = None):
+        state = state if state and state.get("version") == GRAPH_VERSION else {}
+        self.inputs = dict(state.get("inputs") or {})
+        self.values = dict(state.get("values") or {})
+        self.computed = []    # nodes evaluated by this instance, in order
+        self.changed = False  # state differs from what it was created from
+
+    @property
+    def state(self) -> dict:
+        return {"version": GRAPH_VERSION, "inputs": self.inputs, "values": self.values}
+
+    def update(self, record: dict) -> set:
+        """Replace the inputs with `record`; returns the fields that changed and drops what depends on them."""
+        changed = {k for k in record.keys() | self.inputs.keys()
+                   if record.get(k, _MISSING) != self.inputs.get(k, _MISSING)}
+        if changed:
+            self.inputs = dict(record)
+            for field in changed:
+                for name in _READERS.get(field, ()):
+                    for stale in (name, *_DOWNSTREAM[name]):
+                        self.values.pop(stale, None)
+            self.changed = True
+        return changed
+
+    def get(self, name: str):
+        if name not in self.values:
+            spec = NODES[name]
+            deps = {dep: self.get(dep) for dep in spec.deps}
+            fields = {f: self.inputs[f] for f in spec.inputs if f in self.inputs}
+            with stage(f"calc_{name}"):
+                self.values[name] = spec.fn(fields, **deps)
+            self.computed.append(name)
+            self.changed = True
+        return self.values[name]
+
+    def enrich(self, parsed_data: dict) -> dict:
+        """The parsed record with the derived figures compute_deductions used to add to it."""
+        record = normalize_fields(parsed_data)
+        record.update(self.get("taxable"))
+        return record
+
+
+# ---------- Nodes ----------
+
+@node("deductions", inputs=DEDUCTION_FIELDS)
+def _deductions(fields):
+    by_section, total = old_regime_deductions(fields)
+    return {"by_section": by_section, "total": total}
+
+
+@node("taxable", inputs=("regime", "gross_salary", "standard_deduction"), deps=("deductions",))
+def _taxable(fields, deductions):
+    # Chapter VI-A deductions only reduce taxable income under the old regime
+    old = (fields.get("regime") or "old") == "old"
+    return deduction_figures(fields.get("gross_salary", 0), fields.get("standard_deduction", 0),
+                             deductions["by_section"] if old else {}, deductions["total"] if old else 0)
+
+
+@node("old_regime", inputs=FORM16_FIELDS, deps=("deductions",))
+def _old_regime(fields, deductions):
+    ay = supported_assessment_year(fields.get("assessment_year"))
+    return regime_figures("old", ay, fields, deductions["by_section"], deductions["total"])
+
+
+@node("new_regime", inputs=FORM16_FIELDS)
+def _new_regime(fields):
+    return regime_figures("new", supported_assessment_year(fields.get("assessment_year")), fields, {}, 0)
+
+
+@node("comparison", inputs=("gross_salary", "assessment_year"), deps=("old_regime", "new_regime"))
+def _comparison(fields, old_regime, new_regime):
+    ay = supported_assessment_year(fields.get("assessment_year"))
+    return regime_comparison(ay, fields.get("gross_salary", 0), old_regime, new_regime)
+
+
+@node("suggestions", inputs=DEDUCTION_FIELDS + ("assessment_year",), deps=("taxable", "old_regime"))
+def _suggestions(fields, taxable, old_regime):
+    return generate_suggestions({**fields, "section_80d": taxable["section_80d"]}, old_regime["taxable_income"],
+                                supported_assessment_year(fields.get("assessment_year")))
+
+
+@node("tax_summary", deps=("old_regime", "new_regime", "suggestions", "comparison"))
+def _tax_summary(fields, old_regime, new_regime, suggestions, comparison):
+    return {
+        "old": {"final_tax": old_regime["final_tax"]},
+        "new": {"final_tax": new_regime["final_tax"]},
+        "suggestions": suggestions,
+        "comparison": comparison,
+    }
+
+
+@node("ai_suggestions")
+def _ai_suggestions(fields):
+    from suggestion_engine import generate_suggestions as pooled_suggestions
+    return pooled_suggestions()
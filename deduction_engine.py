@@ -1,49 +1,117 @@
 # deduction_engine.py
 
-from tax_calculator import compute_tax
-from copy import deepcopy
-
-def safe_int(value, default=0):
-    """Safely convert a value to int, stripping commas/₹ if needed."""
-    try:
-        if value is None:
-            return default
-        if isinstance(value, (int, float)):
-            return int(value)
-        if isinstance(value, str):
-            cleaned = value.replace(",", "").replace("₹", "").strip()
-            return int(cleaned) if cleaned else default
-        return int(value)
-    except Exception:
-        return default
-
-
-def get_form_val(form_data, candidates, default=0):
+from tax_calculator import compute_tax, get_slab_table, normalize_assessment_year, supported_assessment_year
+from field_schema import normalize_fields
+from metrics import timed
+
+
+# Per-year caps of the sections an employee can still top up by investing (old regime only).
+# Keyed by the labels old_regime_deductions() reports.
+SECTION_CAPS = {
+    "80C (PPF/ELSS/LIC etc.)": 150000,
+    "80CCD(1B) (NPS Additional)": 50000,
+    "80D (Self+Family)": 25000,
+    "80D (Parents)": 50000,
+}
+
+
+def old_regime_deductions(form_data):
     """
-    Accepts: form_data (dict-like), candidates: list of possible field names
-    Returns first non-empty numeric-like string or default.
+    Chapter VI-A deductions claimable under the old regime, capped per section.
+    form_data may use any alias from field_schema. Returns (deductions by label, total).
     """
-    for key in candidates:
-        if key in form_data and form_data.get(key) not in (None, ""):
-            return form_data.get(key)
-    return default
+    form = normalize_fields(form_data)
+    deductions = {}
+    total_deductions = 0
+
+    # 80C – PPF/ELSS/LIC etc.
+    sec80c = min(form.get("section_80c", 0), SECTION_CAPS["80C (PPF/ELSS/LIC etc.)"])
+    deductions["80C (PPF/ELSS/LIC etc.)"] = sec80c
+    total_deductions += sec80c
+
+    # 80CCD(1B) – NPS additional
+    nps_add = min(form.get("section_80ccd1b", 0), SECTION_CAPS["80CCD(1B) (NPS Additional)"])
+    deductions["80CCD(1B) (NPS Additional)"] = nps_add
+    total_deductions += nps_add
+
+    # 80D – Medical insurance
+    med_self = min(form.get("medical_self", 0), SECTION_CAPS["80D (Self+Family)"])
+    deductions["80D (Self+Family)"] = med_self
+    total_deductions += med_self
+
+    med_parents = min(form.get("medical_parents", 0), SECTION_CAPS["80D (Parents)"])
+    deductions["80D (Parents)"] = med_parents
+    total_deductions += med_parents
+
+    # 80E – Education loan
+    edu_loan = max(0, form.get("education_loan", 0))
+    deductions["80E (Education Loan Interest)"] = edu_loan
+    total_deductions += edu_loan
+
+    # 80G – Donations
+    donations = form.get("donations", 0)
+    deductions["80G (Donations)"] = donations
+    total_deductions += donations
+
+    # 80TTA – Savings account interest (max 10k)
+    tta = min(form.get("savings_interest", 0), 10000)
+    deductions["80TTA (Savings Interest)"] = tta
+    total_deductions += tta
+
+    # 80EEB – EV loan interest (max 1.5L)
+    eeb = min(form.get("ev_loan_interest", 0), 150000)
+    deductions["80EEB (EV Loan Interest)"] = eeb
+    total_deductions += eeb
+
+    # Disability related deductions (input expected as percent or numeric marker)
+    disability_self = form.get("disability_self", 0)
+    if disability_self >= 80:
+        deductions["80U (Severe Disability - Self)"] = 125000
+        total_deductions += 125000
+    elif disability_self >= 40:
+        deductions["80U (Disability - Self)"] = 75000
+        total_deductions += 75000
+
+    disability_dependent = form.get("disability_dependent", 0)
+    if disability_dependent >= 80:
+        deductions["80DD (Severe Disability - Dependent)"] = 125000
+        total_deductions += 125000
+    elif disability_dependent >= 40:
+        deductions["80DD (Disability - Dependent)"] = 75000
+        total_deductions += 75000
+
+    return deductions, total_deductions
+
+
+def deduction_figures(gross_salary, standard_deduction, deductions, total_deductions) -> dict:
+    """The keys compute_deductions adds to the parsed record."""
+    taxable_income = gross_salary - standard_deduction
+    return {
+        "section_80c": deductions.get("80C (PPF/ELSS/LIC etc.)", 0),
+        "section_80ccd1b": deductions.get("80CCD(1B) (NPS Additional)", 0),
+        "section_80d": deductions.get("80D (Self+Family)", 0) + deductions.get("80D (Parents)", 0),
+        "total_deductions": total_deductions,
+        "net_taxable_income": max(0, taxable_income - total_deductions),
+        "taxable_income": taxable_income,
+    }
 
 
+@timed("compute_deductions")
 def compute_deductions(form_data, parsed_data):
     """
     Compute taxable income and tax liability based on user inputs + Form 16 data.
-    Mutates a copy of parsed_data to include normalized deduction keys so downstream
-    functions (suggestion generator, PDF) see the user-entered values.
+    Works on a normalized record of parsed_data (see field_schema) and adds the
+    deduction keys to it so downstream functions (suggestion generator, PDF) see
+    the user-entered values.
     """
 
-    # defensive
-    parsed = deepcopy(parsed_data) if isinstance(parsed_data, dict) else {}
+    # defensive; the record is a fresh dict with typed values
+    parsed = normalize_fields(parsed_data) if isinstance(parsed_data, dict) else {}
 
-    regime = parsed.get("regime", "old")
+    regime = parsed.get("regime") or "old"
 
-    # Ensure numeric values
-    gross_salary = safe_int(parsed.get("gross_salary", 0))
-    standard_deduction = safe_int(parsed.get("standard_deduction", 0))
+    gross_salary = parsed.get("gross_salary", 0)
+    standard_deduction = parsed.get("standard_deduction", 0)
 
     # --- Step 1: Base taxable income (from Form16) ---
     taxable_income = gross_salary - standard_deduction
@@ -53,82 +121,13 @@ def compute_deductions(form_data, parsed_data):
     total_deductions = 0
 
     if regime == "old":
-        # 80C – accept multiple input names (sec80c, section_80c, section80c, 80C)
-        sec80c_raw = get_form_val(form_data, ["sec80c", "section_80c", "section80c", "80C", "investments80C"])
-        sec80c = min(safe_int(sec80c_raw, 0), 150000)
-        deductions["80C (PPF/ELSS/LIC etc.)"] = sec80c
-        total_deductions += sec80c
-
-        # 80CCD(1B) – NPS additional (accept nps_additional, nps_add, section_80ccd1b)
-        nps_raw = get_form_val(form_data, ["nps_additional", "nps_add", "section_80ccd1b", "80CCD(1B)"])
-        nps_add = min(safe_int(nps_raw, 0), 50000)
-        deductions["80CCD(1B) (NPS Additional)"] = nps_add
-        total_deductions += nps_add
-
-        # 80D – Medical insurance
-        med_self_raw = get_form_val(form_data, ["medical_self", "medInsuranceSelf", "section_80d_self", "80D_self"])
-        med_self = min(safe_int(med_self_raw, 0), 25000)
-        deductions["80D (Self+Family)"] = med_self
-        total_deductions += med_self
-
-        med_parents_raw = get_form_val(form_data, ["medical_parents", "medInsuranceParents", "80D_parents"])
-        med_parents = min(safe_int(med_parents_raw, 0), 50000)
-        deductions["80D (Parents)"] = med_parents
-        total_deductions += med_parents
-
-        # 80E – Education loan
-        edu_loan_raw = get_form_val(form_data, ["education_loan", "educationLoan", "eduLoan"])
-        edu_loan = max(0, safe_int(edu_loan_raw, 0))
-        deductions["80E (Education Loan Interest)"] = edu_loan
-        total_deductions += edu_loan
-
-        # 80G – Donations
-        donations_raw = get_form_val(form_data, ["donations", "donation", "section_80g"])
-        donations = safe_int(donations_raw, 0)
-        deductions["80G (Donations)"] = donations
-        total_deductions += donations
-
-        # 80TTA – Savings account interest (max 10k)
-        tta_raw = get_form_val(form_data, ["savings_interest", "savingsInterest", "80TTA"])
-        tta = min(safe_int(tta_raw, 0), 10000)
-        deductions["80TTA (Savings Interest)"] = tta
-        total_deductions += tta
-
-        # 80EEB – EV loan interest (max 1.5L)
-        eeb_raw = get_form_val(form_data, ["ev_loan_interest", "evLoanInterest", "ev_loan"])
-        eeb = min(safe_int(eeb_raw, 0), 150000)
-        deductions["80EEB (EV Loan Interest)"] = eeb
-        total_deductions += eeb
-
-        # Disability related deductions (input expected as percent or numeric marker)
-        disability_self_raw = get_form_val(form_data, ["disability_self", "selfDisability"])
-        disability_self = safe_int(disability_self_raw, 0)
-        if disability_self >= 80:
-            deductions["80U (Severe Disability - Self)"] = 125000
-            total_deductions += 125000
-        elif disability_self >= 40:
-            deductions["80U (Disability - Self)"] = 75000
-            total_deductions += 75000
-
-        disability_dependent_raw = get_form_val(form_data, ["disability_dependent", "dependentDisability"])
-        disability_dependent = safe_int(disability_dependent_raw, 0)
-        if disability_dependent >= 80:
-            deductions["80DD (Severe Disability - Dependent)"] = 125000
-            total_deductions += 125000
-        elif disability_dependent >= 40:
-            deductions["80DD (Disability - Dependent)"] = 75000
-            total_deductions += 75000
+        deductions, total_deductions = old_regime_deductions(form_data)
 
     # --- Step 3: Net taxable income ---
-    net_taxable_income = max(0, taxable_income - total_deductions)
-
     # Before computing tax, update parsed (normalized) keys so other modules can read them
-    parsed["section_80c"] = deductions.get("80C (PPF/ELSS/LIC etc.)", 0)
-    parsed["section_80ccd1b"] = deductions.get("80CCD(1B) (NPS Additional)", 0)
-    parsed["section_80d"] = deductions.get("80D (Self+Family)", 0) + deductions.get("80D (Parents)", 0)
-    parsed["total_deductions"] = total_deductions
-    parsed["net_taxable_income"] = net_taxable_income
-    parsed["taxable_income"] = taxable_income
+    figures = deduction_figures(gross_salary, standard_deduction, deductions, total_deductions)
+    parsed.update(figures)
+    net_taxable_income = figures["net_taxable_income"]
 
     # --- Step 4: Compute final tax ---
     # compute_tax expects parsed_data or numeric? In this project compute_tax earlier expected dict
@@ -150,17 +149,60 @@ def compute_deductions(form_data, parsed_data):
     }
 
 
-def compare_regimes(form_data, parsed_data):
+@timed("compare_regimes")
+def compare_regimes(form_data, parsed_data, assessment_year=None):
     """
-    Compare Old vs New regime tax liabilities.
+    Old vs New regime for one employee in a single pass.
+
+    Inputs are resolved once: the Chapter VI-A deductions only apply under the
+    old regime, and each regime gets its own standard deduction (the amount on
+    the Form 16 for the regime it was issued under, the slab table's for the
+    other). Returns per-regime figures plus a diff (new minus old) and the
+    savings of the cheaper regime.
     """
-    old_result = compute_deductions(form_data, {**parsed_data, "regime": "old"})
-    new_result = compute_deductions(form_data, {**parsed_data, "regime": "new"})
+    parsed = normalize_fields(parsed_data) if isinstance(parsed_data, dict) else {}
+    # an explicit AY must have a slab table; one read off the Form 16 falls back to the nearest
+    ay = normalize_assessment_year(assessment_year) if assessment_year \
+        else supported_assessment_year(parsed.get("assessment_year"))
+    deductions, total_deductions = old_regime_deductions(form_data)
+    old = regime_figures("old", ay, parsed, deductions, total_deductions)
+    new = regime_figures("new", ay, parsed, deductions, total_deductions)
+    return regime_comparison(ay, parsed.get("gross_salary", 0), old, new)
 
-    better_regime = "old" if old_result["final_tax"]["old"]["final_tax"] < new_result["final_tax"]["old"]["final_tax"] else "new"
 
+def regime_figures(regime, ay, parsed, deductions, total_deductions) -> dict:
+    """
+    One regime's column of compare_regimes. `parsed` supplies regime,
+    gross_salary and standard_deduction; deductions only count under the old regime.
+    """
+    form_regime = parsed.get("regime") or "old"
+    gross_salary = parsed.get("gross_salary", 0)
+    form_standard_deduction = parsed.get("standard_deduction", 0)
+
+    table = get_slab_table(regime, ay)
+    standard_deduction = table.standard_deduction
+    if regime == form_regime and form_standard_deduction:
+        standard_deduction = form_standard_deduction
+    claimed = total_deductions if regime == "old" else 0
+    taxable_income = max(0, gross_salary - standard_deduction - claimed)
     return {
-        "old": old_result,
-        "new": new_result,
-        "better": better_regime
+        "standard_deduction": standard_deduction,
+        "deductions": deductions if regime == "old" else {},
+        "total_deductions": claimed,
+        "taxable_income": taxable_income,
+        "final_tax": table.final_tax(taxable_income),
+    }
+
+
+def regime_comparison(ay, gross_salary, old, new) -> dict:
+    """compare_regimes' result from the two regime columns."""
+    diff = {k: new[k] - old[k] for k in ("standard_deduction", "total_deductions", "taxable_income", "final_tax")}
+    return {
+        "assessment_year": ay,
+        "gross_salary": gross_salary,
+        "old": old,
+        "new": new,
+        "diff": diff,
+        "better": "old" if old["final_tax"] < new["final_tax"] else "new",
+        "savings": abs(diff["final_tax"]),
     }
@@ -0,0 +1,161 @@
+# deduction_optimizer.py
+"""
+"How much more should I invest?" answered from the slab breakpoints.
+
+Under the old regime every rupee invested in 80C / 80CCD(1B) / 80D (up to the
+caps in deduction_engine.SECTION_CAPS) lowers taxable income by a rupee, so
+old-regime tax as a function of extra investment is the slab curve read
+backwards: piecewise linear, with a drop to zero at the 87A rebate limit. The
+new regime ignores these deductions, so its tax is a constant. Both questions
+below are therefore solved by inverting the slab table, not by search:
+
+- minimise:  the smallest extra investment that reaches the lowest attainable
+             old-regime tax (the rebate limit, or every section maxed out)
+- crossover: the smallest extra investment that makes the old regime strictly
+             cheaper than the new one
+
+optimize_batch() does the same over NumPy arrays of employees.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+import numpy as np
+
+from deduction_engine import SECTION_CAPS, compare_regimes
+from tax_calculator import CESS_RATE, get_slab_table
+
+
+@lru_cache(maxsize=None)
+def _zero_tax_ceiling(table) -> float:
+    """Highest taxable income that still pays no tax (rebate limit or the 0% slab)."""
+    taxed = table.lowers[table.rates > 0]
+    return max(table.rebate_limit, float(taxed[0]) if len(taxed) else math.inf)
+
+
+def marginal_rate(table, income: float) -> float:
+    """Tax (cess included) saved per extra rupee of deduction at this taxable income."""
+    if income <= table.rebate_limit:
+        return 0.0
+    i = max(bisect_left(table.lowers.tolist(), income) - 1, 0)
+    return float(table.rates[i]) * (1 + CESS_RATE)
+
+
+def max_income_below(table, target_tax: float) -> int:
+    """Largest whole-rupee taxable income whose final tax is strictly below target_tax (-1 if none)."""
+    if target_tax < 1:
+        return -1
+    # final = round(tax * (1 + cess)) < target  <=>  tax < (target - 0.5) / (1 + cess)
+    tax = max((target_tax - 0.5) / (1 + CESS_RATE), 0.0)
+    bases, lowers, rates = table.bases.tolist(), table.lowers.tolist(), table.rates.tolist()
+    i = bisect_right(bases, tax) - 1
+    income = lowers[i] + (tax - bases[i]) / rates[i] if rates[i] else lowers[i]
+    income = max(math.ceil(income) - 1, int(table.rebate_limit))  # up to the rebate limit pays 0
+    # the closed form can be a rupee off at rounding edges; settle it against the real table
+    while table.final_tax(income + 1) < target_tax:
+        income += 1
+    while table.final_tax(income) >= target_tax:
+        income -= 1
+    return income
+
+
+def max_income_below_batch(table, target_tax):
+    """max_income_below over an array of target taxes."""
+    target = np.asarray(target_tax, dtype=np.float64)
+    tax = np.maximum((target - 0.5) / (1 + CESS_RATE), 0.0)
+    i = np.clip(np.searchsorted(table.bases, tax, side="right") - 1, 0, len(table.bases) - 1)
+    rates = table.rates[i]
+    income = np.where(rates > 0, table.lowers[i] + (tax - table.bases[i]) / np.where(rates > 0, rates, 1), table.lowers[i])
+    income = np.ceil(income) - 1
+    income = np.maximum(income, table.rebate_limit)
+    for _ in range(2):
+        income = np.where(table.tax_components(income + 1)["final_tax"] < target, income + 1, income)
+        income = np.where(table.tax_components(income)["final_tax"] >= target, income - 1, income)
+    return np.where(target >= 1, income, -1.0)
+
+
+def allocate(extra: int, rooms: list) -> list:
+    """Split extra investment across sections in SECTION_CAPS order, filling each section's room first."""
+    split = []
+    for room in rooms:
+        split.append(min(extra, room))
+        extra -= split[-1]
+    return split
+
+
+def allocate_batch(extra, rooms):
+    """allocate() for extra: (n,) and rooms: (n, k)."""
+    extra = np.asarray(extra, dtype=np.float64)[:, None]
+    rooms = np.asarray(rooms, dtype=np.float64)
+    before = np.cumsum(rooms, axis=1) - rooms
+    return np.clip(extra - before, 0, rooms)
+
+
+def optimize_batch(old_taxable_income, new_tax, headroom, assessment_year=None) -> dict:
+    """
+    Vectorized over employees. old_taxable_income and new_tax are (n,) arrays,
+    headroom the total extra deduction still available per employee.
+    Returns (n,) columns; crossover_extra is -1 where the old regime cannot win.
+    """
+    table = get_slab_table("old", assessment_year)
+    income = np.asarray(old_taxable_income, dtype=np.float64)
+    headroom = np.asarray(headroom, dtype=np.float64)
+    new_tax = np.asarray(new_tax, dtype=np.float64)
+
+    min_extra = np.clip(income - _zero_tax_ceiling(table), 0, headroom)
+    ceiling = max_income_below_batch(table, new_tax)
+    needed = np.maximum(income - ceiling, 0)
+    reachable = (ceiling >= 0) & (needed <= headroom)
+    return {
+        "current_old_tax": table.tax_components(income)["final_tax"],
+        "min_tax_extra": min_extra.astype(np.int64),
+        "min_old_tax": table.tax_components(income - min_extra)["final_tax"],
+        "crossover_extra": np.where(reachable, needed, -1).astype(np.int64),
+    }
+
+
+def tax_curve(table, income: float, headroom: float) -> list:
+    """[(extra deduction, old-regime tax)] at every kink of the curve between 0 and headroom."""
+    kinks = {0.0, float(headroom)}
+    for point in table.lowers.tolist() + [table.rebate_limit]:
+        if 0 < income - point < headroom:
+            kinks.add(income - point)
+    return [(int(d), table.final_tax(max(0.0, income - d))) for d in sorted(kinks)]
+
+
+def optimize(parsed_data, form_data=None, assessment_year=None) -> dict:
+    """Optimizer report for one employee (Form 16 data plus what they already claim)."""
+    comparison = compare_regimes(form_data or {}, parsed_data, assessment_year)
+    ay = comparison["assessment_year"]
+    old = comparison["old"]
+    claimed = [old["deductions"].get(label, 0) for label in SECTION_CAPS]
+    rooms = [max(0, cap - c) for cap, c in zip(SECTION_CAPS.values(), claimed)]
+
+    table = get_slab_table("old", ay)
+    income, headroom = old["taxable_income"], sum(rooms)
+    min_extra = int(min(max(income - _zero_tax_ceiling(table), 0), headroom))
+    min_tax = table.final_tax(income - min_extra)
+    ceiling = max_income_below(table, comparison["new"]["final_tax"])
+    cross_extra = max(income - ceiling, 0)
+    reachable = ceiling >= 0 and cross_extra <= headroom
+
+    return {
+        "assessment_year": ay,
+        "old_tax": old["final_tax"],
+        "new_tax": comparison["new"]["final_tax"],
+        "old_taxable_income": income,
+        "marginal_rate": round(marginal_rate(table, income), 4),
+        "headroom": dict(zip(SECTION_CAPS, rooms)),
+        "minimise": {
+            "extra_investment": min_extra,
+            "by_section": dict(zip(SECTION_CAPS, allocate(min_extra, rooms))),
+            "old_tax": min_tax,
+            "saving": old["final_tax"] - min_tax,
+        },
+        "crossover": {
+            "reachable": reachable,
+            "extra_investment": cross_extra if reachable else None,
+            "by_section": dict(zip(SECTION_CAPS, allocate(cross_extra, rooms))) if reachable else None,
+        },
+        "curve": tax_curve(table, income, headroom),
+    }
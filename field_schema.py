@@ -0,0 +1,170 @@
+# field_schema.py
+"""
+Canonical input fields and their aliases.
+
+Form posts, Form 16 parse results, session data and bulk records all spell the
+same fields differently ("investments80C", "sec80c", "section_80c", "80C" ...).
+FIELDS lists each canonical field once with its type and aliases; the alias
+index is built at import, and normalize_fields() turns any such dict into a
+record keyed by canonical names with typed values in one pass. Keys that are
+not in the schema are kept as they are.
+
+Aliases match case-insensitively and ignore anything that is not a letter or
+digit, so "80CCD(1B)", "80ccd_1b" and "80ccd1b" are the same alias. When a
+dict carries several spellings of one field, the first non-empty one in FIELDS
+order (canonical name, then the aliases as listed) wins.
+"""
+import re
+
+_NUM_RE = re.compile(r"-?\d+")
+
+
+def to_amount(value) -> int:
+    """Whole rupees from 1240474, 1240474.5, '1,24,047', '₹ 50,000' or 'Severe (80%+)' (-> 80)."""
+    if value is None:
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        m = _NUM_RE.search(str(value).replace(",", ""))
+        return int(m.group()) if m else 0
+
+
+def to_text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+AMOUNT, TEXT = to_amount, to_text
+
+# canonical name: (type, aliases)
+FIELDS = {
+    # ---- Form 16 / parse results ----
+    "regime": (TEXT, []),
+    "employee_name": (TEXT, []),
+    "assessment_year": (TEXT, []),
+    "gross_salary": (AMOUNT, []),
+    "standard_deduction": (AMOUNT, []),
+    "taxable_income": (AMOUNT, ["income", "Taxable Income"]),
+    "tds_deducted": (AMOUNT, []),
+    "total_tax_payable": (AMOUNT, []),
+    "refund": (AMOUNT, []),
+    # ---- computed ----
+    "total_deductions": (AMOUNT, []),
+    "net_taxable_income": (AMOUNT, []),
+    "old_regime_tax": (AMOUNT, []),
+    "new_regime_tax": (AMOUNT, []),
+    "source_file": (TEXT, []),
+    # ---- user-entered deductions ----
+    "section_80c": (AMOUNT, ["80C", "sec80c", "investments80C", "investments80"]),
+    "section_80ccd1b": (AMOUNT, ["80CCD(1B)", "nps_additional", "nps_add"]),
+    "section_80d": (AMOUNT, ["80D"]),  # 80D total, as reported back by compute_deductions
+    "medical_self": (AMOUNT, ["medInsuranceSelf", "medInsurenceSelf", "section_80d_self", "80D_self"]),
+    "medical_parents": (AMOUNT, ["medInsuranceParents", "80D_parents"]),
+    "education_loan": (AMOUNT, ["eduLoan"]),
+    "donations": (AMOUNT, ["donation", "section_80g"]),
+    "savings_interest": (AMOUNT, ["80TTA"]),
+    "ev_loan_interest": (AMOUNT, ["ev_loan"]),
+    "disability_self": (AMOUNT, ["selfDisability"]),            # percent
+    "disability_dependent": (AMOUNT, ["dependentDisability"]),  # percent
+}
+
+
+def _clean(key) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+def _build_index() -> tuple:
+    index, ranks = {}, {}
+    for name, (_, aliases) in FIELDS.items():
+        for rank, alias in enumerate([name, *aliases]):
+            cleaned = _clean(alias)
+            if index.get(cleaned, name) != name:
+                raise ValueError(f"Alias '{alias}' of '{name}' already belongs to '{index[cleaned]}'")
+            index[cleaned] = name
+            ranks.setdefault(cleaned, rank)
+    return index, ranks
+
+
+ALIAS_INDEX, _ALIAS_RANKS = _build_index()
+
+# raw key -> (canonical name, type, alias rank) or None, filled in as keys are first seen
+_KEY_PLANS = {}
+_MAX_KEY_PLANS = 4096
+_UNRANKED = float("inf")
+
+
+def _key_plan(key):
+    plan = _KEY_PLANS.get(key, False)
+    if plan is False:
+        cleaned = _clean(key)
+        name = ALIAS_INDEX.get(cleaned)
+        plan = (name, FIELDS[name][0], _ALIAS_RANKS[cleaned]) if name else None
+        if len(_KEY_PLANS) < _MAX_KEY_PLANS:
+            _KEY_PLANS[key] = plan
+    return plan
+
+
+def canonical_key(key):
+    """Canonical field name for any spelling of it, or None if it is not in the schema."""
+    plan = _key_plan(key)
+    return plan[0] if plan else None
+
+
+def normalize_fields(data) -> dict:
+    """
+    One pass over `data`: known fields are renamed to their canonical key and
+    coerced to their type; unknown keys are copied unchanged. When several
+    spellings of a field are present, the first non-empty one in alias order
+    wins, as with the old candidate lists.
+    """
+    record, ranks = {}, {}
+    plans = _KEY_PLANS
+    for key, value in (data or {}).items():
+        plan = plans.get(key) or _key_plan(key)
+        if plan is None:
+            record[key] = value
+        elif value is None or value == "":
+            if plan[0] not in record:
+                record[plan[0]] = plan[1](None)
+        elif plan[2] < ranks.get(plan[0], _UNRANKED):
+            record[plan[0]] = plan[1](value)
+            ranks[plan[0]] = plan[2]
+    return record
+
+
+def normalize_rows(rows):
+    """
+    normalize_fields() for a stream of rows (CSV/JSONL records). The key ->
+    (canonical name, type) plan is resolved once per distinct set of keys, so
+    each row costs only the value coercions.
+    """
+    plans = {}
+    for row in rows:
+        keys = tuple(row)
+        plan = plans.get(keys)
+        if plan is None:
+            plan = plans[keys] = _row_plan(keys)
+        record = {}
+        for key, name, cast, preferred in plan:
+            value = row[key]
+            if cast is None:
+                record[key] = value
+            elif value is None or value == "":
+                record.setdefault(name, cast(None))
+            elif not preferred or all(row[k] is None or row[k] == "" for k in preferred):
+                record[name] = cast(value)
+        yield record
+
+
+def _row_plan(keys) -> list:
+    """(key, canonical name, type, keys of the same field that take precedence over it) per column."""
+    resolved = [(pos, key, _key_plan(key)) for pos, key in enumerate(keys)]
+    plan = []
+    for pos, key, kp in resolved:
+        if kp is None:
+            plan.append((key, None, None, ()))
+            continue
+        preferred = tuple(k for p, k, other in resolved
+                          if other and other[0] == kp[0] and (other[2], p) < (kp[2], pos))
+        plan.append((key, kp[0], kp[1], preferred))
+    return plan
@@ -0,0 +1,181 @@
+# jobs.py
+"""
+Background jobs for Form 16 uploads.
+
+A small thread pool runs the parse + deduction work off the request thread;
+callers poll a job by id. The number of unfinished jobs is capped so a burst of
+uploads is turned away instead of queueing without bound, and finished jobs are
+dropped `ttl` seconds after they complete (unfinished ones `ttl` seconds after
+they were queued, so a job whose worker died does not count against the cap
+forever).
+
+Only the thread pool is local to the process. Job status and results live in a
+store: by default a `jobs` table in the session database (FORM16_SESSION_DB, see
+session_store.py), so a poll or /review?job= can land on any gunicorn worker.
+FORM16_JOB_BACKEND=memory keeps them in the process instead (single worker only).
+"""
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from session_store import DEFAULT_DB_PATH, SqliteStore, decode_session, encode_session
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+# ---------- Stores ----------
+
+class MemoryJobStore:
+    def __init__(self, ttl: float = 900):
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        now = time.time()
+        for job_id in [j for j, job in self._jobs.items()
+                       if (job["finished"] or job["created"]) < now - self.ttl]:
+            del self._jobs[job_id]
+
+    def add(self, job: dict, max_pending: int) -> bool:
+        with self._lock:
+            self._evict()
+            pending = sum(1 for j in self._jobs.values() if j["status"] in (QUEUED, RUNNING))
+            if pending >= max_pending:
+                return False
+            self._jobs[job["id"]] = dict(job)
+            return True
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def get(self, job_id: str):
+        with self._lock:
+            self._evict()
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def counts(self) -> dict:
+        with self._lock:
+            self._evict()
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job["status"]] += 1
+        return counts
+
+
+class SqliteJobStore(SqliteStore):
+    """Jobs as rows next to the sessions; results are stored encoded like session data."""
+    SCHEMA = ("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT, created REAL, finished REAL, "
+              "result BLOB, error TEXT)")
+    _LIVE = "COALESCE(finished, created) >= ?"
+
+    def add(self, job: dict, max_pending: int) -> bool:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")  # count and insert as one step across workers
+        try:
+            pending = conn.execute(
+                f"SELECT COUNT(*) FROM jobs WHERE status IN (?, ?) AND {self._LIVE}",
+                (QUEUED, RUNNING, now - self.ttl),
+            ).fetchone()[0]
+            if pending >= max_pending:
+                conn.rollback()
+                return False
+            conn.execute(
+                "INSERT INTO jobs (id, status, created, finished, result, error) VALUES (?, ?, ?, NULL, NULL, NULL)",
+                (job["id"], job["status"], job["created"]),
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                conn.execute("DELETE FROM jobs WHERE COALESCE(finished, created) < ?", (now - self.ttl,))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return True
+
+    def update(self, job_id: str, **fields):
+        if "result" in fields:
+            fields["result"] = None if fields["result"] is None else encode_session(fields["result"])
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._conn() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str):
+        row = self._conn().execute(
+            f"SELECT id, status, created, finished, result, error FROM jobs WHERE id = ? AND {self._LIVE}",
+            (job_id, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(("id", "status", "created", "finished", "result", "error"), row))
+        job["result"] = decode_session(job["result"]) if job["result"] is not None else None
+        return job
+
+    def counts(self) -> dict:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        rows = self._conn().execute(
+            f"SELECT status, COUNT(*) FROM jobs WHERE {self._LIVE} GROUP BY status", (time.time() - self.ttl,)
+        )
+        for status, count in rows:
+            counts[status] = count
+        return counts
+
+
+# ---------- Manager ----------
+
+class JobManager:
+    def __init__(self, store=None, max_workers: int = 2, max_pending: int = 32):
+        self.store = store or MemoryJobStore()
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="form16-job")
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs); returns the job id, or None if too many jobs are unfinished."""
+        job_id = uuid.uuid4().hex
+        job = {"id": job_id, "status": QUEUED, "created": time.time(), "finished": None, "result": None, "error": None}
+        if not self.store.add(job, self.max_pending):
+            return None
+        self._pool.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        self.store.update(job_id, status=RUNNING)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self.store.update(job_id, status=FAILED, error=f"{type(e).__name__}: {e}", finished=time.time())
+        else:
+            self.store.update(job_id, status=DONE, result=result, finished=time.time())
+
+    def get(self, job_id: str):
+        """Snapshot of a job (None if unknown or expired)."""
+        return self.store.get(job_id)
+
+    def stats(self) -> dict:
+        return self.store.counts()
+
+
+def make_job_store(backend: str = None):
+    """Store for FORM16_JOB_BACKEND: sqlite (default, shared by all workers) or memory."""
+    backend = (backend or os.environ.get("FORM16_JOB_BACKEND", "sqlite")).lower()
+    ttl = float(os.environ.get("FORM16_JOB_TTL", 900))
+    if backend == "memory":
+        return MemoryJobStore(ttl=ttl)
+    if backend == "sqlite":
+        return SqliteJobStore(os.environ.get("FORM16_SESSION_DB", DEFAULT_DB_PATH), ttl=ttl)
+    raise ValueError(f"Unknown job backend '{backend}' (use sqlite or memory)")
+
+
+upload_jobs = JobManager(
+    make_job_store(),
+    max_workers=int(os.environ.get("FORM16_JOB_WORKERS", 2)),
+    max_pending=int(os.environ.get("FORM16_JOB_QUEUE", 32)),
+)
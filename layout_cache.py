@@ -0,0 +1,176 @@
+# layout_cache.py
+"""
+Learned field regions per PDF layout.
+
+Most uploads come from a handful of employer templates. parser.py fingerprints a
+PDF from cheap first-page features (producer, page size, fonts, the header line
+with digits masked) and looks the fingerprint up here. For a known layout the
+cache holds the horizontal bands (page, top, bottom) each field's label and
+value were read from, and only those bands are extracted; a field that learned no
+bands, or whose value would come from a fallback finder the bands don't cover
+(the preferred label read 0), is read from the full text. An unknown layout
+goes through the full-text path, and the line spans its field scanner settled
+on are turned into bands and stored. If the bands stop matching (a field's label
+is no longer in its band), that PDF falls back to the full-text path.
+
+Every entry keeps a score: hits raise it (up to MAX_SCORE), fallbacks lower it,
+and the layout is only learned again from a PDF that falls back once the score
+is down to zero, so one odd PDF does not evict the bands that fit the rest.
+Layouts whose field lines can't be cut out cleanly (overlapping text rows) are
+stored as untrainable, and retried after MAX_SCORE PDFs.
+
+Entries are kept in memory and in a JSON file (FORM16_LAYOUT_CACHE_FILE, default
+.cache/layouts.json) so every worker benefits; FORM16_LAYOUT_CACHE=0 turns the
+region path off. stats() reports the hit rate and the time saved: per hit, the
+full-text time measured for the same layout minus the fingerprint and region
+time, less what fingerprinting, failed region attempts and learning cost the
+PDFs that took the full-text path.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(BASE_DIR, ".cache", "layouts.json")
+
+ENABLED = os.environ.get("FORM16_LAYOUT_CACHE", "1").lower() not in ("0", "false", "no", "off")
+MAX_SCORE = 16
+
+
+def fingerprint(features) -> str:
+    return hashlib.sha256(json.dumps(features, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:24]
+
+
+class LayoutCache:
+    def __init__(self, path: str = DEFAULT_PATH, max_entries: int = 512):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = None  # fingerprint -> entry, loaded on first use
+        self._mtime = None    # of the file as last read
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "fallbacks": 0, "trained": 0, "untrainable": 0}
+        self._hit_seconds = 0.0
+        self._saved_seconds = 0.0
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = OrderedDict()
+            self._refresh()
+
+    def _refresh(self):
+        """Pick up layouts other workers learned since the file was last read."""
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return
+            with open(self.path, encoding="utf-8") as fh:
+                stored = json.load(fh)
+        except (OSError, ValueError):
+            return
+        self._mtime = mtime
+        for key, entry in stored.items():
+            self._entries.setdefault(key, entry)
+
+    def _save(self):
+        self._refresh()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if not self.path:
+            return
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(self._entries, fh)
+            os.replace(tmp, self.path)
+            self._mtime = os.stat(self.path).st_mtime
+        except OSError:
+            pass
+
+    # ---------- lookups ----------
+
+    def get(self, key: str):
+        """The layout's entry ({"regime", "fields", "full_seconds", "score"}; regime None: untrainable) or None."""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._refresh()
+                entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def record_hit(self, key: str, seconds: float):
+        """A PDF parsed from its layout's bands in `seconds` (fingerprint included)."""
+        with self._lock:
+            entry = self._entries.get(key) or {}
+            entry["score"] = min(MAX_SCORE, entry.get("score", 0) + 1)
+            self._counters["hits"] += 1
+            self._hit_seconds += seconds
+            self._saved_seconds += (entry.get("full_seconds") or seconds) - seconds
+
+    def record_miss(self, key: str) -> bool:
+        """Note a PDF that takes the full-text path; True when its layout should be learned from it."""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return True
+            self._counters["fallbacks" if entry["regime"] else "misses"] += 1
+            entry["score"] -= 1
+            return entry["score"] <= 0
+
+    def record_full(self, key: str, seconds: float, overhead: float):
+        """
+        Full-text extraction time of a PDF that missed (smoothed into its layout's
+        entry) and the `overhead` the layout cache added to it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                previous = entry.get("full_seconds")
+                entry["full_seconds"] = seconds if previous is None else 0.7 * previous + 0.3 * seconds
+            self._saved_seconds -= overhead
+
+    def learn(self, key: str, regime, fields):
+        """Store a layout's field bands (regime None: untrainable)."""
+        with self._lock:
+            self._load()
+            previous = self._entries.get(key) or {}
+            self._entries[key] = {"regime": regime, "fields": fields or {}, "full_seconds": previous.get("full_seconds"),
+                                  "score": 0 if regime else MAX_SCORE}
+            self._entries.move_to_end(key)
+            self._counters["trained" if regime else "untrainable"] += 1
+            self._save()
+
+    # ---------- reporting ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["layouts"] = len(self._entries or ())
+            hit_seconds, saved = self._hit_seconds, self._saved_seconds
+        lookups = stats["hits"] + stats["misses"] + stats["fallbacks"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["avg_hit_ms"] = round(hit_seconds / stats["hits"] * 1e3, 3) if stats["hits"] else None
+        stats["saved_ms"] = round(saved * 1e3, 1)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+            self._mtime = None
+
+
+layout_cache = LayoutCache(
+    path=os.environ.get("FORM16_LAYOUT_CACHE_FILE", DEFAULT_PATH) or None,
+    max_entries=int(os.environ.get("FORM16_LAYOUT_CACHE_ENTRIES", 512)),
+)
@@ -0,0 +1,166 @@
+# metrics.py
+"""
+Per-stage timing for the upload -> review -> result -> PDF path.
+
+Code marks its stages with `with stage("pdf_extract"):` or `@timed("deductions")`.
+Each finished stage is added to a Prometheus histogram (served by /metrics) and
+to the current request's timings, which app.py sends back as a Server-Timing
+header.
+
+Timing is off unless FORM16_METRICS=1. Disabled, `timed` returns the function
+unchanged and `stage` hands back one shared no-op context manager, so the
+instrumented code pays a function call per stage at most.
+
+Histograms live in the memory of the process that served the request; under
+several gunicorn workers each worker reports its own.
+"""
+import contextvars
+import os
+import threading
+import time
+from functools import wraps
+
+ENABLED = os.environ.get("FORM16_METRICS", "0").lower() in ("1", "true", "yes", "on")
+
+# seconds; tuned for stages between a few microseconds (tax) and seconds (big PDFs)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label value."""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = buckets
+        self._series = {}  # label value -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, seconds: float):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += seconds
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for value, series in sorted(snapshot.items()):
+            label = f'{self.label}="{_escape(value)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGES = Histogram("form16_stage_duration_seconds", "Time spent in each processing stage.", "stage")
+REQUESTS = Histogram("form16_request_duration_seconds", "Request latency by endpoint.", "endpoint")
+
+# (stage, seconds) pairs for the request being served, or None outside a request
+_request_timings = contextvars.ContextVar("form16_request_timings", default=None)
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """Context manager timing one stage (a shared no-op when metrics are disabled)."""
+    return _Stage(name) if ENABLED else _NO_STAGE
+
+
+def timed(name: str):
+    """Decorator form of stage(); leaves the function untouched when metrics are disabled."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def record(name: str, seconds: float):
+    STAGES.observe(name, seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+# ---------- Per request ----------
+
+def begin_request():
+    """Start collecting stage timings for this request; returns the token for end_request()."""
+    return _request_timings.set([]), time.perf_counter()
+
+
+def end_request(token, endpoint: str) -> str:
+    """Stop collecting, record the request latency and return the Server-Timing header value."""
+    var_token, start = token
+    total = time.perf_counter() - start
+    timings = _request_timings.get() or []
+    _request_timings.reset(var_token)
+    REQUESTS.observe(endpoint or "unknown", total)
+    return server_timing(timings, total)
+
+
+def server_timing(timings, total: float) -> str:
+    """'pdf_extract;dur=12.3, field_scan;dur=0.4, total;dur=15.1' (repeated stages are summed, in ms)."""
+    merged = {}
+    for name, seconds in timings:
+        merged[name] = merged.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1e3:.2f}" for name, seconds in merged.items()]
+    parts.append(f"total;dur={total * 1e3:.2f}")
+    return ", ".join(parts)
+
+
+def render_prometheus() -> str:
+    return "\n".join(STAGES.render() + REQUESTS.render()) + "\n"
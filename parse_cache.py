@@ -0,0 +1,237 @@
+# parse_cache.py
+"""
+Content-addressed cache for parse_form16 results.
+
+Keyed on the SHA-256 of the PDF bytes plus parser.PARSER_VERSION, the text
+backend in use and whether learned layout regions are on (layout_cache), with
+two tiers: an in-process LRU and an on-disk JSON store capped by total size
+(oldest files evicted first). A hit in either tier skips PDF text extraction
+entirely.
+
+The disk tier's size is a running total, seeded by one directory scan on the
+first write and then kept up to date by each write; the directory is only
+rescanned (which also picks up what other workers wrote) once the total goes
+over the cap, and then trimmed to 90% of it.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from layout_cache import ENABLED as LAYOUTS_ENABLED
+from parser import PARSER_VERSION, parse_form16, select_backend
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "form16")
+
+
+def content_key(pdf_bytes: bytes, backend: str = "", digest: str = None, layouts: bool = None) -> str:
+    """
+    Cache key; pass `digest` (SHA-256 hex of the bytes) when it is already known.
+    Results parsed with and without layout regions are kept apart.
+    """
+    mode = "layouts" if (LAYOUTS_ENABLED if layouts is None else layouts) else "full"
+    return f"{PARSER_VERSION}{backend}.{mode}-{digest or hashlib.sha256(pdf_bytes).hexdigest()}"
+
+
+def _read(source) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "read"):
+        return source.read()
+    with open(source, "rb") as fh:
+        return fh.read()
+
+
+def _parse_bytes(data: bytes, backend: str) -> dict:
+    """parse_form16 from memory; module-level so it can run in a worker process."""
+    return parse_form16(io.BytesIO(data), backend=backend) or {}
+
+
+class ParseCache:
+    def __init__(self, max_entries: int = 256, disk_dir: str = DEFAULT_CACHE_DIR,
+                 disk_max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "disk_evictions": 0}
+        self._disk_bytes = None  # running size of the disk tier, seeded on first write
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # ---------- tiers ----------
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".json")
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return dict(self._memory[key])
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    value = json.load(fh)
+                os.utime(path)  # refresh recency for eviction
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+                self._remember(key, value)
+                return dict(value)
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, key: str, value: dict):
+        self._remember(key, value)
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._scan_disk())
+            else:
+                self._disk_bytes += len(data) - replaced
+            over = self._disk_bytes > self.disk_max_bytes
+        if over:
+            self._evict_disk()
+
+    def _remember(self, key: str, value: dict):
+        with self._lock:
+            self._memory[key] = dict(value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _scan_disk(self) -> list:
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    st = entry.stat()
+                except OSError:  # removed by another worker meanwhile
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict_disk(self):
+        """Remove the least recently used files until the disk tier is at 90% of its cap."""
+        entries = self._scan_disk()
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_max_bytes * 0.9  # leave room so the next few writes don't rescan
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self._counters["disk_evictions"] += evicted
+
+    # ---------- public API ----------
+
+    def parse(self, source, digest: str = None) -> dict:
+        """
+        parse_form16 with caching. `source` may be a path, raw bytes or a binary
+        file object; the bytes are hashed once and parsed from memory on a miss.
+        With `digest` (the SHA-256 hex of the PDF, e.g. from upload_stream) the
+        source is not read at all on a hit, and parsed in place on a miss.
+        """
+        backend = select_backend()
+        if digest is None:
+            data = _read(source)
+            source, digest = io.BytesIO(data), hashlib.sha256(data).hexdigest()
+        elif isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        key = content_key(None, "." + backend.name, digest)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        if hasattr(source, "seek"):
+            source.seek(0)
+        parsed = parse_form16(source, backend=backend) or {}
+        self.put(key, parsed)
+        return dict(parsed)
+
+    def parse_many(self, sources, executor=None) -> list:
+        """
+        parse() for several PDFs. Hits are answered from the cache; misses are
+        parsed on `executor` (e.g. a ProcessPoolExecutor) when one is given, so
+        they run side by side. Returns, in order, a parsed dict or the exception
+        raised for each source.
+        """
+        backend = select_backend()
+        results, misses = [], {}
+        for i, source in enumerate(sources):
+            try:
+                data = _read(source)
+            except OSError as e:
+                results.append(e)
+                continue
+            key = content_key(data, "." + backend.name)
+            results.append(self.get(key))
+            if results[i] is None:
+                misses[i] = (key, executor.submit(_parse_bytes, data, backend.name) if executor else data)
+
+        for i, (key, work) in misses.items():
+            try:
+                parsed = work.result() if executor else _parse_bytes(work, backend)
+            except Exception as e:
+                results[i] = e
+                continue
+            self.put(key, parsed)
+            results[i] = dict(parsed)
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir:
+            for entry in os.scandir(self.disk_dir):
+                if entry.name.endswith(".json"):
+                    os.remove(entry.path)
+            with self._lock:
+                self._disk_bytes = 0
+
+
+form16_cache = ParseCache(
+    max_entries=int(os.environ.get("FORM16_CACHE_ENTRIES", 256)),
+    disk_dir=os.environ.get("FORM16_CACHE_DIR", DEFAULT_CACHE_DIR) or None,
+    disk_max_bytes=int(os.environ.get("FORM16_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+)
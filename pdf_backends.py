@@ -0,0 +1,206 @@
+# pdf_backends.py
+"""
+Text-extraction backends for parse_form16.
+
+Every backend yields plain text one page at a time, laid out the way the
+parser's regexes expect: one visual line per text line, words in reading order
+separated by single spaces.
+
+For the layout cache (layout_cache.py) a backend also reports cheap features of
+the first page and opens a region reader on a document. The reader gives the
+text of horizontal bands of a page (the words whose vertical centre lies in a
+band, laid out like the full-page text), each text line with its vertical
+extent, and the full page texts. It works out a page's text objects once,
+however many of these are asked of it, so the full-text fallback and training
+reuse what the fingerprint and band reads already parsed.
+"""
+import importlib.util
+from contextlib import contextmanager
+
+
+class PdfplumberBackend:
+    name = "pdfplumber"
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("pdfplumber") is not None
+
+    def version(self) -> str:
+        import pdfplumber
+        return pdfplumber.__version__
+
+    @contextmanager
+    def open(self, source):
+        import pdfplumber
+        with pdfplumber.open(source) as pdf:
+            yield pdf
+
+    def page_count(self, doc) -> int:
+        return len(doc.pages)
+
+    def iter_page_texts(self, doc):
+        for page in doc.pages:
+            text = page.extract_text() or ""
+            page.close()  # drop the page's cached layout objects
+            yield text
+
+    def layout_features(self, doc) -> list:
+        from pdfminer.pdftypes import resolve1
+
+        page = doc.pages[0]
+        fonts = resolve1(page.page_obj.resources.get("Font")) or {}
+        names = {getattr(resolve1(f).get("BaseFont"), "name", "") for f in fonts.values()}
+        return [doc.metadata.get("Producer"), doc.metadata.get("Creator"), round(page.width), round(page.height),
+                sorted(_strip_subset(n) for n in names)]
+
+    def regions(self, doc):
+        return _PdfplumberRegions(doc)
+
+
+class PyMuPDFBackend:
+    """
+    PyMuPDF (fitz). Words are regrouped into lines by their top coordinate and
+    joined left to right, which reproduces pdfplumber's plain-text layout closely
+    enough for the field regexes while skipping pdfminer's layout analysis.
+    """
+
+    name = "pymupdf"
+    LINE_TOLERANCE = 3.0  # points; same default as pdfplumber's y_tolerance
+
+    @staticmethod
+    def _module():
+        try:
+            import pymupdf
+        except ImportError:
+            import fitz as pymupdf
+        return pymupdf
+
+    @staticmethod
+    def available() -> bool:
+        return any(importlib.util.find_spec(m) is not None for m in ("pymupdf", "fitz"))
+
+    def version(self) -> str:
+        pymupdf = self._module()
+        return getattr(pymupdf, "__version__", None) or pymupdf.VersionBind
+
+    @contextmanager
+    def open(self, source):
+        pymupdf = self._module()
+        if hasattr(source, "read"):
+            doc = pymupdf.open(stream=source.read(), filetype="pdf")
+        else:
+            doc = pymupdf.open(source)
+        try:
+            yield doc
+        finally:
+            doc.close()
+
+    def page_count(self, doc) -> int:
+        return doc.page_count
+
+    def iter_page_texts(self, doc):
+        for page in doc:
+            yield self._page_text(page)
+
+    def _page_text(self, page) -> str:
+        return "\n".join(text for text, _, _ in self._lines(page.get_text("words")))
+
+    def _lines(self, words) -> list:
+        """[(line text, top, bottom)] from PyMuPDF word tuples."""
+        words = sorted(words, key=lambda w: (w[1], w[0]))
+        lines, current, top = [], [], None
+        for w in words:
+            if top is not None and w[1] - top > self.LINE_TOLERANCE:
+                lines.append(current)
+                current, top = [], None
+            if top is None:
+                top = w[1]
+            current.append(w)
+        if current:
+            lines.append(current)
+        return [(" ".join(w[4] for w in sorted(line, key=lambda w: w[0])),
+                 min(w[1] for w in line), max(w[3] for w in line)) for line in lines]
+
+    def layout_features(self, doc) -> list:
+        page = doc[0]
+        meta = doc.metadata or {}
+        return [meta.get("producer"), meta.get("creator"), round(page.rect.width), round(page.rect.height),
+                sorted({_strip_subset(font[3]) for font in page.get_fonts()})]
+
+    def regions(self, doc):
+        return _PyMuPDFRegions(self, doc)
+
+
+def _strip_subset(font_name: str) -> str:
+    """'BCDFEE+Calibri' -> 'Calibri' (subset tags differ from file to file)."""
+    prefix, plus, rest = font_name.partition("+")
+    return rest if plus and len(prefix) == 6 else font_name
+
+
+# ---------- Region readers (one per open document) ----------
+
+class _PdfplumberRegions:
+    """Bands are cropped from the page; pdfplumber keeps a parsed page until it is closed."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.page_count = len(doc.pages)
+
+    def texts(self, index: int, bands) -> list:
+        page = self.doc.pages[index]
+        texts = []
+        for top, bottom in bands:
+            band = page.crop((0, max(0, top - 2), page.width, min(page.height, bottom + 2)))
+            band = band.filter(lambda obj, top=top, bottom=bottom: top <= (obj["top"] + obj["bottom"]) / 2 <= bottom)
+            texts.append(band.extract_text() or "")
+        return texts
+
+    def lines(self, index: int) -> list:
+        return [(line["text"], line["top"], line["bottom"]) for line in self.doc.pages[index].extract_text_lines()]
+
+    def page_texts(self) -> list:
+        return [page.extract_text() or "" for page in self.doc.pages]
+
+
+class _PyMuPDFRegions:
+    """Bands are filtered from the page's word list, read once per page."""
+
+    def __init__(self, backend, doc):
+        self.backend = backend
+        self.doc = doc
+        self.page_count = doc.page_count
+        self._words = {}
+
+    def _page_words(self, index: int) -> list:
+        if index not in self._words:
+            self._words[index] = self.doc[index].get_text("words")
+        return self._words[index]
+
+    def texts(self, index: int, bands) -> list:
+        words = self._page_words(index)
+        return ["\n".join(text for text, _, _ in self.backend._lines(
+                    [w for w in words if top <= (w[1] + w[3]) / 2 <= bottom]))
+                for top, bottom in bands]
+
+    def lines(self, index: int) -> list:
+        return self.backend._lines(self._page_words(index))
+
+    def page_texts(self) -> list:
+        return ["\n".join(text for text, _, _ in self.lines(i)) for i in range(self.page_count)]
+
+
+BACKENDS = {b.name: b for b in (PdfplumberBackend(), PyMuPDFBackend())}
+
+
+def available_backends() -> list:
+    return [b for b in BACKENDS.values() if b.available()]
+
+
+def get_backend(name: str):
+    try:
+        backend = BACKENDS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown PDF backend '{name}' (choose from: {', '.join(BACKENDS)})")
+    if not backend.available():
+        raise ValueError(f"PDF backend '{name}' is not installed")
+    return backend
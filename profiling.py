@@ -0,0 +1,234 @@
+# profiling.py
+"""
+Opt-in cProfile capture for the slow routes (/upload, /result, /download-pdf).
+
+A request is profiled when any of these is set up and applies:
+
+    FORM16_PROFILE=1              every request to a profiled route
+    FORM16_PROFILE_RATE=0.01      a random sample of them
+    FORM16_PROFILE_SECRET=...     requests carrying a valid X-Form16-Profile header
+                                  (see sign(); signatures expire after 5 minutes)
+
+Each capture is a .prof file (pstats format) plus a .json sidecar with the route,
+duration and the content hash and page count of the Form 16 involved. Captures
+go to FORM16_PROFILE_DIR (default .cache/profiles); only the newest
+FORM16_PROFILE_KEEP (default 200) are kept. One request is profiled at a time
+per process; others arriving meanwhile run unprofiled.
+
+    python profiling.py summarize --top 30            # hottest functions over all captures
+    python profiling.py summarize --endpoint upload_file --sort tottime
+    python profiling.py list
+    python profiling.py sign /upload                  # header value for a one-off capture
+"""
+import argparse
+import cProfile
+import glob
+import hashlib
+import hmac
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ALWAYS = os.environ.get("FORM16_PROFILE", "0").lower() in ("1", "true", "yes", "on")
+RATE = float(os.environ.get("FORM16_PROFILE_RATE", 0) or 0)
+SECRET = os.environ.get("FORM16_PROFILE_SECRET", "")
+PROFILE_DIR = os.environ.get("FORM16_PROFILE_DIR") or os.path.join(BASE_DIR, ".cache", "profiles")
+KEEP = int(os.environ.get("FORM16_PROFILE_KEEP", 200))
+
+HEADER = "X-Form16-Profile"
+SIGNATURE_TTL = 300
+PROFILED_ENDPOINTS = {"upload_file", "result", "download_pdf"}
+
+_busy = threading.Lock()  # cProfile cannot run two profilers at once on Python 3.12+
+
+
+# ---------- Triggering ----------
+
+def _signature(timestamp: str, path: str, secret: str) -> str:
+    return hmac.new(secret.encode(), f"{timestamp}:{path}".encode(), hashlib.sha256).hexdigest()
+
+
+def sign(path: str, secret: str = None, now: float = None) -> str:
+    """Value for the X-Form16-Profile header that asks for a profile of `path`."""
+    timestamp = str(int(now if now is not None else time.time()))
+    return f"{timestamp}:{_signature(timestamp, path, secret or SECRET)}"
+
+
+def valid_signature(value: str, path: str, now: float = None) -> bool:
+    if not SECRET or not value or ":" not in value:
+        return False
+    timestamp, signature = value.split(":", 1)
+    try:
+        age = (now if now is not None else time.time()) - int(timestamp)
+    except ValueError:
+        return False
+    if not 0 <= age <= SIGNATURE_TTL:
+        return False
+    return hmac.compare_digest(signature, _signature(timestamp, path, SECRET))
+
+
+def wanted(endpoint: str, path: str, header: str = None) -> bool:
+    """Whether this request should be profiled."""
+    if not (ALWAYS or RATE or SECRET) or endpoint not in PROFILED_ENDPOINTS:
+        return False
+    return ALWAYS or (RATE > 0 and random.random() < RATE) or valid_signature(header, path)
+
+
+# ---------- Capture ----------
+
+class Capture:
+    def __init__(self, endpoint: str, path: str):
+        self.endpoint = endpoint
+        self.path = path
+        self.meta = {}
+        self.profiler = cProfile.Profile()
+        self.start = time.perf_counter()
+        self.profiler.enable()
+
+    def annotate(self, **meta):
+        self.meta.update(meta)
+
+
+def start(endpoint: str, path: str):
+    """Begin profiling the current thread; None if another profile is already running."""
+    if not _busy.acquire(blocking=False):
+        return None
+    try:
+        return Capture(endpoint, path)
+    except Exception:
+        _busy.release()
+        raise
+
+
+def finish(capture: Capture, status: int = None, pdf=None, pdf_name: str = None, pdf_sha256: str = None) -> str:
+    """Stop profiling and write the capture, noting the Form 16 involved (see pdf_info); returns the .prof path."""
+    try:
+        capture.profiler.disable()
+    finally:
+        _busy.release()
+    duration = time.perf_counter() - capture.start
+    if pdf is not None or pdf_name or pdf_sha256:
+        capture.annotate(**pdf_info(pdf, pdf_name, pdf_sha256))
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = f"{time.strftime('%Y%m%dT%H%M%S')}_{capture.endpoint}_{uuid.uuid4().hex[:8]}"
+    prof_path = os.path.join(PROFILE_DIR, stem + ".prof")
+    capture.profiler.dump_stats(prof_path)
+    meta = {
+        "endpoint": capture.endpoint,
+        "path": capture.path,
+        "status": status,
+        "duration_ms": round(duration * 1e3, 2),
+        "captured": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **capture.meta,
+    }
+    with open(os.path.join(PROFILE_DIR, stem + ".json"), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2)
+    _rotate()
+    return prof_path
+
+
+def _rotate():
+    captures = sorted(glob.glob(os.path.join(PROFILE_DIR, "*.prof")), key=os.path.getmtime)
+    for prof_path in captures[:max(0, len(captures) - KEEP)]:
+        for path in (prof_path, prof_path[:-5] + ".json"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def pdf_info(pdf=None, name: str = None, sha256: str = None) -> dict:
+    """
+    Name, content hash and page count of a Form 16, for the capture's sidecar.
+    `pdf` is a path or binary file object (None when only name/hash are known);
+    a given sha256 is used as is.
+    """
+    from parser import select_backend
+
+    info = {"pdf_file": name or (os.path.basename(pdf) if isinstance(pdf, str) else None),
+            "pdf_sha256": sha256}
+    if pdf is None:
+        return info
+    try:
+        if sha256 is None:
+            if isinstance(pdf, str):
+                with open(pdf, "rb") as fh:
+                    data = fh.read()
+            else:
+                pdf.seek(0)
+                data = pdf.read()
+            info["pdf_sha256"] = hashlib.sha256(data).hexdigest()
+        if not isinstance(pdf, str):
+            pdf.seek(0)
+        backend = select_backend()
+        with backend.open(pdf) as doc:
+            info["pdf_pages"] = backend.page_count(doc)
+    except Exception as e:  # a capture is still useful without these
+        info["pdf_error"] = f"{type(e).__name__}: {e}"
+    return info
+
+
+# ---------- CLI ----------
+
+def load_captures(directory: str, endpoint: str = None) -> list:
+    """[(prof path, sidecar dict)] oldest first."""
+    captures = []
+    for prof_path in sorted(glob.glob(os.path.join(directory, "*.prof")), key=os.path.getmtime):
+        try:
+            with open(prof_path[:-5] + ".json", encoding="utf-8") as fh:
+                meta = json.load(fh)
+        except (OSError, ValueError):
+            meta = {}
+        if endpoint is None or meta.get("endpoint") == endpoint:
+            captures.append((prof_path, meta))
+    return captures
+
+
+def summarize(directory: str, top: int = 25, sort: str = "cumulative", endpoint: str = None, out=sys.stdout):
+    captures = load_captures(directory, endpoint)
+    if not captures:
+        print(f"No profiles in {directory}.", file=out)
+        return
+    stats = pstats.Stats(*(path for path, _ in captures), stream=out)
+    durations = sorted(meta.get("duration_ms", 0) for _, meta in captures)
+    print(f"{len(captures)} profiles, request time median {durations[len(durations) // 2]} ms, "
+          f"max {durations[-1]} ms", file=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Inspect request profiles captured by profiling.py.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    sum_p = sub.add_parser("summarize", help="hottest functions across captured profiles")
+    sum_p.add_argument("--top", type=int, default=25)
+    sum_p.add_argument("--sort", default="cumulative", help="pstats sort key (cumulative, tottime, calls ...)")
+    list_p = sub.add_parser("list", help="one line per capture")
+    for p in (sum_p, list_p):
+        p.add_argument("--dir", default=PROFILE_DIR)
+        p.add_argument("--endpoint", help="only captures of this Flask endpoint (upload_file, result, download_pdf)")
+    sign_p = sub.add_parser("sign", help=f"print an {HEADER} header value (needs FORM16_PROFILE_SECRET)")
+    sign_p.add_argument("path", help="request path, e.g. /upload")
+    args = ap.parse_args(argv)
+
+    if args.command == "summarize":
+        summarize(args.dir, args.top, args.sort, args.endpoint)
+    elif args.command == "list":
+        for path, meta in load_captures(args.dir, args.endpoint):
+            print(f"{os.path.basename(path):<48} {meta.get('endpoint', '?'):<13} {meta.get('duration_ms', '?'):>9} ms  "
+                  f"{meta.get('pdf_pages', '-')} pages  {(meta.get('pdf_sha256') or '-')[:16]}")
+    else:
+        if not SECRET:
+            raise SystemExit("Set FORM16_PROFILE_SECRET to sign profile requests.")
+        print(f"{HEADER}: {sign(args.path)}")
+
+
+if __name__ == "__main__":
+    main()
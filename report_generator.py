@@ -0,0 +1,221 @@
+# report_generator.py
+"""
+Tax report PDFs.
+
+Rendering is memoized: the report bytes are cached under a SHA-256 of the
+canonicalized (parsed_data, user_data, tax_summary) inputs and REPORT_VERSION,
+in an LRU bounded by both entry count and total bytes. The same hash doubles as
+the report's ETag. ReportLab is imported, and the stylesheets and table styles built, on the
+first render rather than at import, so workers that never render a PDF don't
+pay for it.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from metrics import timed
+
+# Part of every report key (and so of the ETag): bump whenever the rendered report changes, so
+# cached PDFs and browsers' copies are not served after a deploy.
+# 2: tax saved per suggestion (user-024)
+REPORT_VERSION = 2
+
+
+def format_label(key: str) -> str:
+    key = key.replace("_", " ")
+    return re.sub(r'(?<!^)(?=[A-Z])', " ", key).title()
+
+
+# ---- Styles (built once, on first render) ----
+@lru_cache(maxsize=None)
+def report_styles() -> dict:
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import TableStyle
+
+    def table_style(header_color):
+        return TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), header_color),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ])
+
+    sheet = getSampleStyleSheet()
+    disclaimer = sheet["Normal"].clone('Disclaimer')
+    disclaimer.fontSize = 9
+    disclaimer.textColor = colors.black
+    disclaimer.alignment = TA_CENTER
+    return {
+        "sheet": sheet,
+        "disclaimer": disclaimer,
+        "user_table": table_style(colors.lightblue),
+        "form16_table": table_style(colors.lightgreen),
+        "summary_table": table_style(colors.orange),
+    }
+
+DISCLAIMER_TEXT = """
+    <b>Disclaimer:</b> This report is generated by an <b>AI-based Tax Advisor</b>.
+    Please consult a qualified Chartered Accountant before making any investment or tax decision.
+    """
+
+
+@timed("pdf_render")
+def render_report(parsed_data, user_data, tax_summary) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+
+    report = report_styles()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=40, leftMargin=40,
+        topMargin=60, bottomMargin=40
+    )
+
+    styles = report["sheet"]
+    elements = []
+
+    # --- Title ---
+    elements.append(Paragraph("AI Tax Advisor - Tax Report", styles["Title"]))
+    elements.append(Spacer(1, 20))
+
+    # --- Personal Information ---
+    elements.append(Paragraph("Personal Information", styles["Heading2"]))
+    user_table_data = [["Field", "Value"]]
+    for k, v in user_data.items():
+        user_table_data.append([format_label(k), str(v)])
+    user_table = Table(user_table_data, colWidths=[200, 280])
+    user_table.setStyle(report["user_table"])
+    elements.append(user_table)
+    elements.append(Spacer(1, 20))
+
+    # --- Form 16 Extracted Data ---
+    elements.append(Paragraph("Form 16 Extracted Data", styles["Heading2"]))
+    form16_table_data = [["Field", "Value"]]
+    for k, v in parsed_data.items():
+        form16_table_data.append([format_label(k), str(v)])
+    form16_table = Table(form16_table_data, colWidths=[200, 280])
+    form16_table.setStyle(report["form16_table"])
+    elements.append(form16_table)
+    elements.append(Spacer(1, 20))
+
+    # --- Tax Summary ---
+    elements.append(Paragraph("Tax Summary", styles["Heading2"]))
+    summary_table_data = [
+        ["Old Regime Tax", str(tax_summary.get("old", {}).get("final_tax", "N/A"))],
+        ["New Regime Tax", str(tax_summary.get("new", {}).get("final_tax", "N/A"))],
+    ]
+    summary_table = Table(summary_table_data, colWidths=[200, 280])
+    summary_table.setStyle(report["summary_table"])
+    elements.append(summary_table)
+    elements.append(Spacer(1, 20))
+
+    # --- Suggestions ---
+    suggestions = tax_summary.get("suggestions", {})
+    if suggestions:
+        elements.append(Paragraph("AI Tax Advisor Suggestions", styles["Heading2"]))
+        for key, suggestion in suggestions.items():
+            elements.append(Paragraph(f"<b>{format_label(key)}</b>", styles["Normal"]))
+            if isinstance(suggestion, dict):
+                claimed = suggestion.get("claimed")
+                limit = suggestion.get("limit")
+                if claimed is not None or limit is not None:
+                    remaining = suggestion.get("remaining")
+                    elements.append(Paragraph(
+                        f"Claimed: {claimed}, Limit: {'No limit' if limit is None else limit}"
+                        + ("" if remaining is None else f", Remaining: {remaining}"),
+                        styles["Normal"]
+                    ))
+                if suggestion.get("tax_saved"):
+                    elements.append(Paragraph(f"Tax saved by using the remaining limit: {suggestion['tax_saved']}",
+                                              styles["Normal"]))
+                if "note" in suggestion:
+                    elements.append(Paragraph(f"Note: {suggestion['note']}", styles["Normal"]))
+                if "options" in suggestion:
+                    for opt in suggestion["options"]:
+                        elements.append(Paragraph(f"- {opt}", styles["Normal"]))
+            else:
+                elements.append(Paragraph(str(suggestion), styles["Normal"]))
+            elements.append(Spacer(1, 10))
+
+    # --- DISCLAIMER ---
+    elements.append(Spacer(1, 18))
+    elements.append(Paragraph(DISCLAIMER_TEXT, report["disclaimer"]))
+
+    # --- Build PDF ---
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+# ---- Memoization ----
+
+def report_key(parsed_data, user_data, tax_summary) -> str:
+    """Hash of REPORT_VERSION and the canonicalized inputs (key order and whitespace don't matter)."""
+    canonical = json.dumps(
+        [REPORT_VERSION, parsed_data or {}, user_data or {}, tax_summary or {}],
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    def __init__(self, max_entries: int = 128, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._reports = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str):
+        with self._lock:
+            pdf = self._reports.get(key)
+            if pdf is None:
+                self._counters["misses"] += 1
+                return None
+            self._reports.move_to_end(key)
+            self._counters["hits"] += 1
+            return pdf
+
+    def put(self, key: str, pdf: bytes):
+        if len(pdf) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._reports:
+                self._bytes -= len(self._reports[key])
+            self._reports[key] = pdf
+            self._reports.move_to_end(key)
+            self._bytes += len(pdf)
+            while len(self._reports) > self.max_entries or self._bytes > self.max_bytes:
+                _, old = self._reports.popitem(last=False)
+                self._bytes -= len(old)
+                self._counters["evictions"] += 1
+
+    def report(self, parsed_data, user_data, tax_summary, key: str = None) -> bytes:
+        key = key or report_key(parsed_data, user_data, tax_summary)
+        pdf = self.get(key)
+        if pdf is None:
+            pdf = render_report(parsed_data or {}, user_data or {}, tax_summary or {})
+            self.put(key, pdf)
+        return pdf
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters, entries=len(self._reports), bytes=self._bytes)
+
+
+report_cache = ReportCache(
+    max_entries=int(os.environ.get("REPORT_CACHE_ENTRIES", 128)),
+    max_bytes=int(os.environ.get("REPORT_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+)
+
+
+def generate_pdf(parsed_data, user_data, tax_summary):
+    """The report as a BytesIO, served from the cache when the inputs were seen before."""
+    return io.BytesIO(report_cache.report(parsed_data, user_data, tax_summary))
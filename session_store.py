@@ -0,0 +1,189 @@
+# session_store.py
+"""
+Server-side Flask sessions.
+
+The cookie carries only a random session id; the session dict itself lives in
+a store, encoded as zlib-compressed compact JSON. Two stores are provided:
+
+- MemorySessionStore: per-process LRU with a TTL (fine for a single worker).
+- SqliteSessionStore: a local SQLite file, shared by all workers on one host.
+
+Pick one with FORM16_SESSION_BACKEND=memory|sqlite|cookie ("cookie" keeps
+Flask's default signed-cookie sessions). The default is sqlite, so the steps of
+one upload -> review -> result flow can land on different gunicorn workers.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(BASE_DIR, ".cache", "sessions.sqlite3")
+
+
+def encode_session(data: dict) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def decode_session(blob: bytes) -> dict:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+# ---------- Stores ----------
+
+class MemorySessionStore:
+    def __init__(self, max_entries: int = 10000, ttl: float = 7200):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()  # sid -> (expires, blob)
+        self._lock = threading.Lock()
+
+    def get(self, sid: str):
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return entry[1]
+
+    def set(self, sid: str, blob: bytes):
+        with self._lock:
+            self._data[sid] = (time.time() + self.ttl, blob)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SqliteStore:
+    """
+    A table in a local SQLite file shared by every worker on the host. One
+    connection per thread (and per process: a connection opened before gunicorn
+    forks is not reused by the workers); subclasses purge expired rows every
+    `purge_every` writes.
+    """
+    SCHEMA = None
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, ttl: float = 7200, purge_every: int = 500):
+        self.path = path
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(self.SCHEMA)
+
+    def _conn(self):
+        pid, conn = getattr(self._local, "conn", (None, None))
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = (os.getpid(), conn)
+        return conn
+
+
+class SqliteSessionStore(SqliteStore):
+    SCHEMA = "CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, expires REAL, data BLOB)"
+
+    def get(self, sid: str):
+        row = self._conn().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires >= ?", (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid: str, blob: bytes):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (sid, expires, data) VALUES (?, ?, ?)",
+                (sid, now + self.ttl, blob),
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                conn.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+
+    def delete(self, sid: str):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+# ---------- Flask integration ----------
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class ServerSideSessionInterface(SessionInterface):
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            blob = self.store.get(sid)
+            if blob is not None:
+                try:
+                    return ServerSession(decode_session(blob), sid=sid)
+                except (ValueError, zlib.error):
+                    pass
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if session.modified:
+            self.store.set(session.sid, encode_session(dict(session)))
+        if self.should_set_cookie(app, session):
+            response.set_cookie(
+                name, session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain, path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+
+def make_session_interface(backend: str = None):
+    """Interface for FORM16_SESSION_BACKEND (sqlite by default); None means Flask's cookie sessions."""
+    backend = (backend or os.environ.get("FORM16_SESSION_BACKEND", "sqlite")).lower()
+    ttl = float(os.environ.get("FORM16_SESSION_TTL", 7200))
+    if backend == "cookie":
+        return None
+    if backend == "memory":
+        return ServerSideSessionInterface(MemorySessionStore(
+            max_entries=int(os.environ.get("FORM16_SESSION_ENTRIES", 10000)), ttl=ttl,
+        ))
+    if backend == "sqlite":
+        return ServerSideSessionInterface(SqliteSessionStore(
+            os.environ.get("FORM16_SESSION_DB", DEFAULT_DB_PATH), ttl=ttl,
+        ))
+    raise ValueError(f"Unknown session backend '{backend}' (use memory, sqlite or cookie)")
@@ -187,7 +187,7 @@ document.addEventListener('DOMContentLoaded', () => {
                         let errorMessage = `HTTP error! Status: ${response.status}.`;
                         try {
                             const errorJson = JSON.parse(text);
-                            errorMessage += ` Message: ${errorJson.message || text}`;
+                            errorMessage += ` Message: ${errorJson.error || errorJson.message || text}`;
                         } catch (e) {
                             errorMessage += ` Raw response: ${text}`;
                         }
@@ -196,8 +196,12 @@ document.addEventListener('DOMContentLoaded', () => {
                 }
                 return response.json(); // Parse response as JSON
             })
-            .then(data => {
-                // Assuming `data` is the JSON object returned from your backend
+            .then(payload => {
+                // The API answers with one entry per uploaded file; this page sends one
+                const data = payload.results[0];
+                if (data.error) {
+                    throw new Error(data.error);
+                }
                 // Example expected `data` structure:
                 // {
                 //     "gross_salary": "2000000",
@@ -0,0 +1,178 @@
+# static_cache.py
+"""
+HTTP caching for the explainer pages and the files under static/.
+
+Assets: at startup every file in the static folder is hashed, and
+url_for("static", filename="css/style.css") builds a fingerprinted URL
+(/static/css/style.3f2a1b9c04d5.css). Those URLs change whenever the content
+does, so they are served with `Cache-Control: public, max-age=31536000,
+immutable`. Text assets get gzip (and brotli, when the brotli package is
+installed) variants built at startup; the smallest one the client accepts is
+sent. A URL with a stale fingerprint (a page cached across a deploy) gets the
+current file with a short max-age; plain /static/<file> URLs keep Flask's
+default handling.
+
+Pages: templates that depend on nothing but the app (the explainer routes) are
+rendered once per template version, compressed the same way and answered with
+ETag / Last-Modified, so a revalidating browser gets a 304 and no template is
+rendered.
+
+FORM16_STATIC_CACHE=0 turns both off (Flask's defaults apply); assets are only
+hashed at startup, so restart after editing static/ or set it to 0 while working
+on them. FORM16_PAGE_MAX_AGE (default 600) is the pages' max-age in seconds.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from flask import current_app, render_template, request, send_from_directory
+from werkzeug.http import http_date, is_resource_modified, quote_etag
+
+ENABLED = os.environ.get("FORM16_STATIC_CACHE", "1").lower() not in ("0", "false", "no", "off")
+PAGE_MAX_AGE = int(os.environ.get("FORM16_PAGE_MAX_AGE", 600))
+ASSET_MAX_AGE = 365 * 24 * 3600
+STALE_MAX_AGE = 300
+
+COMPRESSIBLE = {".css", ".js", ".svg", ".html", ".txt", ".json", ".map", ".ico"}
+_FINGERPRINT = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{12})(?P<ext>\.[^./]+)$")
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+def compress(body: bytes) -> dict:
+    """encoding -> body, for the encodings that actually make `body` smaller."""
+    variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return {enc: data for enc, data in variants.items() if len(data) < len(body) * 0.9}
+
+
+class Entry:
+    """One cacheable body with its precompressed variants and validators, headers prepared up front."""
+    __slots__ = ("body", "variants", "mimetype", "digest", "mtime", "encodings", "etags", "last_modified")
+
+    def __init__(self, body: bytes, mimetype: str, mtime: float, compressible: bool = True):
+        self.body = body
+        self.variants = compress(body) if compressible else {}
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.mtime = mtime
+        self.encodings = sorted(self.variants, key=lambda enc: len(self.variants[enc]))  # smallest first
+        self.etags = {enc: f"{self.digest[:32]}-{enc}" for enc in self.variants}
+        self.etags["identity"] = self.digest[:32]
+        self.last_modified = http_date(int(mtime))
+
+    def response(self, cache_control: str):
+        """The variant the client accepts best; 304 when the client's copy is current."""
+        encoding = request.accept_encodings.best_match(self.encodings, default="identity") if self.encodings \
+            else "identity"
+        etag = self.etags[encoding]
+        headers = {"ETag": quote_etag(etag), "Last-Modified": self.last_modified, "Cache-Control": cache_control}
+        if self.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if not is_resource_modified(request.environ, etag=etag, last_modified=self.last_modified):
+            return current_app.response_class(status=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return current_app.response_class(self.variants.get(encoding, self.body), mimetype=self.mimetype,
+                                          headers=headers)
+
+
+# ---------- Assets ----------
+
+class AssetManifest:
+    def __init__(self):
+        self.folder = None
+        self.urls = {}    # static filename -> fingerprinted filename
+        self.assets = {}  # fingerprinted filename -> Entry
+
+    def build(self, folder: str):
+        self.folder = folder
+        urls, assets = {}, {}
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, folder).replace(os.sep, "/")
+                stem, ext = os.path.splitext(filename)
+                with open(path, "rb") as fh:
+                    body = fh.read()
+                mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                entry = Entry(body, mimetype, os.path.getmtime(path), ext.lower() in COMPRESSIBLE)
+                urls[filename] = f"{stem}.{entry.digest[:12]}{ext}"
+                assets[urls[filename]] = entry
+        self.urls, self.assets = urls, assets
+
+    def url_defaults(self, endpoint, values):
+        if endpoint == "static" and values.get("filename") in self.urls:
+            values["filename"] = self.urls[values["filename"]]
+
+    def serve(self, filename: str):
+        entry = self.assets.get(filename)
+        if entry is not None:
+            return entry.response(f"public, max-age={ASSET_MAX_AGE}, immutable")
+        m = _FINGERPRINT.match(filename)
+        current = self.urls.get(m.group("stem") + m.group("ext")) if m else None
+        if current is not None:  # fingerprint from before a deploy: today's file, briefly cached
+            return self.assets[current].response(f"public, max-age={STALE_MAX_AGE}")
+        return send_from_directory(self.folder, filename)
+
+    def stats(self) -> dict:
+        entries = self.assets.values()
+        return {
+            "assets": len(self.assets),
+            "bytes": sum(len(e.body) for e in entries),
+            "gzip_bytes": sum(len(e.variants.get("gzip", e.body)) for e in entries),
+            "br_bytes": sum(len(e.variants["br"]) for e in entries if "br" in e.variants) if brotli else None,
+        }
+
+
+# ---------- Pages ----------
+
+class PageCache:
+    """Rendered templates keyed by name, re-rendered when the template file changes."""
+
+    def __init__(self):
+        self._pages = {}  # template name -> (template mtime, Entry)
+        self._lock = threading.Lock()
+
+    def response(self, template: str):
+        path = os.path.join(current_app.root_path, current_app.template_folder, template)
+        mtime = os.path.getmtime(path)
+        cached = self._pages.get(template)
+        if cached is None or cached[0] != mtime:
+            with self._lock:
+                cached = self._pages.get(template)
+                if cached is None or cached[0] != mtime:
+                    body = render_template(template).encode("utf-8")
+                    cached = self._pages[template] = (mtime, Entry(body, "text/html", mtime))
+        return cached[1].response(f"public, max-age={PAGE_MAX_AGE}")
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+
+assets = AssetManifest()
+pages = PageCache()
+
+
+def init_app(app):
+    """Fingerprint and precompress the static folder and serve it from memory (no-op when disabled)."""
+    if not ENABLED or not app.static_folder:
+        return
+    assets.build(app.static_folder)
+    app.url_defaults(assets.url_defaults)
+    app.view_functions["static"] = assets.serve
+
+
+def static_page(template: str):
+    """Response for a template that renders the same for every request."""
+    if not ENABLED:
+        return render_template(template)
+    return pages.response(template)
@@ -1,9 +1,216 @@
 # suggestion_engine.py
-import random
+"""
+Tax-saving suggestions ranked by the rupees they would save.
+
+For every section an employee can still top up (SECTIONS) the gap is the cap
+minus what is claimed, and the saving is the old-regime tax at the current
+taxable income minus the tax once the gap is used: slab tax, the 87A rebate and
+cess included, so an investment that pulls income under the rebate limit shows
+the whole tax it removes. Sections are ranked by that saving; identical inputs
+always give the same suggestions, in the same order, so the result can be
+cached with the rest of the calculation (calc_graph, report_generator).
+
+The per-rupee saving of each slab is precomputed per assessment year. The text of
+a section's block (options and note) depends only on the slab the income falls
+in and how much of the section is left, so blocks are memoized by that bucket;
+the exact figures (claimed, remaining, tax_saved) sit beside the text.
+"""
+from functools import lru_cache
+
+from deduction_engine import SECTION_CAPS
+from field_schema import normalize_fields
+from tax_calculator import CESS_RATE, get_slab_table, normalize_assessment_year, supported_assessment_year
+
+# Per section: the fields claimed against it, its cap (None: uncapped), the options
+# for someone starting out and for a top-up, and what the section covers.
+SECTIONS = {
+    "80C (Investments)": {
+        "fields": ("section_80c",),
+        "cap": SECTION_CAPS["80C (PPF/ELSS/LIC etc.)"],
+        "start": [
+            "Invest in ELSS Mutual Funds for high returns and tax savings",
+            "Open a Public Provident Fund (PPF) account for long-term growth",
+            "Buy Life Insurance policies for yourself or dependents",
+            "Consider Sukanya Samriddhi Yojana (for girl child)",
+        ],
+        "top_up": [
+            "Increase EPF contribution via Voluntary PF",
+            "Pay tuition fees for your children — eligible under Section 80C",
+            "Repay home loan principal — also covered under Section 80C",
+            "Open a 5-year tax-saving Fixed Deposit (FD) in a bank",
+        ],
+        "covers": "PPF, ELSS, life insurance, EPF, tuition fees and home loan principal",
+    },
+    "NPS (80CCD(1B))": {
+        "fields": ("section_80ccd1b",),
+        "cap": SECTION_CAPS["80CCD(1B) (NPS Additional)"],
+        "start": [
+            "Open an NPS Tier I account for long-term retirement savings",
+            "Opt for auto-choice investment in NPS for better diversification",
+        ],
+        "top_up": [
+            "Contribute more to the National Pension System (NPS)",
+            "Leverage employer contributions for additional tax benefit",
+        ],
+        "covers": "your own NPS contributions, over and above 80C",
+    },
+    "Health Insurance (80D)": {
+        "fields": ("medical_self",),
+        "cap": SECTION_CAPS["80D (Self+Family)"],
+        "start": [
+            "Buy health insurance for yourself and family",
+            "Opt for family floater plans to maximize 80D benefits",
+        ],
+        "top_up": [
+            "Add preventive health check-ups to claim small deductions",
+            "Ensure health policy covers pre-existing diseases for long-term savings",
+        ],
+        "covers": "health insurance premiums and check-ups for yourself, spouse and children",
+    },
+    "Health Insurance for Parents (80D)": {
+        "fields": ("medical_parents",),
+        "cap": SECTION_CAPS["80D (Parents)"],
+        "start": [
+            "Get health insurance for parents (extra ₹25,000–₹50,000 deduction)",
+        ],
+        "top_up": [
+            "Pay your parents' health insurance premium yourself to claim it",
+        ],
+        "covers": "health insurance premiums for your parents (₹50,000 if they are senior citizens)",
+    },
+    "Savings Interest (80TTA)": {
+        "fields": ("savings_interest",),
+        "cap": 10000,
+        "start": [
+            "Declare your savings account interest — up to ₹10,000 of it is deductible",
+        ],
+        "top_up": [
+            "Include interest from every savings account, not just your salary account",
+        ],
+        "covers": "interest earned on savings bank accounts",
+    },
+    "Education Loan Interest (80E)": {
+        "fields": ("education_loan",),
+        "cap": None,
+        "start": [
+            "Interest on a loan for higher education (yours, spouse's or children's) is fully deductible",
+        ],
+        "top_up": [
+            "Claim the full interest paid this year from your lender's certificate",
+        ],
+        "covers": "interest on higher-education loans, with no upper limit, for up to 8 years",
+    },
+}
+
+GENERAL_TIPS = [
+    "Plan tax-saving investments early in the financial year.",
+    "Track your 26AS and AIS reports to avoid mismatches while filing.",
+    "File ITR early to prevent late fees and last-minute stress.",
+]
+REBATE_TIP = ("Your taxable income is within the Section 87A rebate, so no tax is due under the old regime; "
+              "further deductions will not lower it.")
+
+
+@lru_cache(maxsize=None)
+def slab_savings(assessment_year: str) -> tuple:
+    """((slab lower bound, tax saved per rupee of deduction), ...) for the old regime, cess included."""
+    table = get_slab_table("old", assessment_year)
+    return tuple((lower, rate * (1 + CESS_RATE)) for lower, rate in zip(table._lowers, table._rates))
+
+
+def _slab(assessment_year: str, income: float) -> int:
+    """Index of the slab `income` is taxed in; -1 within the 87A rebate."""
+    if income <= get_slab_table("old", assessment_year).rebate_limit:
+        return -1
+    slabs = slab_savings(assessment_year)
+    return max(i for i, (lower, _) in enumerate(slabs) if lower < income or i == 0)
+
+
+def _gap_bucket(claimed: int, cap) -> str:
+    if cap is None:
+        return "open" if not claimed else "partial"
+    if claimed >= cap:
+        return "full"
+    if not claimed:
+        return "open"
+    return "top_up" if cap - claimed <= cap // 4 else "partial"
+
+
+@lru_cache(maxsize=1024)
+def suggestion_block(title: str, assessment_year: str, slab: int, bucket: str, reaches_rebate: bool) -> tuple:
+    """(options, note) of one section for a slab / gap bucket."""
+    section = SECTIONS[title]
+    cap = section["cap"]
+    if bucket == "full":
+        options = []
+    elif bucket == "open":
+        options = section["start"][:3]
+    elif bucket == "partial":
+        options = section["top_up"][:2] + section["start"][:1]
+    else:
+        options = section["top_up"][:2]
+
+    limit = f"up to ₹{cap:,}" if cap else "with no upper limit"
+    if bucket == "full":
+        note = f"You are already claiming the full ₹{cap:,} under this section."
+    elif slab < 0:
+        note = f"Covers {section['covers']}, {limit}; your income is already within the 87A rebate."
+    elif reaches_rebate:
+        note = (f"Covers {section['covers']}, {limit}. Using the rest of it brings your taxable income "
+                "within the 87A rebate, which removes your old-regime tax altogether.")
+    else:
+        rate = slab_savings(assessment_year)[slab][1]
+        note = f"Covers {section['covers']}, {limit}. In your slab every rupee claimed here saves ₹{rate:.2f} in tax."
+    return tuple(options), note
+
+
+def _claimed(record: dict, title: str) -> int:
+    if title == "Health Insurance (80D)" and "medical_self" not in record:
+        return int(record.get("section_80d", 0))  # only the 80D total is known
+    return int(sum(record.get(field, 0) for field in SECTIONS[title]["fields"]))
+
+
+def rank_suggestions(parsed_data: dict, income: float, assessment_year: str = None) -> dict:
+    """
+    Suggestions per section, highest rupee saving first, then "General Advice".
+    parsed_data may use any alias from field_schema; income is the old-regime
+    taxable income the savings are measured from.
+    """
+    record = normalize_fields(parsed_data) if isinstance(parsed_data, dict) else {}
+    ay = normalize_assessment_year(assessment_year) if assessment_year \
+        else supported_assessment_year(record.get("assessment_year"))
+    table = get_slab_table("old", ay)
+    income = max(0, income or 0)
+    tax = table.final_tax(income)
+    slab = _slab(ay, income)
+
+    ranked = []
+    for order, (title, section) in enumerate(SECTIONS.items()):
+        cap = section["cap"]
+        claimed = _claimed(record, title)
+        remaining = max(0, cap - claimed) if cap is not None else None
+        tax_saved = tax - table.final_tax(max(0, income - remaining)) if remaining else 0
+        reaches_rebate = bool(tax_saved) and income - remaining <= table.rebate_limit
+        options, note = suggestion_block(title, ay, slab, _gap_bucket(claimed, cap), reaches_rebate)
+        ranked.append((-tax_saved, order, title, {
+            "claimed": claimed,
+            "limit": cap,
+            "remaining": remaining,
+            "tax_saved": tax_saved,
+            "saving_per_rupee": round(tax_saved / remaining, 4) if remaining else None,
+            "options": list(options),
+            "note": note,
+        }))
+
+    suggestions = {title: block for _, _, title, block in sorted(ranked, key=lambda r: r[:2])}
+    suggestions["General Advice"] = [REBATE_TIP, GENERAL_TIPS[0]] if slab < 0 else GENERAL_TIPS[:2]
+    return suggestions
+
 
 def generate_suggestions():
     """
-    Returns randomized suggestions for deductions each time.
+    General tips per deduction category (the same on every call), for pages
+    without a calculation to rank against.
     """
 
     suggestion_pool = {
@@ -34,9 +241,4 @@ def generate_suggestions():
         ]
     }
 
-    # Randomly select 2-3 suggestions per category
-    randomized = {}
-    for section, options in suggestion_pool.items():
-        randomized[section] = random.sample(options, k=min(2, len(options)))
-
-    return randomized
+    return {section: options[:2] for section, options in suggestion_pool.items()}
@@ -1,142 +1,174 @@
 # tax_calculator.py
 
-import random
+import re
+from bisect import bisect_left
+from functools import cached_property, lru_cache
+
+from field_schema import normalize_fields
+from metrics import timed
+
+
+def total_80d(record: dict) -> int:
+    """80D total: the reported total if present, else self + parents."""
+    return record.get("section_80d") or record.get("medical_self", 0) + record.get("medical_parents", 0)
+
+
+# ---------- Slab tables ----------
+
+DEFAULT_ASSESSMENT_YEAR = "2025-26"
+CESS_RATE = 0.04  # Health & Education Cess
+
+_OLD_REGIME = {
+    "slabs": [(0, 0.0), (250000, 0.05), (500000, 0.20), (1000000, 0.30)],
+    "rebate_limit": 500000,
+    "standard_deduction": 50000,
+}
+
+# Per (assessment year, regime): slab lower bounds with their rates, the 87A
+# income limit (tax is fully rebated at or below it) and the standard deduction.
+SLAB_TABLES = {
+    ("2024-25", "old"): _OLD_REGIME,
+    ("2024-25", "new"): {
+        "slabs": [(0, 0.0), (300000, 0.05), (600000, 0.10), (900000, 0.15),
+                  (1200000, 0.20), (1500000, 0.30)],
+        "rebate_limit": 700000,
+        "standard_deduction": 50000,
+    },
+    ("2025-26", "old"): _OLD_REGIME,
+    ("2025-26", "new"): {
+        "slabs": [(0, 0.0), (300000, 0.05), (700000, 0.10), (1000000, 0.15),
+                  (1200000, 0.20), (1500000, 0.30)],
+        "rebate_limit": 700000,
+        "standard_deduction": 75000,
+    },
+    ("2026-27", "old"): _OLD_REGIME,
+    ("2026-27", "new"): {
+        "slabs": [(0, 0.0), (400000, 0.05), (800000, 0.10), (1200000, 0.15),
+                  (1600000, 0.20), (2000000, 0.25), (2400000, 0.30)],
+        "rebate_limit": 1200000,
+        "standard_deduction": 75000,
+    },
+}
+
+
+def normalize_assessment_year(ay) -> str:
+    """Turn '2025-2026', '2025 - 26' or 'Not Found' into a SLAB_TABLES key ('2025-26')."""
+    m = re.search(r"(\d{4})\s*[–-]\s*(\d{2,4})", str(ay or ""))
+    if not m:
+        return DEFAULT_ASSESSMENT_YEAR
+    return f"{m.group(1)}-{m.group(2)[-2:]}"
+
+
+def supported_assessment_year(ay) -> str:
+    """
+    normalize_assessment_year(), mapped to the nearest year SLAB_TABLES covers
+    (the later one on a tie). For AYs read off a Form 16 or a form, where an
+    older or newer certificate should still get an estimate; callers that ask
+    for a specific year go through get_slab_table(), which rejects unknown ones.
+    """
+    key = normalize_assessment_year(ay)
+    years = sorted({year for year, _ in SLAB_TABLES})
+    if key in years:
+        return key
+    start = int(key[:4])
+    return min(reversed(years), key=lambda year: abs(int(year[:4]) - start))
 
-def safe_get_value(data: dict, keys: list, default=0.0):
+
+class SlabTable:
     """
-    Return numeric value for first matching key variant from data.
-    Handles strings with commas/currency symbol.
+    A slab table compiled into breakpoint / rate / base-tax arrays.
+    base[i] is the tax accumulated below lowers[i], summed slab by slab in the
+    same order as the old hand-written formulas so results match to the rupee.
+    The numpy arrays are built on first use; the scalar path never needs numpy.
     """
-    if not isinstance(data, dict):
-        return default
-    for k in keys:
-        if k in data and data[k] not in (None, ""):
-            val = data[k]
-            try:
-                if isinstance(val, str):
-                    return float(val.replace(",", "").replace("₹", "").strip())
-                if isinstance(val, (int, float)):
-                    return float(val)
-            except Exception:
-                continue
-    return default
-
-
-def calculate_tax_old_regime(income: float) -> int:
-    # (same as before) ...
-    tax = 0
-    if income <= 250000:
-        tax = 0
-    elif income <= 500000:
-        tax = (income - 250000) * 0.05
-    elif income <= 1000000:
-        tax = (250000 * 0.05) + (income - 500000) * 0.20
-    else:
-        tax = (250000 * 0.05) + (500000 * 0.20) + (income - 1000000) * 0.30
-    if income <= 500000:
-        tax = 0
-    tax = tax + (tax * 0.04)
-    return round(tax)
-
-
-def calculate_tax_new_regime(income: float) -> int:
-    # (same as before) ...
-    tax = 0
-    if income <= 300000:
-        tax = 0
-    elif income <= 700000:
-        tax = (income - 300000) * 0.05
-    elif income <= 1000000:
-        tax = (400000 * 0.05) + (income - 700000) * 0.10
-    elif income <= 1200000:
-        tax = (400000 * 0.05) + (300000 * 0.10) + (income - 1000000) * 0.15
-    elif income <= 1500000:
-        tax = (400000 * 0.05) + (300000 * 0.10) + (200000 * 0.15) + (income - 1200000) * 0.20
-    else:
-        tax = (400000 * 0.05) + (300000 * 0.10) + (200000 * 0.15) + (300000 * 0.20) + (income - 1500000) * 0.30
-
-    if income <= 700000:
-        tax = 0
-    tax = tax + (tax * 0.04)
-    return round(tax)
-
-
-def generate_suggestions(parsed_data: dict, income: float) -> dict:
+
+    def __init__(self, slabs, rebate_limit, standard_deduction=0):
+        # plain lists for the scalar path (cheaper than numpy for one value)
+        self._lowers = [float(lo) for lo, _ in slabs]
+        self._rates = [float(rate) for _, rate in slabs]
+        bases = [0.0]
+        for (lo, rate), (hi, _) in zip(slabs, slabs[1:]):
+            bases.append(bases[-1] + (hi - lo) * rate if rate else bases[-1])
+        self._bases = bases
+        self.rebate_limit = float(rebate_limit)
+        self.standard_deduction = standard_deduction
+
+    @cached_property
+    def lowers(self):
+        import numpy as np
+        return np.array(self._lowers, dtype=np.float64)
+
+    @cached_property
+    def rates(self):
+        import numpy as np
+        return np.array(self._rates, dtype=np.float64)
+
+    @cached_property
+    def bases(self):
+        import numpy as np
+        return np.array(self._bases, dtype=np.float64)
+
+    def tax_components(self, incomes) -> dict:
+        """
+        Vectorized evaluation over an array of incomes.
+        Returns numpy columns: tax (slab tax), rebate (87A), cess and final_tax (rounded).
+        """
+        import numpy as np
+
+        incomes = np.asarray(incomes, dtype=np.float64)
+        idx = np.clip(np.searchsorted(self.lowers, incomes, side="left") - 1, 0, None)
+        tax = self.bases[idx] + (incomes - self.lowers[idx]) * self.rates[idx]
+        rebate = np.where(incomes <= self.rebate_limit, tax, 0.0)
+        after_rebate = tax - rebate
+        cess = after_rebate * CESS_RATE
+        final_tax = np.round(after_rebate + cess).astype(np.int64)
+        return {"tax": tax, "rebate": rebate, "cess": cess, "final_tax": final_tax}
+
+    def final_tax(self, income: float) -> int:
+        """Scalar evaluation of the same table (no numpy round-trip per call)."""
+        i = max(bisect_left(self._lowers, income) - 1, 0)
+        tax = self._bases[i] + (income - self._lowers[i]) * self._rates[i]
+        if income <= self.rebate_limit:
+            tax = 0
+        return round(tax + tax * CESS_RATE)
+
+
+@lru_cache(maxsize=None)
+def get_slab_table(regime: str, assessment_year: str = DEFAULT_ASSESSMENT_YEAR) -> SlabTable:
+    key = (normalize_assessment_year(assessment_year), regime)
+    if key not in SLAB_TABLES:
+        raise ValueError(f"No slab table for regime '{regime}' in AY {key[0]}")
+    return SlabTable(**SLAB_TABLES[key])
+
+
+def compute_tax_batch(incomes, regime: str = "old", assessment_year: str = DEFAULT_ASSESSMENT_YEAR) -> dict:
     """
-    Generate dynamic tax-saving suggestions based on income and deductions.
-    Uses safe_get_value() to read many key variants.
+    Compute tax for a whole array of taxable incomes in one vectorized call.
+    Returns {"tax", "rebate", "cess", "final_tax"} numpy columns aligned with incomes.
     """
-    suggestions = {}
-
-    # Section 80C – read from multiple possible keys
-    claimed_80c = safe_get_value(parsed_data, ["section_80c", "sec80c", "80C", "investments80C", "section80c"], 0)
-    options_80c = [
-        "Invest in ELSS Mutual Funds for high returns and tax savings",
-        "Open a Public Provident Fund (PPF) account for long-term growth",
-        "Buy Life Insurance policies for yourself or dependents",
-        "Increase EPF contribution via Voluntary PF",
-        "Invest in National Savings Certificate (NSC) through the post office",
-        "Open a 5-year tax-saving Fixed Deposit (FD) in a bank",
-        "Consider Sukanya Samriddhi Yojana (for girl child)",
-        "Pay tuition fees for your children — eligible under Section 80C",
-        "Repay home loan principal — also covered under Section 80C"
-    ]
-    suggestions["80C (Investments)"] = {
-        "claimed": int(claimed_80c),
-        "limit": 150000,
-        "remaining": max(0, 150000 - int(claimed_80c)),
-        "options": random.sample(options_80c, min(4, len(options_80c))),
-        "note": f"{random.choice(options_80c)}. You can claim up to ₹1,50,000 under Section 80C."
-    }
+    return get_slab_table(regime, assessment_year).tax_components(incomes)
 
-    # NPS
-    claimed_nps = safe_get_value(parsed_data, ["section_80ccd1b", "nps_additional", "80CCD(1B)"], 0)
-    options_nps = [
-        "Contribute more to the National Pension System (NPS)",
-        "Use NPS Tier I for long-term retirement corpus building",
-        "Leverage employer contributions for additional tax benefit",
-        "Opt for auto-choice investment in NPS for better diversification"
-    ]
-    suggestions["NPS (80CCD(1B))"] = {
-        "claimed": int(claimed_nps),
-        "limit": 50000,
-        "remaining": max(0, 50000 - int(claimed_nps)),
-        "options": random.sample(options_nps, min(3, len(options_nps))),
-        "note": f"{random.choice(options_nps)}. You can save an extra ₹50,000 under Section 80CCD(1B)."
-    }
 
-    # 80D
-    claimed_80d = safe_get_value(parsed_data, ["section_80d", "medical_self", "medical_parents", "80D"], 0)
-    options_80d = [
-        "Buy or renew health insurance for yourself and family",
-        "Add preventive health check-ups to claim small deductions",
-        "Get health insurance for parents (extra ₹25,000–₹50,000 deduction)",
-        "Ensure health policy covers pre-existing diseases for long-term savings",
-        "Opt for family floater plans to maximize 80D benefits"
-    ]
-    suggestions["Health Insurance (80D)"] = {
-        "claimed": int(claimed_80d),
-        "limit": 25000,
-        "remaining": max(0, 25000 - int(claimed_80d)),
-        "options": random.sample(options_80d, min(3, len(options_80d))),
-        "note": f"{random.choice(options_80d)}. Total deduction limit: ₹25,000 (₹50,000 for senior citizens)."
-    }
+def calculate_tax_old_regime(income: float, assessment_year: str = DEFAULT_ASSESSMENT_YEAR) -> int:
+    return get_slab_table("old", assessment_year).final_tax(income)
 
-    # General advice (unchanged)
-    general_tips = [
-        "Consider switching to the New Regime if deductions are limited.",
-        "Plan tax-saving investments early in the financial year.",
-        "Track your 26AS and AIS reports to avoid mismatches while filing.",
-        "File ITR early to prevent late fees and last-minute stress.",
-        "Review your Form 16 and Form 26AS before submission.",
-        "Opt for e-verification immediately after filing to complete the process.",
-        "Use the Income Tax portal’s comparison tool for regime selection."
-    ]
-    suggestions["General Advice"] = random.sample(general_tips, 2)
 
-    return suggestions
+def calculate_tax_new_regime(income: float, assessment_year: str = DEFAULT_ASSESSMENT_YEAR) -> int:
+    return get_slab_table("new", assessment_year).final_tax(income)
 
 
+@timed("suggestions")
+def generate_suggestions(parsed_data: dict, income: float, assessment_year: str = None) -> dict:
+    """
+    Tax-saving suggestions per section, ranked by the tax each would save at
+    this income (see suggestion_engine). parsed_data may use any alias from field_schema.
+    """
+    from suggestion_engine import rank_suggestions
+
+    return rank_suggestions(parsed_data, income, assessment_year)
+
+
+@timed("compute_tax")
 def compute_tax(parsed_data: dict) -> dict:
     """
     Compute tax summary based on parsed_data dict (which should include taxable_income).
@@ -145,23 +177,22 @@ def compute_tax(parsed_data: dict) -> dict:
     # safety
     if not isinstance(parsed_data, dict):
         parsed_data = {}
+    record = normalize_fields(parsed_data)
 
-    income = safe_get_value(parsed_data, ["taxable_income", "net_taxable_income", "income", "Taxable Income"], 0.0)
-    if income < 0 or not income:
-        income = 0.0
+    income = record.get("taxable_income") or record.get("net_taxable_income") or 0
+    if income < 0:
+        income = 0
 
-    old_regime = calculate_tax_old_regime(income)
-    new_regime = calculate_tax_new_regime(income)
+    ay = supported_assessment_year(record.get("assessment_year"))
+    old_regime = calculate_tax_old_regime(income, ay)
+    new_regime = calculate_tax_new_regime(income, ay)
 
     # ensure fallback keys are set (not required but useful)
-    if "section_80c" not in parsed_data:
-        parsed_data["section_80c"] = safe_get_value(parsed_data, ["80C", "sec80c", "section80c"], 0)
-    if "section_80d" not in parsed_data:
-        parsed_data["section_80d"] = safe_get_value(parsed_data, ["80D", "medical_self", "medical_parents"], 0)
-    if "section_80ccd1b" not in parsed_data:
-        parsed_data["section_80ccd1b"] = safe_get_value(parsed_data, ["80CCD(1B)", "nps_additional"], 0)
-
-    suggestions = generate_suggestions(parsed_data, income)
+    parsed_data.setdefault("section_80c", record.get("section_80c", 0))
+    parsed_data.setdefault("section_80d", total_80d(record))
+    parsed_data.setdefault("section_80ccd1b", record.get("section_80ccd1b", 0))
+
+    suggestions = generate_suggestions(record, income, ay)
 
     return {
         "old": {"final_tax": old_regime},
@@ -0,0 +1,76 @@
+# tests/test_calc_graph.py
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calc_graph  # noqa: E402
+from calc_graph import Calculation, calc_inputs  # noqa: E402
+from field_schema import normalize_fields  # noqa: E402
+
+PARSED = {
+    "regime": "old", "employee_name": "ABC", "assessment_year": "2025-26",
+    "gross_salary": 1066058, "standard_deduction": 50000, "taxable_income": 1066058,
+    "tds_deducted": 40251, "total_tax_payable": 77981, "refund": 0,
+}
+USER = normalize_fields({"investments80C": "120000", "medInsuranceSelf": "20000", "eduLoan": "40000"})
+
+
+def _stored(calc: Calculation) -> dict:
+    """The state as the session hands it back on the next request."""
+    return json.loads(json.dumps(calc.state))
+
+
+def _computed() -> Calculation:
+    calc = Calculation()
+    calc.update(calc_inputs(PARSED, USER))
+    calc.get("tax_summary")
+    return calc
+
+
+def test_first_request_computes_every_node_it_needs():
+    calc = _computed()
+    assert sorted(calc.computed) == sorted(["deductions", "taxable", "old_regime", "new_regime", "comparison",
+                                            "suggestions", "tax_summary"])
+    assert calc.changed
+
+
+def test_editing_medical_self_keeps_new_regime():
+    calc = Calculation(_stored(_computed()))
+    changed = calc.update(calc_inputs(PARSED, {**USER, "medical_self": 25000}))
+    assert changed == {"medical_self"}
+    assert "new_regime" in calc.values
+    calc.get("tax_summary")
+    assert "new_regime" not in calc.computed
+    assert {"deductions", "taxable", "old_regime", "comparison", "suggestions", "tax_summary"} <= set(calc.computed)
+
+
+def test_result_refresh_recomputes_nothing():
+    first = _computed()
+    calc = Calculation(_stored(first))
+    assert calc.update(calc_inputs(PARSED, USER)) == set()
+    assert calc.get("tax_summary") == first.get("tax_summary")
+    assert calc.computed == []
+    assert not calc.changed
+
+
+def test_graph_version_mismatch_discards_stored_state(monkeypatch):
+    state = _stored(_computed())
+    monkeypatch.setattr(calc_graph, "GRAPH_VERSION", calc_graph.GRAPH_VERSION + 1)
+    calc = Calculation(state)
+    assert calc.inputs == {} and calc.values == {}
+    calc.update(calc_inputs(PARSED, USER))
+    calc.get("tax_summary")
+    assert "new_regime" in calc.computed
+
+
+def test_enriched_record_read_back_invalidates_nothing():
+    calc = _computed()
+    enriched = calc.enrich(PARSED)
+    assert set(calc_graph.DERIVED_FIELDS) <= set(enriched)
+
+    calc = Calculation(_stored(calc))
+    assert calc.update(calc_inputs(enriched, USER)) == set()
+    calc.get("tax_summary")
+    assert calc.computed == []
@@ -0,0 +1,39 @@
+# tests/test_field_schema.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from field_schema import normalize_fields, normalize_rows  # noqa: E402
+
+
+def test_first_alias_wins_in_alias_order():
+    # the canonical name outranks its aliases, whatever order the keys arrive in
+    row = {"investments80C": "20000", "section_80c": "150000", "80C": "90000"}
+    assert normalize_fields(row)["section_80c"] == 150000
+    assert next(normalize_rows([row]))["section_80c"] == 150000
+
+
+def test_earlier_alias_outranks_later_alias():
+    row = {"nps_add": "10000", "80CCD(1B)": "50000"}
+    assert normalize_fields(row)["section_80ccd1b"] == 50000
+    assert next(normalize_rows([row]))["section_80ccd1b"] == 50000
+
+
+def test_empty_alias_falls_through_to_next_candidate():
+    row = {"section_80c": "", "sec80c": None, "investments80C": "75000"}
+    assert normalize_fields(row)["section_80c"] == 75000
+    assert next(normalize_rows([row]))["section_80c"] == 75000
+
+
+def test_rows_agree_with_normalize_fields():
+    rows = [
+        {"Taxable Income": "900000", "income": "850000", "taxable_income": ""},
+        {"Taxable Income": "", "income": "850000", "taxable_income": "800000"},
+        {"Taxable Income": "", "income": "", "taxable_income": ""},
+        {"medInsurenceSelf": "5000", "medInsuranceSelf": "25000", "extra": "kept"},
+    ]
+    assert list(normalize_rows(rows)) == [normalize_fields(row) for row in rows]
+    assert normalize_fields(rows[0])["taxable_income"] == 900000  # same alias as taxable_income: first key wins
+    assert normalize_fields(rows[2])["taxable_income"] == 0
+    assert normalize_fields(rows[3]) == {"medical_self": 25000, "extra": "kept"}
@@ -0,0 +1,50 @@
+# tests/test_jobs.py
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs import DONE, FAILED, QUEUED, JobManager, SqliteJobStore  # noqa: E402
+
+
+def _wait(manager, job_id):
+    for _ in range(200):
+        job = manager.get(job_id)
+        if job["status"] in (DONE, FAILED):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_another_worker_sees_status_and_result(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    accepting = JobManager(SqliteJobStore(path, ttl=900))
+    polling = JobManager(SqliteJobStore(path, ttl=900), max_workers=1)  # a second gunicorn worker
+
+    job_id = accepting.submit(lambda: {"parsed_data": {"gross_salary": 1240474}})
+    assert polling.get(job_id)["status"] in (QUEUED, "running", DONE)
+    _wait(accepting, job_id)
+    job = polling.get(job_id)
+    assert job["status"] == DONE and job["result"] == {"parsed_data": {"gross_salary": 1240474}}
+
+    failing = accepting.submit(lambda: 1 / 0)
+    _wait(accepting, failing)
+    assert polling.get(failing)["error"].startswith("ZeroDivisionError")
+    assert polling.get("unknown") is None
+
+
+def test_pending_cap_is_shared(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    release = threading.Event()
+    first = JobManager(SqliteJobStore(path), max_workers=1, max_pending=2)
+    second = JobManager(SqliteJobStore(path), max_workers=1, max_pending=2)
+    assert first.submit(release.wait) and second.submit(release.wait)
+    assert first.submit(release.wait) is None and second.submit(release.wait) is None
+    release.set()
+
+
+def test_finished_jobs_expire(tmp_path):
+    manager = JobManager(SqliteJobStore(str(tmp_path / "sessions.sqlite3"), ttl=-1))
+    job_id = manager.submit(dict)
+    assert manager.get(job_id) is None
@@ -0,0 +1,76 @@
+# tests/test_layout_regions.py
+"""Region extraction (layout_cache hit) must agree with the full-text scan."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+pytest.importorskip("reportlab")
+
+import parser as form16_parser  # noqa: E402
+from form16_corpus import draw_pdf, form16_pages  # noqa: E402
+from layout_cache import layout_cache  # noqa: E402
+from pdf_backends import available_backends  # noqa: E402
+
+BACKENDS = [b.name for b in available_backends()]
+
+
+@pytest.fixture(autouse=True)
+def in_memory_layouts(monkeypatch):
+    monkeypatch.setattr(layout_cache, "path", None)
+    layout_cache.clear()
+    yield
+    layout_cache.clear()
+
+
+def _form16(path, **values) -> str:
+    """One-page new-regime Form 16 from XYZ COMPANY; tds= sets the TDS (9+10) amount, ay=False drops the (AY ...)."""
+    _, pages, _ = form16_pages(3, 11, "new")
+    rows = [row for page in pages for row in page if row[0] != "SALARY STATEMENT OF PAY AND ALLOWANCES"][:30]
+    employer = rows[3][0]  # the TDS chain's second finder reads "TOTAL TAX DEDUCTED BY XYZ COMPANY"
+    labels = {"tds": "11 U/S192", "ay": "PERIOD "}
+    out = []
+    for left, right in rows:
+        left = left.replace(employer, "XYZ COMPANY")
+        key = next((k for k, label in labels.items() if left.startswith(label)), None)
+        if key == "tds" and "tds" in values:
+            right = values["tds"]
+        elif key == "ay" and values.get("ay") is False:
+            left = left.split(" (AY")[0]
+        out.append((left, right))
+    draw_pdf(str(path), [out])
+    return str(path)
+
+
+def _both(path, backend):
+    return (form16_parser.parse_form16(path, backend=backend, layouts=True),
+            form16_parser.parse_form16(path, backend=backend, layouts=False))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_zero_chain_entry_falls_through_like_full_text(tmp_path, backend):
+    learned = _form16(tmp_path / "learn.pdf", tds="60,000")
+    zero = _form16(tmp_path / "zero.pdf", tds="0")
+
+    regions, full = _both(learned, backend)
+    assert regions == full and full["tds_deducted"] == 60000
+    hits = layout_cache.stats()["hits"]
+    regions, full = _both(zero, backend)
+    assert layout_cache.stats()["hits"] == hits + 1  # answered from the learned bands
+    assert full["tds_deducted"] != 0
+    assert regions == full
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_field_without_learned_bands_is_read_from_full_text(tmp_path, backend):
+    learned = _form16(tmp_path / "learn.pdf", ay=False)
+    with_ay = _form16(tmp_path / "ay.pdf")
+
+    regions, full = _both(learned, backend)
+    assert regions == full and full["assessment_year"] == "Not Found"
+    regions, full = _both(with_ay, backend)
+    assert full["assessment_year"] != "Not Found"
+    assert regions == full
@@ -0,0 +1,46 @@
+# upload_stream.py
+"""
+Uploads parsed straight from the request body, never saved under uploads/.
+
+Werkzeug asks the request for a writable file per uploaded part. UploadRequest
+hands it a HashingSpool, which hashes the bytes as the multipart parser writes
+them and keeps them in memory up to FORM16_UPLOAD_SPOOL_BYTES (default 4 MiB).
+Bigger uploads spill to an anonymous temp file in FORM16_UPLOAD_SCRATCH (default:
+the system temp dir). The file is private to the request and is gone once closed,
+which Flask does when the request ends, crash or not.
+"""
+import hashlib
+import os
+import tempfile
+
+from flask import Request
+
+SPOOL_BYTES = int(os.environ.get("FORM16_UPLOAD_SPOOL_BYTES", 4 * 1024 * 1024))
+SCRATCH_DIR = os.environ.get("FORM16_UPLOAD_SCRATCH") or None
+
+
+class HashingSpool(tempfile.SpooledTemporaryFile):
+    """SpooledTemporaryFile that keeps a running SHA-256 of everything written to it."""
+
+    def __init__(self, max_size: int = SPOOL_BYTES, dir: str = SCRATCH_DIR):
+        super().__init__(max_size=max_size, prefix="form16-upload-", suffix=".part", dir=dir)
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self._hash.update(data)
+        self.size += len(data)
+        return super().write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def spilled(self) -> bool:
+        return self._rolled
+
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingSpool()